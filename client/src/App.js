@@ -4,6 +4,7 @@ import Home from './components/Home';
 import HostView from './components/HostView';
 import PlayerView from './components/PlayerView';
 import JoinGame from './components/JoinGame';
+import SpectatorView from './components/SpectatorView';
 import { GameProvider } from './context/GameContext';
 import './App.css';
 
@@ -17,6 +18,7 @@ function App() {
             <Route path="/host/:gameId" element={<HostView />} />
             <Route path="/player/:gameId" element={<PlayerView />} />
             <Route path="/join" element={<JoinGame />} />
+            <Route path="/watch/:gameId" element={<SpectatorView />} />
           </Routes>
         </div>
       </GameProvider>
@@ -11,6 +11,10 @@ function Home() {
     // Navigation will be handled by socket response
   };
 
+  const handleCreateLargeRoom = () => {
+    actions.createGame('large');
+  };
+
   const handleJoinGame = () => {
     navigate('/join');
   };
@@ -32,6 +36,9 @@ function Home() {
           <button className="btn" onClick={handleCreateGame}>
             🎮 Create Game
           </button>
+          <button className="btn btn-secondary" onClick={handleCreateLargeRoom}>
+            🏟️ Create Large Room
+          </button>
           <button className="btn btn-secondary" onClick={handleJoinGame}>
             📱 Join Game
           </button>
@@ -55,7 +55,10 @@ function HostView() {
     }
   };
 
-  const canStartGame = 
+  // Large rooms only know counts, so they rely on the server's start check
+  const playerCount = state.playerCount ?? state.players.length;
+  const readyCount = state.readyCount ?? state.readyPlayers.length;
+  const canStartGame = state.gameMode === 'large' ? state.gameReadyToStart :
     state.players.length >= state.minPlayers &&
     state.tracks.length >= (state.players.length * state.minTracksPerPlayer) &&
     state.readyPlayers.length === state.players.length;
@@ -138,7 +141,7 @@ function HostView() {
           </div>
           
           <div className="card">
-            <h3>Players ({state.players.length})</h3>
+            <h3>Players ({playerCount})</h3>
             <div className="players-list">
               {state.players.length === 0 ? (
                 <p style={{ textAlign: 'center', color: '#666' }}>Waiting for players...</p>
@@ -171,7 +174,7 @@ function HostView() {
             
             <div style={{ marginTop: '20px', textAlign: 'center' }}>
               <p><strong>Total Tracks:</strong> {state.tracks.length}</p>
-              <p><strong>Ready Players:</strong> {state.readyPlayers.length}/{state.players.length}</p>
+              <p><strong>Ready Players:</strong> {readyCount}/{playerCount}</p>
               <p style={{ fontSize: '14px', color: '#666' }}>
                 {state.gameReadyToStart 
                   ? 'All players are ready! Click "Start Game" to begin.' 
@@ -250,9 +253,9 @@ function HostView() {
               <h4 style={{ marginBottom: '10px', color: '#666' }}>🔧 Debug Info</h4>
               <p><strong>Game ID:</strong> {state.gameId || gameId}</p>
               <p><strong>Socket:</strong> {state.socket?.connected ? '✅ Connected' : '❌ Disconnected'}</p>
-              <p><strong>Total Players:</strong> {state.players.length}</p>
+              <p><strong>Total Players:</strong> {playerCount}</p>
               <p><strong>Total Tracks:</strong> {state.tracks.length}</p>
-              <p><strong>Ready Players:</strong> {state.readyPlayers.length}</p>
+              <p><strong>Ready Players:</strong> {readyCount}</p>
               <p><strong>Can Start:</strong> {canStartGame ? '✅ Yes' : '❌ No'}</p>
               <div style={{ marginTop: '10px' }}>
                 <p><strong>Track Details:</strong></p>
@@ -145,7 +145,12 @@ function PlayerView() {
           </div>
           
           <div className="card">
-            <TrackSearch onTrackAdd={actions.addTrack} />
+            <TrackSearch
+              onTrackAdd={actions.addTrack}
+              onTracksAdd={actions.addTracks}
+              onImport={actions.importPlaylist}
+            />
+            {state.error && <p style={{ color: '#e74c3c' }}>{state.error}</p>}
           </div>
           
           {myTracks.length > 0 && (
@@ -188,7 +193,7 @@ function PlayerView() {
             </div>
             
             <div style={{ marginBottom: '20px' }}>
-              <p><strong>Ready Players:</strong> {state.readyPlayers.length}/{state.players.length}</p>
+              <p><strong>Ready Players:</strong> {state.readyCount ?? state.readyPlayers.length}/{state.playerCount ?? state.players.length}</p>
               <p><strong>Total Tracks:</strong> {state.tracks.length}</p>
               <p style={{ fontSize: '14px', color: '#666' }}>
                 Host will start the game when all players are ready!
@@ -311,7 +316,9 @@ function PlayerView() {
   }
 
   if (state.gameStatus === 'finished') {
-    const myPosition = state.leaderboard.findIndex(p => p.id === state.playerId) + 1;
+    // Large rooms only send the top of the leaderboard, plus our own final rank
+    const leaderboardIndex = state.leaderboard.findIndex(p => p.id === state.playerId);
+    const myPosition = leaderboardIndex >= 0 ? leaderboardIndex + 1 : state.myRank;
     
     return (
       <div className="player-view">
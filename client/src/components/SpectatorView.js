@@ -0,0 +1,104 @@
+import React, { useEffect, useRef, useState } from 'react';
+import { useParams } from 'react-router-dom';
+import { useGame } from '../context/GameContext';
+import AudioPlayer from './AudioPlayer';
+import Leaderboard from './Leaderboard';
+
+// Read-only big-screen view: a snapshot on subscribe, then coalesced deltas
+function SpectatorView() {
+  const { gameId } = useParams();
+  const { state } = useGame();
+  const [game, setGame] = useState(null);
+  const seqRef = useRef(0);
+
+  useEffect(() => {
+    const socket = state.socket;
+    if (!socket) return;
+
+    const subscribe = () => socket.emit('spectateGame', { gameId });
+
+    const onSnapshot = (data) => {
+      seqRef.current = data.seq;
+      setGame(data);
+    };
+
+    const onDelta = (data) => {
+      if (data.seq <= seqRef.current) return;
+      if (data.seq !== seqRef.current + 1) {
+        console.log('📸 Spectator delta gap detected, requesting snapshot:', { have: seqRef.current, got: data.seq });
+        socket.emit('requestSpectatorSnapshot', { gameId });
+        return;
+      }
+      seqRef.current = data.seq;
+      setGame(current => ({ ...current, ...data.changes }));
+    };
+
+    socket.on('spectatorSnapshot', onSnapshot);
+    socket.on('spectatorDelta', onDelta);
+    // Subscribe again after a reconnect, the server forgets spectators on disconnect
+    socket.on('connect', subscribe);
+    if (socket.io.opts.query?.gameId !== gameId) {
+      // Reconnect with the gameId query so the server routes us to the worker that owns the game
+      socket.io.opts.query = { gameId };
+      socket.disconnect().connect();
+    } else if (socket.connected) {
+      subscribe();
+    }
+
+    return () => {
+      socket.emit('stopSpectating', { gameId });
+      socket.off('spectatorSnapshot', onSnapshot);
+      socket.off('spectatorDelta', onDelta);
+      socket.off('connect', subscribe);
+    };
+  }, [state.socket, gameId]);
+
+  if (!game) {
+    return (
+      <div className="container">
+        <div className="card" style={{ textAlign: 'center' }}>
+          <h2>👀 Connecting to game {gameId}...</h2>
+          {state.error && <p style={{ color: '#e74c3c' }}>{state.error}</p>}
+        </div>
+      </div>
+    );
+  }
+
+  const leaderboard = game.leaderboard.map((entry, index) => ({ id: `${index}`, ...entry }));
+
+  return (
+    <div className="container">
+      <div className="card" style={{ textAlign: 'center' }}>
+        <h2>🎵 Game {game.gameId}</h2>
+        {game.status === 'lobby' && (
+          <p>
+            <strong>Players:</strong> {game.playerCount} · <strong>Ready:</strong> {game.readyCount} ·{' '}
+            <strong>Tracks:</strong> {game.trackCount}
+          </p>
+        )}
+        {game.status === 'playing' && (
+          <p><strong>Round {game.round.current} of {game.round.total}</strong> · {game.playerCount} players</p>
+        )}
+        {game.status === 'finished' && <p><strong>Game over!</strong></p>}
+        {game.status === 'closed' && <p><strong>The host closed this game.</strong></p>}
+      </div>
+
+      {game.status === 'playing' && game.track && (
+        <div className="card">
+          <AudioPlayer
+            track={game.track}
+            timeLeft={game.timeLeft}
+            isHost={true}
+            difficulty={game.difficulty}
+          />
+        </div>
+      )}
+
+      <div className="card">
+        <Leaderboard players={leaderboard} showFinal={game.status === 'finished'} />
+      </div>
+    </div>
+  );
+}
+
+export default SpectatorView;
@@ -1,8 +1,13 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 
-function TrackSearch({ onTrackAdd }) {
+// A Deezer link such as https://www.deezer.com/en/playlist/1313621735, or a bare id
+const DEEZER_LINK = /(playlist|album|artist)\/(\d+)/;
+
+function TrackSearch({ onTrackAdd, onTracksAdd, onImport }) {
   const [query, setQuery] = useState('');
+  const [importSource, setImportSource] = useState('playlist');
+  const [importLink, setImportLink] = useState('');
   const [results, setResults] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
@@ -55,6 +60,28 @@ function TrackSearch({ onTrackAdd }) {
     setResults([]);
   };
 
+  const handleAddAll = () => {
+    const playable = results.filter(track => track.preview_url);
+    console.log('➕ Adding tracks:', playable.length);
+    onTracksAdd(playable);
+    setQuery('');
+    setResults([]);
+  };
+
+  const handleImport = (e) => {
+    e.preventDefault();
+    const link = importLink.trim();
+    const match = link.match(DEEZER_LINK);
+    if (!match && !/^\d+$/.test(link)) {
+      alert('Paste a Deezer playlist, album or artist link, or its id.');
+      return;
+    }
+    const [source, sourceId] = match ? [match[1], match[2]] : [importSource, link];
+    console.log('📥 Importing tracks:', { source, sourceId });
+    onImport(source, sourceId);
+    setImportLink('');
+  };
+
   const handlePreview = (track) => {
     if (playingTrackId === track.id) {
       // Stop current preview
@@ -118,6 +145,16 @@ function TrackSearch({ onTrackAdd }) {
         </div>
       )}
       
+      {results.length > 0 && onTracksAdd && (
+        <button
+          className="btn"
+          style={{ margin: '10px 0', padding: '5px 10px', fontSize: '14px' }}
+          onClick={handleAddAll}
+        >
+          Add all
+        </button>
+      )}
+      
       {results.length > 0 && (
         <div className="search-results">
           {results.map((track) => (
@@ -187,11 +224,35 @@ function TrackSearch({ onTrackAdd }) {
         </div>
       )}
       
+      {onImport && (
+        <form className="track-import" onSubmit={handleImport} style={{ marginTop: '20px' }}>
+          <h3>📥 Import from Deezer</h3>
+          <div style={{ display: 'flex', gap: '8px' }}>
+            <select value={importSource} onChange={(e) => setImportSource(e.target.value)}>
+              <option value="playlist">Playlist</option>
+              <option value="album">Album</option>
+              <option value="artist">Artist top tracks</option>
+            </select>
+            <input
+              type="text"
+              className="search-input"
+              value={importLink}
+              onChange={(e) => setImportLink(e.target.value)}
+              placeholder="Deezer link or id"
+            />
+            <button className="btn" type="submit" style={{ padding: '5px 10px', fontSize: '14px' }}>
+              Import
+            </button>
+          </div>
+        </form>
+      )}
+      
       <div className="search-tips" style={{ marginTop: '20px', fontSize: '14px', color: '#666' }}>
         <p><strong>💡 Tips:</strong></p>
         <ul style={{ textAlign: 'left', paddingLeft: '20px' }}>
           <li>Search by song title, artist name, or album</li>
           <li>Only songs with previews can be added</li>
+          <li>Import a playlist, album or artist to add up to 10 tracks at once</li>
           <li>Popular songs usually have better previews</li>
         </ul>
       </div>
@@ -1,9 +1,14 @@
-import React, { createContext, useContext, useReducer, useEffect } from 'react';
+import React, { createContext, useContext, useReducer, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import io from 'socket.io-client';
 
 const GameContext = createContext();
 
+// Players kept client-side in large rooms, matching the server's sample size
+const LARGE_ROOM_PLAYER_SAMPLE = 20;
+
+const SERVER_URL = process.env.REACT_APP_SERVER_URL || 'http://localhost:5001';
+
 const initialState = {
   socket: null,
   gameId: null,
@@ -31,6 +36,10 @@ const initialState = {
   minPlayers: 2, // Minimum players required to start
   gameReadyToStart: false, // Track if game is ready to be started manually
   guessResult: null, // Added to store guess result
+  gameMode: 'classic', // classic, or large for rooms of hundreds of players
+  playerCount: null, // Large rooms: total players, since `players` is only a sample
+  readyCount: null, // Large rooms: ready players, since ids are not broadcast
+  myRank: null, // Own leaderboard position, sent with guess results
 };
 
 const getInitialState = () => ({
@@ -58,8 +67,39 @@ function gameReducer(state, action) {
       return { ...state, gameStatus: action.payload };
     case 'UPDATE_PLAYERS':
       return { ...state, players: action.payload };
+    case 'MERGE_PLAYER_SAMPLE': {
+      const { sample, removed, playerCount } = action.payload;
+      const merged = [
+        ...state.players.filter(p => !removed.includes(p.id) && !sample.some(s => s.id === p.id)),
+        ...sample
+      ];
+      return { ...state, players: merged.slice(-LARGE_ROOM_PLAYER_SAMPLE), playerCount };
+    }
+    case 'SET_GAME_MODE':
+      return { ...state, gameMode: action.payload };
+    case 'SET_PLAYER_COUNT':
+      return { ...state, playerCount: action.payload };
+    case 'SET_READY_COUNT':
+      return { ...state, readyCount: action.payload };
+    case 'SET_MY_RANK':
+      return { ...state, myRank: action.payload };
+    case 'ADD_PLAYER':
+      return {
+        ...state,
+        players: [...state.players.filter(p => p.id !== action.payload.id), action.payload]
+      };
+    case 'REMOVE_PLAYER':
+      return {
+        ...state,
+        players: state.players.filter(p => p.id !== action.payload),
+        readyPlayers: state.readyPlayers.filter(id => id !== action.payload)
+      };
     case 'UPDATE_TRACKS':
       return { ...state, tracks: action.payload };
+    case 'ADD_TRACK':
+      return { ...state, tracks: [...state.tracks, action.payload] };
+    case 'ADD_TRACKS':
+      return { ...state, tracks: [...state.tracks, ...action.payload] };
     case 'SET_CURRENT_TRACK':
       return { ...state, currentTrack: action.payload };
     case 'SET_ROUND_INFO':
@@ -79,6 +119,11 @@ function gameReducer(state, action) {
         ...state, 
         userTracks: [...state.userTracks, action.payload] 
       };
+    case 'ADD_USER_TRACKS':
+      return {
+        ...state,
+        userTracks: [...state.userTracks, ...action.payload]
+      };
     case 'SET_GUESS':
       return { ...state, guess: action.payload };
     case 'UPDATE_SCORE':
@@ -125,11 +170,19 @@ function gameReducer(state, action) {
 export function GameProvider({ children }) {
   const [state, dispatch] = useReducer(gameReducer, undefined, getInitialState);
   const navigate = useNavigate();
+  // Last applied lobby delta; lets us spot gaps and ask for a snapshot
+  const lobbySeqRef = useRef(0);
+  // Audio element buffering the next round's preview from the server's preload hint
+  const preloadRef = useRef(null);
 
   useEffect(() => {
-    const socket = io(process.env.REACT_APP_SERVER_URL || 'http://localhost:5001', {
+    // The gameId query lets a multi-worker server route this socket to the
+    // worker that owns the game, including on reconnects
+    const savedGameId = localStorage.getItem('gameId');
+    const socket = io(SERVER_URL, {
       path: "/socket.io",
       transports: ['websocket'],
+      query: savedGameId ? { gameId: savedGameId } : {},
     });
     dispatch({ type: 'SET_SOCKET', payload: socket });
     
@@ -141,9 +194,38 @@ export function GameProvider({ children }) {
       console.log('Socket disconnected:', reason);
     });
     
+    // Apply a lobby delta, or request a full snapshot if one was missed
+    const applyLobbyDelta = (seq, apply) => {
+      if (seq <= lobbySeqRef.current) return;
+      if (seq !== lobbySeqRef.current + 1) {
+        console.log('📸 Lobby delta gap detected, requesting snapshot:', { have: lobbySeqRef.current, got: seq });
+        socket.emit('requestLobbySnapshot', { gameId: localStorage.getItem('gameId') });
+        return;
+      }
+      lobbySeqRef.current = seq;
+      apply();
+    };
+
+    // Apply a batch of lobby deltas ending at `seq`, skipping ones already applied
+    const applyLobbyBatch = (seq, items, apply) => {
+      if (seq <= lobbySeqRef.current) return;
+      const firstSeq = seq - items.length + 1;
+      if (firstSeq > lobbySeqRef.current + 1) {
+        console.log('📸 Lobby batch gap detected, requesting snapshot:', { have: lobbySeqRef.current, got: firstSeq });
+        socket.emit('requestLobbySnapshot', { gameId: localStorage.getItem('gameId') });
+        return;
+      }
+      const fresh = items.slice(lobbySeqRef.current + 1 - firstSeq);
+      lobbySeqRef.current = seq;
+      apply(fresh);
+    };
+
     // Socket event listeners
     socket.on('gameCreated', (data) => {
+      lobbySeqRef.current = 0;
+      socket.io.opts.query = { gameId: data.gameId };
       dispatch({ type: 'SET_GAME_ID', payload: data.gameId });
+      dispatch({ type: 'SET_GAME_MODE', payload: data.mode || 'classic' });
       dispatch({ type: 'SET_HOST', payload: true });
       dispatch({ type: 'SET_LOADING', payload: false });
       dispatch({ type: 'SET_SHOULD_NAVIGATE', payload: `/host/${data.gameId}` });
@@ -154,7 +236,10 @@ export function GameProvider({ children }) {
 
     socket.on('playerJoined', (data) => {
       console.log('🎮 [DEBUG] playerJoined event received:', data);
+      lobbySeqRef.current = data.seq;
       dispatch({ type: 'UPDATE_PLAYERS', payload: data.players });
+      dispatch({ type: 'SET_PLAYER_COUNT', payload: data.playerCount ?? null });
+      dispatch({ type: 'UPDATE_TRACKS', payload: data.tracks });
       dispatch({ type: 'SET_PLAYER_INFO', payload: { id: data.playerId, name: data.player.name } });
       dispatch({ type: 'SET_GAME_ID', payload: data.gameId });
       dispatch({ type: 'SET_LOADING', payload: false });
@@ -166,7 +251,28 @@ export function GameProvider({ children }) {
 
     socket.on('playerListUpdate', (data) => {
       console.log('👥 Player list updated:', data);
+      if (data.summary) {
+        // Large rooms: a sampled summary per tick; only tracks advance the lobby sequence
+        dispatch({ type: 'SET_GAME_MODE', payload: 'large' });
+        dispatch({ type: 'MERGE_PLAYER_SAMPLE', payload: data });
+        return;
+      }
+      applyLobbyDelta(data.seq, () => {
+        if (data.added) {
+          dispatch({ type: 'ADD_PLAYER', payload: data.added });
+        }
+        if (data.removed) {
+          dispatch({ type: 'REMOVE_PLAYER', payload: data.removed });
+        }
+      });
+    });
+
+    socket.on('lobbySnapshot', (data) => {
+      console.log('📸 Lobby snapshot received:', data);
+      lobbySeqRef.current = data.seq;
       dispatch({ type: 'UPDATE_PLAYERS', payload: data.players });
+      dispatch({ type: 'SET_PLAYER_COUNT', payload: data.playerCount ?? null });
+      dispatch({ type: 'UPDATE_TRACKS', payload: data.tracks });
     });
 
     socket.on('playerLeft', (data) => {
@@ -176,7 +282,22 @@ export function GameProvider({ children }) {
 
     socket.on('trackAdded', (data) => {
       console.log('🎵 Track added:', data);
-      dispatch({ type: 'UPDATE_TRACKS', payload: data.tracks });
+      applyLobbyDelta(data.seq, () => {
+        dispatch({ type: 'ADD_TRACK', payload: data.track });
+      });
+    });
+
+    socket.on('tracksAdded', (data) => {
+      console.log('🎵 Tracks added:', data.tracks.length);
+      applyLobbyBatch(data.seq, data.tracks, (tracks) => {
+        dispatch({ type: 'ADD_TRACKS', payload: tracks });
+      });
+    });
+
+    // Our own addTracks / importPlaylist: the room gets tracksAdded, we also get what was skipped
+    socket.on('tracksImported', (data) => {
+      console.log('📥 Tracks imported:', data.added, 'skipped:', data.skipped);
+      dispatch({ type: 'ADD_USER_TRACKS', payload: data.tracks });
     });
 
     socket.on('playerReady', (data) => {
@@ -189,7 +310,13 @@ export function GameProvider({ children }) {
 
     socket.on('readyPlayersUpdate', (data) => {
       console.log('📥 readyPlayersUpdate received:', data);
-      dispatch({ type: 'SET_READY_PLAYERS', payload: data.readyPlayers });
+      if (data.readyPlayers) {
+        dispatch({ type: 'SET_READY_PLAYERS', payload: data.readyPlayers });
+      }
+      if (data.readyCount !== undefined) {
+        dispatch({ type: 'SET_READY_COUNT', payload: data.readyCount });
+        dispatch({ type: 'SET_PLAYER_COUNT', payload: data.totalPlayers });
+      }
     });
 
     socket.on('gameReadyToStart', (data) => {
@@ -204,7 +331,17 @@ export function GameProvider({ children }) {
 
     socket.on('newRound', (data) => {
       console.log('🔄 New round started:', data);
-      dispatch({ type: 'SET_CURRENT_TRACK', payload: data.track });
+      // A preloaded preview is already buffered, so playback starts at once
+      const track = data.track.preload
+        ? { ...data.track, preview_url: `${SERVER_URL}${data.track.preload.url}` }
+        : data.track;
+      dispatch({ type: 'SET_CURRENT_TRACK', payload: track });
+      if (data.preloadNext) {
+        const audio = new Audio();
+        audio.preload = 'auto';
+        audio.src = `${SERVER_URL}${data.preloadNext.url}`;
+        preloadRef.current = audio;
+      }
       dispatch({ type: 'SET_ROUND_INFO', payload: data.roundInfo });
       dispatch({ type: 'SET_TIME_LEFT', payload: data.timeLimit });
       dispatch({ type: 'SET_TOTAL_TIME_LIMIT', payload: data.timeLimit });
@@ -226,6 +363,10 @@ export function GameProvider({ children }) {
       dispatch({ type: 'UPDATE_LEADERBOARD', payload: data.finalLeaderboard });
     });
 
+    socket.on('finalRank', (data) => {
+      dispatch({ type: 'SET_MY_RANK', payload: data.rank });
+    });
+
     socket.on('gameFinished', (data) => {
       console.log('🎯 Game finished:', data);
       dispatch({ type: 'SET_GAME_STATUS', payload: 'gameFinished' });
@@ -261,6 +402,9 @@ export function GameProvider({ children }) {
     socket.on('guessResult', (data) => {
       console.log('🎯 Guess result received:', data);
       dispatch({ type: 'UPDATE_SCORE', payload: data.newScore });
+      if (data.rank) {
+        dispatch({ type: 'SET_MY_RANK', payload: data.rank });
+      }
       
       // Store detailed scoring information for display
       dispatch({ 
@@ -279,6 +423,9 @@ export function GameProvider({ children }) {
     socket.on('leaderboardUpdate', (data) => {
       console.log('🏆 Leaderboard updated:', data);
       dispatch({ type: 'UPDATE_LEADERBOARD', payload: data.leaderboard });
+      if (data.totalPlayers !== undefined) {
+        dispatch({ type: 'SET_PLAYER_COUNT', payload: data.totalPlayers });
+      }
     });
 
     return () => {
@@ -301,14 +448,25 @@ export function GameProvider({ children }) {
   }, [state.players, state.tracks, state.readyPlayers, state.gameStatus, state.isHost]);
 
   const actions = {
-    createGame: () => {
+    createGame: (mode = 'classic') => {
       dispatch({ type: 'SET_LOADING', payload: true });
-      state.socket?.emit('createGame');
+      state.socket?.emit('createGame', { mode });
     },
 
     joinGame: (gameId, playerName) => {
+      const socket = state.socket;
+      if (!socket) return;
       dispatch({ type: 'SET_LOADING', payload: true });
-      state.socket?.emit('joinGame', { gameId, playerName });
+      const join = () => socket.emit('joinGame', { gameId, playerName });
+
+      if (socket.connected && socket.io.opts.query?.gameId === gameId) {
+        join();
+        return;
+      }
+      // Reconnect with the gameId query so the server routes us to the worker that owns the game
+      socket.io.opts.query = { gameId };
+      socket.once('connect', join);
+      socket.disconnect().connect();
     },
 
     addTrack: (track) => {
@@ -330,6 +488,44 @@ export function GameProvider({ children }) {
       dispatch({ type: 'ADD_USER_TRACK', payload: track });
     },
 
+    addTracks: (tracks) => {
+      const currentGameId = state.gameId || window.location.pathname.split('/').pop();
+      
+      if (!currentGameId || !state.playerId) {
+        console.error('❌ Missing gameId or playerId for addTracks:', { 
+          gameId: currentGameId, 
+          playerId: state.playerId 
+        });
+        return;
+      }
+      
+      // Added tracks come back in tracksImported, after the server has applied the track limit
+      state.socket?.emit('addTracks', { 
+        gameId: currentGameId, 
+        tracks,
+        playerId: state.playerId 
+      });
+    },
+
+    importPlaylist: (source, sourceId) => {
+      const currentGameId = state.gameId || window.location.pathname.split('/').pop();
+      
+      if (!currentGameId || !state.playerId) {
+        console.error('❌ Missing gameId or playerId for importPlaylist:', { 
+          gameId: currentGameId, 
+          playerId: state.playerId 
+        });
+        return;
+      }
+      
+      state.socket?.emit('importPlaylist', { 
+        gameId: currentGameId, 
+        playerId: state.playerId,
+        source,
+        sourceId
+      });
+    },
+
     setReady: (isReady) => {
       const currentGameId = state.gameId || window.location.pathname.split('/').pop();
       
@@ -346,6 +542,8 @@ export function GameProvider({ children }) {
         playerId: state.playerId,
         isReady: isReady 
       });
+      // Large rooms only broadcast ready counts, so track our own flag locally
+      dispatch({ type: isReady ? 'ADD_READY_PLAYER' : 'REMOVE_READY_PLAYER', payload: state.playerId });
     },
 
     startGame: (difficulty = 'medium') => {
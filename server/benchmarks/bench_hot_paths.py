@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the game's hot paths: guess scoring, leaderboards,
+add_track, submit_guess, Deezer track conversion and emit encoding.
+
+Usage:
+  python -m benchmarks.bench_hot_paths                          # print results
+  python -m benchmarks.bench_hot_paths --save baseline.json     # record a baseline
+  python -m benchmarks.bench_hot_paths --compare baseline.json  # diff against one
+  python -m benchmarks.bench_hot_paths --filter leaderboard --deezer-payload search.json
+
+Deezer conversion runs on a generated response in the API's raw shape; pass
+bodies recorded with e.g. `curl 'https://api.deezer.com/search?q=love'` via
+--deezer-payload to add cases for them. --compare exits with status 1 when a
+case is slower than the baseline by more than --threshold percent. Compare
+baselines recorded on the same machine.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from socketio import packet
+
+from benchmarks.payloads import deezer_search_raw, guess_corpus, make_track
+from services.deezer_service import convert_track
+from services.game_manager import GameManager
+from services.serialization import OrjsonModule, orjson
+
+ROOM_SIZES = (8, 100, 500)
+TOP_K = 10
+
+
+class Case:
+    """One benchmark: `run(state)` performs `ops` operations on a fresh `setup()` state."""
+
+    def __init__(self, name: str, run: Callable[[Any], Any], ops: int = 1,
+                 setup: Optional[Callable[[], Any]] = None, info: Optional[dict] = None):
+        self.name = name
+        self.run = run
+        self.ops = ops
+        self.setup = setup
+        self.info = info or {}
+
+
+def make_game(players: int, tracks: int = 0, seed: int = 1):
+    """A GameManager without persistence holding one lobby game."""
+    rng = random.Random(seed)
+    manager = GameManager()
+    mode = 'large' if players > 8 else 'classic'
+
+    async def build():
+        game_id, _ = await manager.create_game('host', mode=mode)
+        player_ids = [
+            (await manager.join_game(game_id, f'player{i}', f'sid{i}'))['player_id']
+            for i in range(players)
+        ]
+        for i in range(tracks):
+            manager.add_track(game_id, make_track(rng), player_ids[i % players])
+        return game_id, player_ids
+
+    game_id, player_ids = asyncio.run(build())
+    return manager, game_id, player_ids
+
+
+def scoring_cases(size: int) -> List[Case]:
+    manager = GameManager()
+    cases = []
+    for kind, pairs in guess_corpus(size=size).items():
+        def run(_, pairs=pairs):
+            for guess, track in pairs:
+                manager.calculate_guess_score(guess, track)
+        cases.append(Case(f'calculate_guess_score[{kind}]', run, ops=len(pairs)))
+    return cases
+
+
+def leaderboard_cases() -> List[Case]:
+    cases = []
+    for size in ROOM_SIZES:
+        manager, game_id, player_ids = make_game(size)
+        rng = random.Random(size)
+        game = manager.get_game(game_id)
+        for player_id in player_ids:
+            score = rng.randint(0, 10000)
+            game['player_index'][player_id]['score'] = score
+            game['ranking'].update(player_id, score)
+
+        cases.append(Case(f'get_leaderboard[n={size}]',
+                          lambda _, m=manager, g=game_id: m.get_leaderboard(g)))
+        if size > TOP_K:
+            cases.append(Case(f'get_leaderboard[n={size},top={TOP_K}]',
+                              lambda _, m=manager, g=game_id: m.get_leaderboard(g, limit=TOP_K)))
+    return cases
+
+
+def add_track_cases() -> List[Case]:
+    cases = []
+    for size in ROOM_SIZES:
+        manager, game_id, player_ids = make_game(size)
+        game = manager.get_game(game_id)
+        rng = random.Random(size)
+        # Every player adds its full allowance of 10 tracks
+        additions = [(make_track(rng), player_id) for _ in range(10) for player_id in player_ids]
+
+        def setup(game=game):
+            game['tracks'] = []
+            game['track_counts'] = {}
+
+        def run(_, m=manager, g=game_id, additions=additions):
+            for track, player_id in additions:
+                m.add_track(g, track, player_id)
+
+        cases.append(Case(f'add_track[n={size}]', run, ops=len(additions), setup=setup))
+    return cases
+
+
+def submit_guess_cases() -> List[Case]:
+    cases = []
+    for size in ROOM_SIZES:
+        manager, game_id, player_ids = make_game(size, tracks=min(size, 20))
+        asyncio.run(manager.start_game(game_id))
+        manager.start_next_round(game_id)
+        game = manager.get_game(game_id)
+        # A realistic mix: every kind of guess, spread across the room
+        pairs = [pair for pairs in guess_corpus(size=size).values() for pair in pairs]
+        guesses = [(player_id, pairs[i % len(pairs)][0]) for i, player_id in enumerate(player_ids)]
+
+        def setup(game=game):
+            for player in game['players']:
+                player['current_guess'] = None
+            game['round_guesses'] = []
+            game['round_start_time'] = datetime.now(timezone.utc)
+
+        def run(_, m=manager, g=game_id, guesses=guesses):
+            for player_id, guess in guesses:
+                m.submit_guess(g, player_id, guess)
+
+        cases.append(Case(f'submit_guess[n={size}]', run, ops=len(guesses), setup=setup))
+    return cases
+
+
+def deezer_cases(paths: List[str]) -> List[Case]:
+    payloads = {'generated search': deezer_search_raw()}
+    for path in paths:
+        with open(path) as f:
+            body = json.load(f)
+        # A /track/{id} body is a single track; everything else lists them under 'data'
+        payloads[os.path.basename(path)] = body if 'data' in body else {'data': [body]}
+
+    cases = []
+    for label, body in payloads.items():
+        tracks = body['data']
+
+        def run(_, tracks=tracks):
+            [convert_track(track) for track in tracks if track.get('preview')]
+
+        cases.append(Case(f'convert_track[{label}]', run, ops=len(tracks)))
+    return cases
+
+
+def emit_payloads() -> Dict[str, Tuple[str, dict]]:
+    """Label -> (event, payload) for the hottest room emits, built by the game manager itself."""
+    manager, game_id, player_ids = make_game(8, tracks=20)
+    asyncio.run(manager.start_game(game_id))
+    new_round = manager.start_next_round(game_id)
+    large, large_id, _ = make_game(500)
+    players = manager.get_game(game_id)['players']
+    return {
+        'newRound': ('newRound', {
+            'track': new_round['track'],
+            'roundInfo': {'current': new_round['current_round'], 'total': new_round['total_rounds']},
+            'timeLimit': new_round['time_limit'],
+            'difficulty': 'medium'
+        }),
+        'playerListUpdate': ('playerListUpdate', {
+            'seq': 9,
+            'players': [{'id': p['id'], 'name': p['name'], 'score': p['score'],
+                         'correct_guesses': p['correct_guesses']} for p in players]
+        }),
+        f'leaderboardUpdate[top={TOP_K}]': ('leaderboardUpdate', {
+            'leaderboard': large.get_leaderboard(large_id, limit=TOP_K),
+            'totalPlayers': 500
+        }),
+        'gameEnd[n=500]': ('gameEnd', {'finalLeaderboard': large.get_leaderboard(large_id)}),
+    }
+
+
+def emit_cases() -> List[Case]:
+    # Encoded the way python-socketio does for a room emit: one text packet
+    modules = {'json': json}
+    if orjson is not None:
+        modules['orjson'] = OrjsonModule
+
+    cases = []
+    for module_name, module in modules.items():
+        packet_class = type('Packet', (packet.Packet,), {'json': module})
+        for label, (event, payload) in emit_payloads().items():
+            def run(_, packet_class=packet_class, event=event, payload=payload):
+                return packet_class(packet.EVENT, data=[event, payload], namespace='/').encode()
+
+            cases.append(Case(f'emit[{label}/{module_name}]', run,
+                              info={'bytes': len(run(None).encode())}))
+    return cases
+
+
+def get_cases(args) -> List[Case]:
+    cases = (scoring_cases(args.corpus_size) + leaderboard_cases() + add_track_cases()
+             + submit_guess_cases() + deezer_cases(args.deezer_payload) + emit_cases())
+    if args.filter:
+        cases = [case for case in cases if any(f in case.name for f in args.filter)]
+    return cases
+
+
+def measure(case: Case, repeat: int, min_time: float) -> dict:
+    """Best and median µs per operation over `repeat` samples of at least `min_time` seconds."""
+    samples = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        batches = 0
+        while elapsed < min_time:
+            state = case.setup() if case.setup else None
+            start = time.perf_counter()
+            case.run(state)
+            elapsed += time.perf_counter() - start
+            batches += 1
+        samples.append(elapsed / (batches * case.ops) * 1e6)
+    return {
+        'us_per_op': round(min(samples), 4),
+        'median_us': round(statistics.median(samples), 4),
+        'ops': case.ops,
+        **case.info
+    }
+
+
+def run(args) -> dict:
+    results = {}
+    for case in get_cases(args):
+        results[case.name] = measure(case, args.repeat, args.min_time)
+        print(f"{case.name:<44} {results[case.name]['us_per_op']:>10.2f} µs/op", file=sys.stderr)
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'orjson': getattr(orjson, '__version__', None),
+            'repeat': args.repeat,
+            'min_time': args.min_time,
+        },
+        'results': results
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, report_missing: bool = True) -> bool:
+    """Print each case against the baseline; True when any case regressed past `threshold` %."""
+    old, new = baseline['results'], current['results']
+    if baseline['meta'].get('python') != current['meta']['python']:
+        print(f"⚠️ Baseline was recorded on Python {baseline['meta'].get('python')}, "
+              f"this run is {current['meta']['python']}")
+
+    regressed = False
+    print(f"{'case':<44} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in new.items():
+        if name not in old:
+            print(f"{name:<44} {'-':>10} {result['us_per_op']:>10.2f} {'new':>8}")
+            continue
+        before, after = old[name]['us_per_op'], result['us_per_op']
+        change = (after - before) / before * 100 if before else 0.0
+        mark = ''
+        if change > threshold:
+            mark = ' ❌'
+            regressed = True
+        elif change < -threshold:
+            mark = ' ✅'
+        print(f"{name:<44} {before:>10.2f} {after:>10.2f} {change:>+7.1f}%{mark}")
+    for name in sorted(old.keys() - new.keys()) if report_missing else ():
+        print(f"{name:<44} {old[name]['us_per_op']:>10.2f} {'-':>10} {'missing':>8}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent slowdown that counts as a regression (default 10)')
+    parser.add_argument('--filter', action='append', default=[],
+                        help='only run cases whose name contains this (repeatable)')
+    parser.add_argument('--deezer-payload', action='append', default=[], metavar='PATH',
+                        help='recorded Deezer response body to convert (repeatable)')
+    parser.add_argument('--repeat', type=int, default=5, help='samples per case; the best one is reported')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per sample')
+    parser.add_argument('--corpus-size', type=int, default=200, help='guesses per kind for scoring cases')
+    args = parser.parse_args()
+
+    current = run(args)
+
+    regressed = False
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(json.load(f), current, args.threshold, report_missing=not args.filter)
+    else:
+        print(f"{'case':<44} {'µs/op':>10} {'median':>10} {'bytes':>8}")
+        for name, result in current['results'].items():
+            print(f"{name:<44} {result['us_per_op']:>10.2f} {result['median_us']:>10.2f} "
+                  f"{result.get('bytes', ''):>8}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f'💾 Saved {len(current["results"])} results to {args.save}')
+
+    if regressed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
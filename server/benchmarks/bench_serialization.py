@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compare wire encoders on the newRound, trackAdded and /api/deezer/search payloads.
+
+Usage: python -m benchmarks.bench_serialization [--number N]
+"""
+import argparse
+import json
+import timeit
+
+from benchmarks.payloads import new_round_payload, track_added_payload, search_response_payload
+from services.serialization import OrjsonModule, orjson, msgpack
+
+
+def get_encoders() -> dict:
+    # stdlib json with the separators python-socketio uses for text packets
+    encoders = {'json': lambda obj: json.dumps(obj, separators=(',', ':')).encode()}
+    if orjson is not None:
+        encoders['orjson'] = lambda obj: OrjsonModule.dumps(obj).encode()
+    if msgpack is not None:
+        encoders['msgpack'] = msgpack.packb
+    return encoders
+
+
+def get_payloads() -> dict:
+    track_added = track_added_payload()
+    return {
+        'newRound': new_round_payload(),
+        'trackAdded (full list)': track_added['full'],
+        'trackAdded (delta)': track_added['delta'],
+        '/api/deezer/search': search_response_payload(),
+    }
+
+
+def run(number: int = 2000) -> list:
+    results = []
+    encoders = get_encoders()
+    for payload_name, payload in get_payloads().items():
+        for encoder_name, encode in encoders.items():
+            seconds = min(timeit.repeat(lambda: encode(payload), number=number, repeat=3))
+            results.append({
+                'payload': payload_name,
+                'encoder': encoder_name,
+                'us_per_op': seconds / number * 1e6,
+                'bytes': len(encode(payload)),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=2000, help='encodes per timing run')
+    args = parser.parse_args()
+
+    print(f"{'payload':<24} {'encoder':<8} {'µs/op':>9} {'bytes':>8}")
+    for r in run(args.number):
+        print(f"{r['payload']:<24} {r['encoder']:<8} {r['us_per_op']:>9.2f} {r['bytes']:>8}")
+
+
+if __name__ == '__main__':
+    main()
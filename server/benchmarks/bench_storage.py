@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Run the same persistence and read workload against several storage backends.
+
+Usage:
+  python -m benchmarks.bench_storage memory:// sqlite:///bench.sqlite3 postgresql://localhost/tune_guesser
+
+Postgres targets need migrations/ applied first. Each run writes fresh ids,
+so it is safe to point at a development database.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+from services.storage import create_storage
+
+
+def make_game_rows(rng: random.Random, players_per_game: int):
+    game_id = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789') for _ in range(6))
+    game = {
+        'id': game_id,
+        'host_id': str(uuid.uuid4()),
+        'status': 'lobby',
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+    players = [
+        {'id': str(uuid.uuid4()), 'game_id': game_id, 'name': f'player{rng.randint(0, 999)}', 'score': 0}
+        for _ in range(players_per_game)
+    ]
+    return game, players
+
+
+async def bench_url(url: str, games: int, players_per_game: int, reads: int) -> dict:
+    storage = create_storage(url)
+    await storage.connect()
+    # Unseeded so repeated runs against one database don't collide
+    rng = random.Random()
+
+    try:
+        rows = [make_game_rows(rng, players_per_game) for _ in range(games)]
+
+        start = time.perf_counter()
+        await storage.insert('games', [game for game, _ in rows])
+        await storage.insert('players', [p for _, players in rows for p in players])
+        insert_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await storage.upsert('players', [
+            {**p, 'score': rng.randint(0, 5000), 'correct_guesses': rng.randint(0, 20)}
+            for _, players in rows for p in players
+        ])
+        await storage.update('games', {'status': 'finished'}, [game['id'] for game, _ in rows])
+        update_seconds = time.perf_counter() - start
+
+        game_ids = [game['id'] for game, _ in rows]
+        start = time.perf_counter()
+        for i in range(reads):
+            await storage.get_leaderboard(game_ids[i % len(game_ids)])
+        leaderboard_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(reads):
+            await storage.get_game(game_ids[i % len(game_ids)])
+        game_seconds = time.perf_counter() - start
+
+        total_players = games * players_per_game
+        return {
+            'backend': storage.name,
+            'insert_rows_per_s': (games + total_players) / insert_seconds,
+            'update_rows_per_s': (games + total_players) / update_seconds,
+            'leaderboard_reads_per_s': reads / leaderboard_seconds,
+            'game_reads_per_s': reads / game_seconds,
+        }
+    finally:
+        await storage.close()
+
+
+async def run(urls, games: int, players_per_game: int, reads: int):
+    return [await bench_url(url, games, players_per_game, reads) for url in urls]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('urls', nargs='+', help='DATABASE_URL values to compare')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--players', type=int, default=8, help='players per game')
+    parser.add_argument('--reads', type=int, default=1000)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.urls, args.games, args.players, args.reads))
+
+    print(f"{'backend':<10} {'insert rows/s':>14} {'update rows/s':>14} {'leaderboard/s':>14} {'game/s':>10}")
+    for r in results:
+        print(
+            f"{r['backend']:<10} {r['insert_rows_per_s']:>14.0f} {r['update_rows_per_s']:>14.0f} "
+            f"{r['leaderboard_reads_per_s']:>14.0f} {r['game_reads_per_s']:>10.0f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Socket.IO load generator: many simulated games played end to end.
+
+Usage:
+  python -m benchmarks.load_test --spawn --games 50 --players 4
+  python -m benchmarks.load_test --url http://127.0.0.1:5001 --server-pid 1234 --games 200 --json load.json
+
+Each game is one host and --players player clients, each with its own
+Socket.IO connection. They play createGame, joinGame, a Deezer search,
+addTrack, setReady, startGame, then per round submitGuess and nextRound,
+and finally revealResults. Every client waits a random think time (up to
+--think-time seconds) before each action. --games games run at once, and
+each slot plays --iterations games back to back.
+
+--spawn starts a Deezer stand-in (tools/deezer_standin.py) and a server
+(`uvicorn main:socket_app`, in-memory storage) on free local ports and stops
+them at the end. Otherwise point --url at a running server whose
+DEEZER_API_URL is a stand-in, and pass --server-pid to sample its CPU and RSS.
+
+The report has p50/p99 latency per event and the response it waits for,
+events sent and received per second, and the server's CPU and peak RSS.
+Think times far below a second trip the per-socket rate limits (see
+SOCKET_RATE_LIMITS); raise them for stress runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import socketio
+
+from benchmarks.payloads import ARTISTS, TITLES, WORDS, make_track
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional, /proc is used instead
+    psutil = None
+
+
+class LoadError(Exception):
+    pass
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.timeouts: Counter = Counter()
+        self.sent = 0
+        self.received: Counter = Counter()
+        self.games_finished = 0
+        self.games_failed = 0
+
+    def record(self, pair: str, seconds: float) -> None:
+        self.latencies[pair].append(seconds)
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class SimClient:
+    """One simulated browser: a Socket.IO connection plus request/response timing."""
+
+    def __init__(self, url: str, stats: Stats, timeout: float):
+        self.url = url
+        self.stats = stats
+        self.timeout = timeout
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on('*', self._on_event)
+        # (response events, payload filter, future)
+        self.waiters: List[Tuple[Tuple[str, ...], Optional[Callable[[dict], bool]], asyncio.Future]] = []
+
+    async def _on_event(self, event: str, data=None) -> None:
+        self.stats.received[event] += 1
+        for events, match, future in self.waiters:
+            if future.done():
+                continue
+            if event == 'error' or (event in events and (match is None or match(data))):
+                future.set_result((event, data))
+
+    def expect(self, *events: str, match: Optional[Callable[[dict], bool]] = None) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((events, match, future))
+        return future
+
+    async def wait(self, future: asyncio.Future, label: str) -> Tuple[str, dict]:
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts[label] += 1
+            raise LoadError(f'timed out waiting for {label}')
+        finally:
+            self.waiters = [w for w in self.waiters if w[2] is not future]
+
+    async def request(self, event: str, data: Optional[dict], *responses: str,
+                      match: Optional[Callable[[dict], bool]] = None) -> Tuple[str, dict]:
+        """Emit `event` and wait for the first of `responses` that passes `match` (or an error)."""
+        future = self.expect(*responses, match=match)
+        label = f"{event}→{'|'.join(responses)}"
+        start = time.perf_counter()
+        await self.sio.emit(event, data)
+        self.stats.sent += 1
+        response, payload = await self.wait(future, label)
+        if response == 'error':
+            self.stats.errors[f"{event}: {(payload or {}).get('message')}"] += 1
+            raise LoadError(f"{event} failed: {(payload or {}).get('message')}")
+        self.stats.record(f'{event}→{response}', time.perf_counter() - start)
+        return response, payload
+
+    async def connect(self, game_id: Optional[str] = None) -> None:
+        start = time.perf_counter()
+        # The gameId query lets a proxy route the socket to the worker that owns the game
+        query = f'?gameId={game_id}' if game_id else ''
+        await self.sio.connect(self.url + query, transports=['websocket'], wait_timeout=self.timeout)
+        self.stats.record('connect', time.perf_counter() - start)
+
+    async def disconnect(self) -> None:
+        if self.sio.connected:
+            await self.sio.disconnect()
+
+
+class GameRunner:
+    def __init__(self, args, stats: Stats, http: aiohttp.ClientSession):
+        self.args = args
+        self.stats = stats
+        self.http = http
+        self.rng = random.Random()
+
+    async def think(self) -> None:
+        if self.args.think_time > 0:
+            await asyncio.sleep(self.rng.uniform(0, self.args.think_time))
+
+    async def search(self) -> List[dict]:
+        query = self.rng.choice(ARTISTS + WORDS)
+        start = time.perf_counter()
+        try:
+            async with self.http.get(f'{self.args.url}/api/deezer/search',
+                                     params={'q': query, 'limit': 20}) as response:
+                body = await response.json()
+                if response.status != 200:
+                    self.stats.errors[f"search: HTTP {response.status}"] += 1
+                    return []
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats.errors[f'search: {type(e).__name__}'] += 1
+            return []
+        self.stats.record('GET /api/deezer/search', time.perf_counter() - start)
+        return body.get('tracks', [])
+
+    async def pick_tracks(self) -> List[dict]:
+        found = await self.search() if self.args.search else []
+        if len(found) < self.args.tracks:
+            # No stand-in, or a thin result: fall back to generated tracks
+            found += [make_track(self.rng) for _ in range(self.args.tracks)]
+        return self.rng.sample(found, self.args.tracks)
+
+    def guess_for(self, track: Optional[dict], previous: Optional[str]) -> str:
+        # A repeat of the previous guess inside the dedupe window would be dropped unanswered
+        while True:
+            if track and self.rng.random() < self.args.accuracy:
+                guess = f"{track['artists'][0]['name']} {track['name']}"
+                if guess == previous:
+                    guess = f"{track['name']} by {track['artists'][0]['name']}"
+            else:
+                guess = self.rng.choice(TITLES).lower() if self.rng.random() < 0.5 else self.rng.choice(WORDS)
+            if guess != previous:
+                return guess
+
+    async def play(self) -> None:
+        args = self.args
+        host = SimClient(args.url, self.stats, args.timeout)
+        players = [SimClient(args.url, self.stats, args.timeout) for _ in range(args.players)]
+        tracks: Dict[str, dict] = {}
+        last_guesses: Dict[str, str] = {}
+        try:
+            await host.connect()
+            _, created = await host.request('createGame', {'mode': args.mode}, 'gameCreated')
+            game_id = created['gameId']
+
+            async def join(index: int, player: SimClient) -> str:
+                await player.connect(game_id)
+                await self.think()
+                _, joined = await player.request('joinGame', {
+                    'gameId': game_id, 'playerName': f'load{index}'
+                }, 'playerJoined')
+                return joined['playerId']
+
+            player_ids = await asyncio.gather(*(join(i, p) for i, p in enumerate(players)))
+
+            async def lobby(player: SimClient, player_id: str) -> None:
+                # Room broadcasts: wait for the one that carries this player's change
+                def mine(track_id):
+                    return lambda added: any(
+                        t['id'] == track_id and t['added_by'] == player_id
+                        for t in added.get('tracks', [added.get('track')]) if t
+                    )
+
+                for track in await self.pick_tracks():
+                    await self.think()
+                    tracks[track['id']] = track
+                    await player.request('addTrack', {
+                        'gameId': game_id, 'playerId': player_id, 'track': track
+                    }, 'tracksAdded' if args.mode == 'large' else 'trackAdded', match=mine(track['id']))
+                await self.think()
+                # Large rooms only send counts, so any update after ours will do
+                await player.request('setReady', {
+                    'gameId': game_id, 'playerId': player_id, 'isReady': True
+                }, 'readyPlayersUpdate',
+                    match=lambda update: player_id in update.get('readyPlayers', [player_id]))
+
+            await asyncio.gather(*(lobby(p, pid) for p, pid in zip(players, player_ids)))
+
+            # Players learn about each round from the broadcast, not from their own request
+            rounds = [p.expect('newRound') for p in players]
+            _, round_data = await host.request('startGame', {
+                'gameId': game_id, 'difficulty': args.difficulty
+            }, 'newRound')
+
+            while True:
+                async def guess(player: SimClient, player_id: str, future: asyncio.Future) -> None:
+                    _, data = await player.wait(future, 'newRound (broadcast)')
+                    await self.think()
+                    guess = self.guess_for(tracks.get(data['track']['id']), last_guesses.get(player_id))
+                    last_guesses[player_id] = guess
+                    await player.request('submitGuess', {
+                        'gameId': game_id, 'playerId': player_id, 'guess': guess
+                    }, 'guessResult')
+
+                await asyncio.gather(*(guess(p, pid, f) for p, pid, f in zip(players, player_ids, rounds)))
+                rounds = [p.expect('newRound') for p in players]
+                await self.think()
+                response, round_data = await host.request('nextRound', {'gameId': game_id},
+                                                          'newRound', 'gameFinished')
+                if response == 'gameFinished':
+                    break
+
+            await host.request('revealResults', {'gameId': game_id}, 'gameEnd')
+            self.stats.games_finished += 1
+        except (LoadError, socketio.exceptions.ConnectionError) as e:
+            self.stats.games_failed += 1
+            if args.verbose:
+                print(f'❌ Game failed: {e}', file=sys.stderr)
+        finally:
+            await asyncio.gather(*(c.disconnect() for c in [host, *players]), return_exceptions=True)
+
+
+class ProcessSampler:
+    """CPU and RSS of the server process, sampled once per `interval`."""
+
+    def __init__(self, pid: Optional[int], interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.cpu: List[float] = []
+        self.rss: List[int] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def read(self) -> Optional[Tuple[float, int]]:
+        """Total CPU seconds and RSS bytes, via psutil or /proc."""
+        if psutil is not None:
+            process = psutil.Process(self.pid)
+            times = process.cpu_times()
+            return times.user + times.system, process.memory_info().rss
+        try:
+            with open(f'/proc/{self.pid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            with open(f'/proc/{self.pid}/statm') as f:
+                pages = int(f.read().split()[1])
+        except OSError:
+            return None
+        ticks = os.sysconf('SC_CLK_TCK')
+        return (int(fields[11]) + int(fields[12])) / ticks, pages * os.sysconf('SC_PAGE_SIZE')
+
+    async def _run(self) -> None:
+        last = self.read()
+        last_time = time.monotonic()
+        while last is not None:
+            await asyncio.sleep(self.interval)
+            current, now = self.read(), time.monotonic()
+            if current is None:
+                return
+            self.cpu.append((current[0] - last[0]) / (now - last_time) * 100)
+            self.rss.append(current[1])
+            last, last_time = current, now
+
+    def start(self) -> None:
+        if self.pid:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def summary(self) -> Optional[dict]:
+        if not self.cpu:
+            return None
+        return {
+            'cpu_percent_mean': round(sum(self.cpu) / len(self.cpu), 1),
+            'cpu_percent_max': round(max(self.cpu), 1),
+            'rss_mb_max': round(max(self.rss) / 2**20, 1),
+            'rss_mb_last': round(self.rss[-1] / 2**20, 1),
+        }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def wait_for_health(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.monotonic() < deadline:
+            try:
+                async with http.get(f'{url}/api/health') as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit(f'❌ Server at {url} did not become healthy in {timeout:.0f}s')
+
+
+def spawn(args) -> List[subprocess.Popen]:
+    """Start a Deezer stand-in and a server on free ports; points args.url at the server."""
+    server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    deezer_port, server_port = free_port(), free_port()
+    output = None if args.verbose else subprocess.DEVNULL
+    standin = subprocess.Popen(
+        [sys.executable, '-m', 'tools.deezer_standin', '--port', str(deezer_port),
+         '--latency-ms', str(args.deezer_latency_ms)],
+        cwd=server_dir, stdout=output, stderr=output
+    )
+    env = {
+        **os.environ,
+        'DEEZER_API_URL': f'http://127.0.0.1:{deezer_port}',
+        'DATABASE_URL': os.environ.get('DATABASE_URL', 'memory://'),
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:socket_app', '--host', '127.0.0.1',
+         '--port', str(server_port), '--log-level', 'warning'],
+        cwd=server_dir, env=env, stdout=output, stderr=output
+    )
+    args.url = f'http://127.0.0.1:{server_port}'
+    args.server_pid = server.pid
+    return [server, standin]
+
+
+async def run(args) -> dict:
+    stats = Stats()
+    sampler = ProcessSampler(args.server_pid)
+    await wait_for_health(args.url)
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    sampler.start()
+    started = time.perf_counter()
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=args.timeout)) as http:
+        async def slot(index: int) -> None:
+            # Stagger the starts over --ramp seconds
+            await asyncio.sleep(args.ramp * index / max(1, args.games))
+            for _ in range(args.iterations):
+                await GameRunner(args, stats, http).play()
+
+        await asyncio.gather(*(slot(i) for i in range(args.games)))
+
+    elapsed = time.perf_counter() - started
+    await sampler.stop()
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    client_cpu = (usage_after.ru_utime + usage_after.ru_stime) - (usage_before.ru_utime + usage_before.ru_stime)
+
+    received = sum(stats.received.values())
+    return {
+        'config': {key: getattr(args, key) for key in (
+            'games', 'players', 'tracks', 'iterations', 'mode', 'difficulty', 'think_time', 'accuracy', 'search'
+        )},
+        'duration_s': round(elapsed, 2),
+        'games': {'finished': stats.games_finished, 'failed': stats.games_failed},
+        'throughput': {
+            'sent_per_s': round(stats.sent / elapsed, 1),
+            'received_per_s': round(received / elapsed, 1),
+            'received_by_event': dict(stats.received.most_common()),
+        },
+        'latency_ms': {
+            pair: {
+                'count': len(values),
+                'p50': round(percentile(values, 0.50) * 1000, 2),
+                'p99': round(percentile(values, 0.99) * 1000, 2),
+                'max': round(max(values) * 1000, 2),
+            }
+            for pair, values in sorted(stats.latencies.items())
+        },
+        'errors': dict(stats.errors),
+        'timeouts': dict(stats.timeouts),
+        'server': sampler.summary(),
+        # The generator itself can saturate a core before the server does
+        'client_cpu_percent': round(client_cpu / elapsed * 100, 1),
+    }
+
+
+def print_report(report: dict) -> None:
+    games = report['games']
+    print(f"\n🎮 {games['finished']} games finished, {games['failed']} failed in {report['duration_s']}s")
+    print(f"{'event → response':<34} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for pair, row in report['latency_ms'].items():
+        print(f"{pair:<34} {row['count']:>7} {row['p50']:>9.2f} {row['p99']:>9.2f} {row['max']:>9.2f}")
+    throughput = report['throughput']
+    print(f"\n📤 {throughput['sent_per_s']} events/s sent, 📥 {throughput['received_per_s']} events/s received")
+    server = report['server']
+    if server:
+        print(f"🖥️  Server CPU {server['cpu_percent_mean']}% mean, {server['cpu_percent_max']}% max; "
+              f"RSS {server['rss_mb_max']} MB max")
+    print(f"🧪 Load generator CPU {report['client_cpu_percent']}%")
+    for label, count in {**report['errors'], **report['timeouts']}.items():
+        print(f'⚠️ {count} x {label}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5001', help='server to load')
+    parser.add_argument('--spawn', action='store_true', help='start a local server and Deezer stand-in')
+    parser.add_argument('--server-pid', type=int, help='server process to sample CPU/RSS from')
+    parser.add_argument('--games', type=int, default=10, help='concurrent games')
+    parser.add_argument('--iterations', type=int, default=1, help='games played back to back per slot')
+    parser.add_argument('--players', type=int, default=4, help='players per game, besides the host')
+    parser.add_argument('--tracks', type=int, default=2, help='tracks each player adds (max 10)')
+    parser.add_argument('--mode', choices=('classic', 'large'), default='classic')
+    parser.add_argument('--difficulty', choices=('easy', 'medium', 'hard'), default='easy')
+    parser.add_argument('--think-time', type=float, default=1.0, help='max seconds before each action')
+    parser.add_argument('--accuracy', type=float, default=0.5, help='share of guesses that are right')
+    parser.add_argument('--no-search', dest='search', action='store_false',
+                        help='skip /api/deezer/search and add generated tracks')
+    parser.add_argument('--ramp', type=float, default=1.0, help='seconds over which games start')
+    parser.add_argument('--timeout', type=float, default=10.0, help='seconds to wait for a response')
+    parser.add_argument('--deezer-latency-ms', type=float, default=40.0, help='stand-in latency with --spawn')
+    parser.add_argument('--json', metavar='PATH', help='also write the report as JSON')
+    parser.add_argument('--verbose', action='store_true', help='show failures and spawned process output')
+    args = parser.parse_args()
+
+    processes = spawn(args) if args.spawn else []
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
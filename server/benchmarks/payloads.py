@@ -0,0 +1,194 @@
+"""Realistic payloads for the hot Socket.IO events and REST responses."""
+import random
+import uuid
+
+ARTISTS = [
+    'Daft Punk', 'Beyoncé', 'The Weeknd', 'Arctic Monkeys', 'Billie Eilish',
+    'Stromae', 'Rosalía', 'Kendrick Lamar', 'Fleetwood Mac', 'Dua Lipa',
+]
+# A hit by each of ARTISTS, in the same order, for guess-scoring corpora
+TITLES = [
+    'Get Lucky (feat. Pharrell Williams)', 'Halo', 'Blinding Lights', 'Do I Wanna Know?',
+    'bad guy', 'Papaoutai', 'DESPECHÁ', 'HUMBLE.', 'Dreams - 2004 Remaster', "Don't Start Now",
+]
+WORDS = [
+    'love', 'night', 'dance', 'heart', 'fire', 'dream', 'blue', 'summer',
+    'alone', 'forever', 'wild', 'city', 'lights', 'gold', 'rain', 'again',
+]
+
+
+def make_track(rng: random.Random, added_by: str = None) -> dict:
+    """A track in the converted (Spotify-like) shape used by DeezerService and GameManager."""
+    track_id = str(rng.randint(10**8, 10**9))
+    album_id = str(rng.randint(10**6, 10**7))
+    cover = f'https://e-cdns-images.dzcdn.net/images/cover/{uuid.UUID(int=rng.getrandbits(128)).hex}'
+    track = {
+        'id': track_id,
+        'name': ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 4))),
+        'artists': [{'id': str(rng.randint(1000, 99999)), 'name': rng.choice(ARTISTS)}],
+        'album': {
+            'id': album_id,
+            'name': ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 3))),
+            'images': [
+                {'url': f'{cover}/1000x1000-000000-80-0-0.jpg', 'width': 300, 'height': 300},
+                {'url': f'{cover}/250x250-000000-80-0-0.jpg', 'width': 250, 'height': 250},
+                {'url': f'{cover}/56x56-000000-80-0-0.jpg', 'width': 120, 'height': 120},
+            ],
+        },
+        'preview_url': f'https://cdns-preview-{rng.randint(0, 9)}.dzcdn.net/stream/c-{uuid.UUID(int=rng.getrandbits(128)).hex}-8.mp3',
+        'duration_ms': rng.randint(120, 360) * 1000,
+    }
+    if added_by:
+        track['added_by'] = added_by
+    return track
+
+
+def new_round_payload(seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    track = make_track(rng)
+    return {
+        'track': {
+            'id': track['id'],
+            'preview_url': track['preview_url'],
+            'album': track['album'],
+        },
+        'roundInfo': {'current': 3, 'total': 20},
+        'timeLimit': 15,
+        'difficulty': 'medium',
+    }
+
+
+def track_added_payload(seed: int = 1, total_tracks: int = 80) -> dict:
+    """Returns the legacy full-list payload and the delta payload for comparison."""
+    rng = random.Random(seed)
+    players = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(8)]
+    tracks = [make_track(rng, players[i % len(players)]) for i in range(total_tracks)]
+    return {
+        'full': {'tracks': tracks},
+        'delta': {'seq': total_tracks + len(players), 'track': tracks[-1]},
+    }
+
+
+def search_response_payload(seed: int = 1, limit: int = 20) -> dict:
+    rng = random.Random(seed)
+    tracks = []
+    for _ in range(limit):
+        track = make_track(rng)
+        track['popularity'] = rng.randint(100000, 999999)
+        track['explicit'] = False
+        tracks.append(track)
+    return {'tracks': tracks, 'total': rng.randint(100, 5000), 'query': 'love'}
+
+
+def deezer_track(rng: random.Random) -> dict:
+    """A track as the Deezer API returns it from /search, /chart and /artist/{id}/top."""
+    track_id = rng.randint(10**8, 10**9)
+    artist_id = rng.randint(1000, 99999)
+    album_id = rng.randint(10**6, 10**7)
+    index = rng.randrange(len(ARTISTS))
+    cover_md5 = uuid.UUID(int=rng.getrandbits(128)).hex
+    picture_md5 = uuid.UUID(int=rng.getrandbits(128)).hex
+    cover = f'https://e-cdns-images.dzcdn.net/images/cover/{cover_md5}'
+    picture = f'https://e-cdns-images.dzcdn.net/images/artist/{picture_md5}'
+    title = TITLES[index]
+    return {
+        'id': track_id,
+        'readable': True,
+        'title': title,
+        'title_short': title.split(' (')[0].split(' - ')[0],
+        'title_version': '',
+        'link': f'https://www.deezer.com/track/{track_id}',
+        'duration': rng.randint(120, 360),
+        'rank': rng.randint(100000, 999999),
+        'explicit_lyrics': rng.random() < 0.2,
+        'explicit_content_lyrics': rng.choice([0, 1, 6]),
+        'explicit_content_cover': rng.choice([0, 2]),
+        # Some catalogue entries have no preview and are filtered out
+        'preview': '' if rng.random() < 0.1 else (
+            f'https://cdns-preview-{rng.randint(0, 9)}.dzcdn.net/stream/c-{uuid.UUID(int=rng.getrandbits(128)).hex}-8.mp3'
+        ),
+        'md5_image': cover_md5,
+        'artist': {
+            'id': artist_id,
+            'name': ARTISTS[index],
+            'link': f'https://www.deezer.com/artist/{artist_id}',
+            'picture': f'https://api.deezer.com/artist/{artist_id}/image',
+            'picture_small': f'{picture}/56x56-000000-80-0-0.jpg',
+            'picture_medium': f'{picture}/250x250-000000-80-0-0.jpg',
+            'picture_big': f'{picture}/500x500-000000-80-0-0.jpg',
+            'picture_xl': f'{picture}/1000x1000-000000-80-0-0.jpg',
+            'tracklist': f'https://api.deezer.com/artist/{artist_id}/top?limit=50',
+            'type': 'artist',
+        },
+        'album': {
+            'id': album_id,
+            'title': ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 3))),
+            'cover': f'https://api.deezer.com/album/{album_id}/image',
+            'cover_small': f'{cover}/56x56-000000-80-0-0.jpg',
+            'cover_medium': f'{cover}/250x250-000000-80-0-0.jpg',
+            'cover_big': f'{cover}/500x500-000000-80-0-0.jpg',
+            'cover_xl': f'{cover}/1000x1000-000000-80-0-0.jpg',
+            'md5_image': cover_md5,
+            'tracklist': f'https://api.deezer.com/album/{album_id}/tracks',
+            'type': 'album',
+        },
+        'type': 'track',
+    }
+
+
+def deezer_search_raw(seed: int = 1, limit: int = 25) -> dict:
+    """A raw Deezer /search response body, before DeezerService converts it."""
+    rng = random.Random(seed)
+    return {
+        'data': [deezer_track(rng) for _ in range(limit)],
+        'total': rng.randint(100, 5000),
+        'next': f'https://api.deezer.com/search?q=love&limit={limit}&index={limit}',
+    }
+
+
+def _typo(rng: random.Random, text: str) -> str:
+    """Drop, double or swap one letter, the way guesses typed on a phone go wrong."""
+    positions = [i for i, c in enumerate(text) if c.isalpha()]
+    if len(positions) < 2:
+        return text
+    i = rng.choice(positions[:-1])
+    kind = rng.randrange(3)
+    if kind == 0:
+        return text[:i] + text[i + 1:]
+    if kind == 1:
+        return text[:i] + text[i] + text[i:]
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+GUESS_KINDS = ('exact', 'title_only', 'artist_only', 'typo', 'partial', 'wrong')
+
+
+def make_guess(rng: random.Random, kind: str, artist: str, title: str) -> str:
+    """A guess of one of GUESS_KINDS for the track `title` by `artist`."""
+    short = title.split(' (')[0].split(' - ')[0]
+    if kind == 'exact':
+        return f'{artist} - {title}'
+    if kind == 'title_only':
+        return short.lower()
+    if kind == 'artist_only':
+        return artist.lower()
+    if kind == 'typo':
+        return _typo(rng, f'{artist.lower()} {short.lower()}')
+    if kind == 'partial':
+        return rng.choice(short.split())
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+
+
+def guess_corpus(seed: int = 1, size: int = 200) -> dict:
+    """(guess, track) pairs per kind of guess, for calculate_guess_score."""
+    rng = random.Random(seed)
+    corpus = {kind: [] for kind in GUESS_KINDS}
+    for _ in range(size):
+        index = rng.randrange(len(ARTISTS))
+        artist, title = ARTISTS[index], TITLES[index]
+        track = make_track(rng)
+        track['name'] = title
+        track['artists'][0]['name'] = artist
+        for kind in GUESS_KINDS:
+            corpus[kind].append((make_guess(rng, kind, artist, title), track))
+    return corpus
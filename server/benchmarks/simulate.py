@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Whole games simulated in virtual time, against GameManager directly.
+
+Usage:
+  python -m benchmarks.simulate --games 2000 --players 6 --difficulty hard
+  python -m benchmarks.simulate --games 20000 --workers 8
+  python -m benchmarks.simulate --games 500 --seed 7 --json sim.json
+
+Each game runs the real GameManager flow (create, join, addTrack, ready,
+start, rounds of guesses, end) on a VirtualClock with a seeded RNG, so a
+game that takes minutes on a server finishes in milliseconds and the same
+--seed always gives the same games. Rounds run like on the server: a
+time limit on the clock, guesses submitted by simulated players while it
+runs, then --reveal-time seconds before the host starts the next round.
+
+Players differ in skill (the chance they know a track, spread evenly
+between --skill-min and --skill-max) and reaction time (lognormal around
+--reaction). Players who know a track guess it exactly, by title or
+artist alone, or with a typo; the others guess part of the title or
+something wrong. The report shows how final scores and wins follow skill,
+which is what scoring changes should be checked against.
+
+--concurrency games share one clock and one GameManager, as they would on
+a worker, so the run also models a worker's game load in virtual time.
+Batches of them are seeded separately and spread over --workers processes;
+scoring guesses is most of the work, so throughput scales with cores.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean
+from typing import List, Optional, Tuple
+
+from benchmarks.payloads import ARTISTS, TITLES, make_guess, make_track
+from services.clock import VirtualClock
+from services.game_manager import GameManager
+
+KNOWN_GUESSES = (('exact', 0.4), ('title_only', 0.25), ('artist_only', 0.15), ('typo', 0.2))
+UNKNOWN_GUESSES = (('partial', 0.3), ('wrong', 0.7))
+
+
+def _pick(rng: random.Random, weighted: Tuple[Tuple[str, float], ...]) -> str:
+    kinds, weights = zip(*weighted)
+    return rng.choices(kinds, weights)[0]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class PlayerModel:
+    def __init__(self, skill: float, reaction: float, miss_rate: float = 0.05):
+        self.skill = skill
+        self.reaction = reaction
+        self.miss_rate = miss_rate
+
+    def plan(self, rng: random.Random, track: dict) -> Optional[Tuple[float, str]]:
+        """Seconds into the round and the guess, or None when the player sits the round out."""
+        if rng.random() < self.miss_rate:
+            return None
+        delay = rng.lognormvariate(math.log(self.reaction), 0.5)
+        kind = _pick(rng, KNOWN_GUESSES if rng.random() < self.skill else UNKNOWN_GUESSES)
+        return delay, make_guess(rng, kind, track['artists'][0]['name'], track['name'])
+
+
+class GameSimulation:
+    """One game played through GameManager on a virtual clock."""
+
+    def __init__(self, manager: GameManager, clock: VirtualClock, rng: random.Random, models: List[PlayerModel],
+                 difficulty: str = 'medium', tracks_per_player: int = 3, reveal_time: float = 3.0):
+        self.manager = manager
+        self.clock = clock
+        self.rng = rng
+        self.models = models
+        self.difficulty = difficulty
+        self.tracks_per_player = tracks_per_player
+        self.reveal_time = reveal_time
+        self.stats = {'rounds': 0, 'guesses': 0, 'late': 0, 'skipped': 0}
+
+    def make_track(self) -> dict:
+        index = self.rng.randrange(len(ARTISTS))
+        track = make_track(self.rng)
+        track['name'] = TITLES[index]
+        track['artists'][0]['name'] = ARTISTS[index]
+        return track
+
+    async def play_round(self, game_id: str, player_ids: List[str], time_limit: int) -> None:
+        track = self.manager.games[game_id]['current_track']
+        plans = []
+        for player_id, model in zip(player_ids, self.models):
+            plan = model.plan(self.rng, track)
+            if plan is None:
+                self.stats['skipped'] += 1
+            else:
+                plans.append((plan[0], player_id, plan[1]))
+
+        # Players don't react to each other, so rather than a task per player
+        # the round sleeps from one guess to the next, then to the countdown's end
+        elapsed = 0.0
+        for delay, player_id, guess in sorted(plans):
+            await self.clock.sleep(delay - elapsed)
+            elapsed = delay
+            try:
+                self.manager.submit_guess(game_id, player_id, guess)
+                self.stats['guesses'] += 1
+            except ValueError:
+                # Time limit exceeded
+                self.stats['late'] += 1
+        await self.clock.sleep(time_limit - elapsed)
+
+    async def play(self) -> dict:
+        manager = self.manager
+        started = self.clock.elapsed
+        host_socket = f'sim-{id(self)}-host'
+        sockets = [f'sim-{id(self)}-{index}' for index in range(len(self.models))]
+        game_id, _ = await manager.create_game(host_socket, self.difficulty)
+
+        player_ids = []
+        for index, socket_id in enumerate(sockets):
+            result = await manager.join_game(game_id, f'Player {index + 1}', socket_id)
+            player_ids.append(result['player_id'])
+        for player_id in player_ids:
+            for _ in range(self.tracks_per_player):
+                manager.add_track(game_id, self.make_track(), player_id)
+            manager.set_ready(game_id, player_id, True)
+        await manager.start_game(game_id)
+
+        while True:
+            round_data = manager.start_next_round(game_id)
+            if round_data['game_finished']:
+                break
+            self.stats['rounds'] += 1
+            await self.play_round(game_id, player_ids, round_data['time_limit'])
+            await self.clock.sleep(self.reveal_time)
+
+        scores = {player['id']: player['score'] for player in manager.games[game_id]['players']}
+        await manager.end_game(game_id)
+        # Everyone leaves, the host last, which drops the game from memory
+        for socket_id in sockets + [host_socket]:
+            await manager.remove_player(socket_id)
+        return {
+            'scores': [scores[player_id] for player_id in player_ids],
+            'virtual_seconds': self.clock.elapsed - started,
+            **self.stats
+        }
+
+
+def make_models(players: int, skill_min: float, skill_max: float, reaction: float) -> List[PlayerModel]:
+    step = (skill_max - skill_min) / max(1, players - 1)
+    return [PlayerModel(skill_min + step * index, reaction) for index in range(players)]
+
+
+async def simulate_batch(seed: int, games: int, models: List[PlayerModel], **options) -> List[dict]:
+    """`games` games at once on one clock and one GameManager."""
+    clock = VirtualClock()
+    rng = random.Random(seed)
+    manager = GameManager(clock=clock, rng=rng)
+
+    async def run_all():
+        return await clock.join([
+            clock.spawn(GameSimulation(manager, clock, rng, models, **options).play()) for _ in range(games)
+        ])
+
+    return await clock.run(run_all())
+
+
+def run_batch(seed: int, games: int, models: List[PlayerModel], options: dict) -> List[dict]:
+    return asyncio.run(simulate_batch(seed, games, models, **options))
+
+
+def summarize(results: List[dict], models: List[PlayerModel], wall_seconds: float) -> dict:
+    players = []
+    for index, model in enumerate(models):
+        scores = [game['scores'][index] for game in results]
+        wins = sum(1 for game in results if game['scores'][index] == max(game['scores']))
+        players.append({
+            'player': index + 1,
+            'skill': round(model.skill, 3),
+            'mean_score': round(mean(scores), 1),
+            'p90_score': _percentile(scores, 0.9),
+            'win_rate': round(wins / len(results), 3)
+        })
+    margins = [sorted(game['scores'])[-1] - sorted(game['scores'])[-2] for game in results if len(game['scores']) > 1]
+    virtual_seconds = sum(game['virtual_seconds'] for game in results)
+    totals = {key: sum(game[key] for game in results) for key in ('rounds', 'guesses', 'late', 'skipped')}
+    return {
+        'games': len(results),
+        **totals,
+        'wall_seconds': round(wall_seconds, 3),
+        'games_per_second': round(len(results) / wall_seconds, 1),
+        'virtual_hours': round(virtual_seconds / 3600, 2),
+        'speedup': round(virtual_seconds / wall_seconds),
+        'winning_margin_p50': _percentile(margins, 0.5),
+        'players': players
+    }
+
+
+def print_report(summary: dict) -> None:
+    print(f"{summary['games']} games, {summary['rounds']} rounds, {summary['guesses']} guesses "
+          f"({summary['late']} late, {summary['skipped']} rounds sat out)")
+    print(f"{summary['wall_seconds']}s wall, {summary['games_per_second']} games/s, "
+          f"{summary['virtual_hours']}h of play simulated ({summary['speedup']}x real time)")
+    print(f"Median winning margin: {summary['winning_margin_p50']} points")
+    print(f"\n{'player':>6} {'skill':>6} {'mean score':>11} {'p90 score':>10} {'win rate':>9}")
+    for player in summary['players']:
+        print(f"{player['player']:>6} {player['skill']:>6} {player['mean_score']:>11} "
+              f"{player['p90_score']:>10} {player['win_rate']:>9}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=100, help='Games sharing one clock and GameManager')
+    parser.add_argument('--workers', type=int, default=1, help='Processes running batches in parallel')
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--difficulty', choices=('easy', 'medium', 'hard'), default='medium')
+    parser.add_argument('--tracks-per-player', type=int, default=3)
+    parser.add_argument('--skill-min', type=float, default=0.2)
+    parser.add_argument('--skill-max', type=float, default=0.9)
+    parser.add_argument('--reaction', type=float, default=4.0, help='Median seconds before a guess')
+    parser.add_argument('--reveal-time', type=float, default=3.0, help='Seconds between a round ending and the next')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='Write the summary to this file')
+    args = parser.parse_args()
+
+    if args.players < 2:
+        parser.error('--players must be at least 2')
+    models = make_models(args.players, args.skill_min, args.skill_max, args.reaction)
+    options = {
+        'difficulty': args.difficulty,
+        'tracks_per_player': args.tracks_per_player,
+        'reveal_time': args.reveal_time
+    }
+
+    # Each batch has its own seed, so results don't depend on --workers
+    batches = [
+        (args.seed * 1000003 + batch, min(args.concurrency, args.games - start), models, options)
+        for batch, start in enumerate(range(0, args.games, args.concurrency))
+    ]
+    started = time.perf_counter()
+    results = []
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers) as pool:
+            for batch_results in pool.map(run_batch, *zip(*batches)):
+                results += batch_results
+    else:
+        for batch in batches:
+            results += run_batch(*batch)
+    summary = summarize(results, models, time.perf_counter() - started)
+    print_report(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
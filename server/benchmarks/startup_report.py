@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Cold start report: how long a fresh interpreter takes to import main.
+
+Usage:
+  python -m benchmarks.startup_report [--runs 5] [--top 20] [--json] [--budget-ms 800]
+  python main.py --startup-report
+
+Each run imports main in a new interpreter under `python -X importtime`.
+The report prints the median process and import times over all runs. It
+also prints the last run's import time broken down by the modules main
+imports directly and by top-level package. With --budget-ms, the exit status
+is 1 when the median import time is over budget, so CI can track cold start.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import sys, time
+started = time.perf_counter()
+import main
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """Parse `-X importtime` lines into {module, depth, self_us, cumulative_us}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        rows.append({
+            'module': module,
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us)
+        })
+    return rows
+
+
+def measure_once() -> dict:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=SERVER_DIR,
+        capture_output=True,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f'import main failed:\n{result.stderr[-2000:]}')
+    return {
+        'wall_ms': wall_ms,
+        'import_ms': float(result.stdout.strip().splitlines()[-1]),
+        'imports': parse_importtime(result.stderr)
+    }
+
+
+def main_subtree(imports: List[dict]) -> List[dict]:
+    """Rows imported while importing main, leaving out interpreter site startup.
+
+    importtime prints a module after its children, so main's subtree is the
+    run of deeper rows directly above main's own row.
+    """
+    index = next((i for i, r in enumerate(imports) if r['module'] == 'main'), None)
+    if index is None:
+        return imports
+    depth = imports[index]['depth']
+    start = index
+    while start > 0 and imports[start - 1]['depth'] > depth:
+        start -= 1
+    return imports[start:index + 1]
+
+
+def summarize(runs: List[dict], top: int) -> dict:
+    imports = main_subtree(runs[-1]['imports'])
+    main_depth = imports[-1]['depth']
+
+    # Direct imports of main, charged with everything they pull in
+    direct = [r for r in imports if r['depth'] == main_depth + 1]
+    # Self time per top-level package, wherever in the tree it was imported
+    packages: Dict[str, int] = {}
+    for row in imports[:-1]:
+        package = row['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + row['self_us']
+
+    return {
+        'runs': len(runs),
+        'wall_ms': round(statistics.median(r['wall_ms'] for r in runs), 1),
+        'import_ms': round(statistics.median(r['import_ms'] for r in runs), 1),
+        'main_imports': [
+            {'module': r['module'], 'ms': round(r['cumulative_us'] / 1000, 1)}
+            for r in sorted(direct, key=lambda r: r['cumulative_us'], reverse=True)[:top]
+        ],
+        'packages': [
+            {'package': name, 'ms': round(us / 1000, 1)}
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ]
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"Cold start over {report['runs']} runs (median)")
+    print(f"  process wall time  {report['wall_ms']:>8.1f} ms")
+    print(f"  import main        {report['import_ms']:>8.1f} ms")
+    print()
+    print(f"{'imported by main':<40} {'cumulative ms':>14}")
+    for row in report['main_imports']:
+        print(f"{row['module']:<40} {row['ms']:>14.1f}")
+    print()
+    print(f"{'package':<40} {'self ms':>14}")
+    for row in report['packages']:
+        print(f"{row['package']:<40} {row['ms']:>14.1f}")
+
+
+def run_report(runs: int = 5, top: int = 20, as_json: bool = False, budget_ms: Optional[float] = None) -> int:
+    report = summarize([measure_once() for _ in range(runs)], top)
+
+    if as_json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if budget_ms is not None and report['import_ms'] > budget_ms:
+        print(f"❌ import main took {report['import_ms']}ms, budget is {budget_ms}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--budget-ms', type=float, help='fail when the median import time is over this')
+    args = parser.parse_args()
+    raise SystemExit(run_report(args.runs, args.top, args.json, args.budget_ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,87 @@
+import time
+BOOT_STARTED = time.perf_counter()
+
 import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Optional
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
+
+# Load environment variables once, before any module reads them
+load_dotenv()
+
+from services.log import configure_logging_from_env, get_logger, logging_stats
+
+# Structured logs, formatted and written to stdout on a background thread
+configure_logging_from_env()
+log = get_logger('server')
+sio_log = get_logger('socketio')
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+from fastapi.middleware.cors import CORSMiddleware
 import socketio
 from datetime import datetime
 import asyncio
+import functools
 
-from services.game_manager import GameManager
-from routes import game_routes, deezer_routes
+from services.game_manager import GameManager, DRAINING_MESSAGE
+from services.persistence import PersistenceQueue
+from services.storage import create_storage
+from services.storage.instrumented import InstrumentedStorage
+from services.cache import TTLCache
+from services.broadcast import TickBroadcaster
+from services.spectators import SpectatorHub
+from services.rate_limit import EventLimiter, parse_limits, DUPLICATE, LIMITED
+from services.preload import PreviewPreloader
+from services.cluster import create_cluster
+from services.routing import WorkerShard
+from services.serialization import get_response_class, get_socketio_options
+from services.metrics import metrics, instrument_packets, CONTENT_TYPE
+from services.tracing import tracer, create_exporter
+from services.loop_monitor import LoopMonitor
+from routes import game_routes, deezer_routes, admin_routes
+from routes.dependencies import ensure_deezer_service
 
-# Load environment variables
-load_dotenv()
+# Response class for the configured wire serializer (orjson when available)
+ResponseClass = get_response_class()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # External clients connect here rather than at import, so importing main
+    # stays cheap and workers boot fast
+    booted = time.perf_counter()
+    if loop_monitor:
+        await loop_monitor.start()
+    await storage.connect()
+    await persistence.start()
+    if cluster:
+        await cluster.start(dispatch_forwarded_event)
+    await spectators.start()
+    ready = time.perf_counter()
+    app.state.startup_timings = {
+        'boot_ms': round((booted - BOOT_STARTED) * 1000, 1),
+        'startup_ms': round((ready - booted) * 1000, 1)
+    }
+    log.info(f"✅ Ready in {(ready - BOOT_STARTED) * 1000:.0f}ms", **app.state.startup_timings)
+    yield
+    await preloader.stop()
+    await tracer.shutdown()
+    await spectators.stop()
+    if cluster:
+        await cluster.stop()
+    await persistence.stop()
+    await storage.close()
+    if loop_monitor:
+        await loop_monitor.stop()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Tune Guesser API",
     description="Backend server for Tune Guesser game",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ResponseClass,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -30,30 +93,263 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Multi-node mode when MESSAGE_QUEUE_URL is set: games are owned by the node
+# their id hashes to, and rooms are shared through the message queue
+cluster = create_cluster()
+
+# Spans for each handler, REST request, GameManager call, Deezer request and
+# storage call; a sampled share of traces plus every slow one is exported
+tracer.configure(
+    create_exporter(os.getenv("TRACE_EXPORTER", "off")),
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", 0.1)),
+    slow_ms=float(os.getenv("TRACE_SLOW_MS", 250)) or None
+)
+
+# Event loop lag as metrics, plus the stack of any call that blocks the loop
+# for longer than LOOP_STALL_MS
+loop_monitor = LoopMonitor(
+    interval=float(os.getenv("LOOP_MONITOR_INTERVAL", 0.1)),
+    threshold=float(os.getenv("LOOP_STALL_MS", 100)) / 1000
+) if os.getenv("LOOP_MONITOR", "1") != "0" else None
+app.state.loop_monitor = loop_monitor
+
+# Profiling and memory endpoints under /api/admin; disabled unless a token is set
+app.state.admin_token = os.getenv("ADMIN_TOKEN", "")
+
+class TracedAsyncServer(socketio.AsyncServer):
+    """Emits show up as spans in the trace of the handler that sends them."""
+    
+    async def emit(self, event, data=None, **kwargs):
+        with tracer.span('sio.emit', event=event, room=kwargs.get('room') or kwargs.get('to')):
+            return await super().emit(event, data, **kwargs)
+
 # Initialize Socket.IO
-sio = socketio.AsyncServer(
+sio = TracedAsyncServer(
     async_mode='asgi',
-    cors_allowed_origins=[os.getenv("CLIENT_URL", "http://localhost:3000")]
+    cors_allowed_origins=[os.getenv("CLIENT_URL", "http://localhost:3000")],
+    # Engine.IO heartbeat; a silent client is dropped after interval + timeout
+    ping_interval=float(os.getenv("SOCKETIO_PING_INTERVAL", 25)),
+    ping_timeout=float(os.getenv("SOCKETIO_PING_TIMEOUT", 20)),
+    client_manager=cluster.client_manager() if cluster else None,
+    **get_socketio_options()
 )
 socket_app = socketio.ASGIApp(sio, other_asgi_app=app)
 
-# Initialize game manager
-game_manager = GameManager()
+SOCKETIO_EMITS = metrics.counter(
+    'tune_guesser_socketio_emits_total', 'Socket.IO events emitted (room emits count once)', ['event']
+)
+SOCKETIO_EMIT_BYTES = metrics.counter(
+    'tune_guesser_socketio_emit_bytes_total', 'Encoded size of emitted Socket.IO events, before fan-out', ['event']
+)
+sio.packet_class = instrument_packets(sio.packet_class, SOCKETIO_EMITS, SOCKETIO_EMIT_BYTES)
+
+# Initialize storage, write-behind persistence and the game manager
+storage = InstrumentedStorage(create_storage())
+app.state.storage = storage
+persistence = PersistenceQueue(
+    storage,
+    max_batch=int(os.getenv("PERSIST_MAX_BATCH", 200)),
+    flush_interval=float(os.getenv("PERSIST_FLUSH_INTERVAL", 0.5)),
+    max_pending=int(os.getenv("PERSIST_MAX_PENDING", 20000))
+)
+read_cache = TTLCache(
+    ttl=float(os.getenv("READ_CACHE_TTL", 30)),
+    max_entries=int(os.getenv("READ_CACHE_MAX_ENTRIES", 10000))
+)
+app.state.read_cache = read_cache
+# Which game ids this process may create: the cluster's share of the hash
+# ring, or the proxy-routed worker shard set by serve.py
+if cluster:
+    router = cluster
+elif int(os.getenv("WORKER_COUNT", 1)) > 1:
+    router = WorkerShard(int(os.getenv("WORKER_INDEX", 0)), int(os.getenv("WORKER_COUNT")))
+else:
+    router = None
+# Next-round previews are resolved and downloaded while the current round plays
+preloader = PreviewPreloader(
+    resolve=lambda track_id: ensure_deezer_service(app).get_track(track_id),
+    ttl=float(os.getenv("PRELOAD_TTL", 900)),
+    max_entries=int(os.getenv("PRELOAD_MAX_ENTRIES", 256))
+)
+app.state.preloader = preloader
+game_manager = GameManager(
+    persistence=persistence,
+    read_cache=read_cache,
+    router=router,
+    large_room_max_players=int(os.getenv("LARGE_ROOM_MAX_PLAYERS", 500)),
+    preloader=preloader if os.getenv("PRELOAD_PREVIEWS", "1") != "0" else None
+)
+app.state.game_manager = game_manager
+
+# Large rooms send top-K leaderboards, sampled player lists, and coalesce
+# room broadcasts to one emit per event per tick
+LARGE_ROOM_TOP_K = int(os.getenv("LARGE_ROOM_TOP_K", 10))
+LARGE_ROOM_SAMPLE = int(os.getenv("LARGE_ROOM_SAMPLE", 20))
+broadcaster = TickBroadcaster(
+    lambda event, data, room: sio.emit(event, data, room=room),
+    tick=float(os.getenv("LARGE_ROOM_TICK", 0.25))
+)
+
+# Read-only spectators get a snapshot, then one coalesced delta per tick
+spectators = SpectatorHub(
+    sio,
+    functools.partial(game_manager.get_spectator_view, top_k=LARGE_ROOM_TOP_K),
+    tick=float(os.getenv("SPECTATOR_TICK", 0.5)),
+    max_per_game=int(os.getenv("SPECTATOR_MAX_PER_GAME", 5000)),
+    max_backlog=int(os.getenv("SPECTATOR_MAX_BACKLOG", 32)),
+    snapshot_interval=float(os.getenv("SPECTATOR_SNAPSHOT_INTERVAL", 2))
+)
+
+# Per-socket token buckets and duplicate suppression in front of every client event
+event_limiter = EventLimiter(
+    limits=parse_limits(os.getenv("SOCKET_RATE_LIMITS", "")),
+    dedupe_window=float(os.getenv("SOCKET_DEDUPE_WINDOW", 1))
+)
+app.state.event_limiter = event_limiter
 
 # Store active timers for each game
 active_timers = {}
 
-# Helper function to serialize player data
+# Metrics served at /metrics; gauges are read from live state at scrape time
+HANDLER_SECONDS = metrics.histogram(
+    'tune_guesser_socketio_handler_seconds', 'Socket.IO event handler latency', ['event']
+)
+HTTP_SECONDS = metrics.histogram(
+    'tune_guesser_http_request_seconds', 'REST request latency', ['method', 'route']
+)
+HTTP_REQUESTS = metrics.counter(
+    'tune_guesser_http_requests_total', 'REST requests', ['method', 'route', 'status']
+)
+
+def count_games():
+    counts = {}
+    for game in game_manager.games.values():
+        counts[(game['status'],)] = counts.get((game['status'],), 0) + 1
+    return counts
+
+def count_dropped_events():
+    return {
+        (event, reason): count
+        for reason in ('duplicates', 'rate_limited')
+        for event, count in event_limiter.stats[reason].items()
+    }
+
+metrics.gauge('tune_guesser_games', 'Games in memory', ['status'], collect=count_games)
+metrics.gauge('tune_guesser_players', 'Players in games in memory',
+              collect=lambda: sum(len(game['players']) for game in game_manager.games.values()))
+metrics.gauge('tune_guesser_sockets', 'Connected Engine.IO sockets on this process',
+              collect=lambda: len(sio.eio.sockets))
+metrics.gauge('tune_guesser_active_timers', 'Running round countdown timers',
+              collect=lambda: len(active_timers))
+metrics.gauge('tune_guesser_spectators', 'Spectators subscribed on this process',
+              collect=lambda: spectators.count())
+metrics.gauge('tune_guesser_persistence_pending_rows', 'Rows waiting for the next database flush',
+              collect=lambda: len(persistence.pending))
+metrics.counter('tune_guesser_socketio_events_dropped_total', 'Client events dropped before their handler',
+                ['event', 'reason'], collect=count_dropped_events)
+metrics.counter('tune_guesser_log_records_skipped_total', 'Log records not written',
+                ['reason'], collect=lambda: {(reason,): count for reason, count in logging_stats().items()})
+
+# Helper functions to serialize player data
+def serialize_player(p):
+    return {
+        'id': p['id'],
+        'name': p['name'],
+        'score': p.get('score', 0),
+        'correct_guesses': p.get('correct_guesses', 0)
+    }
+
 def serialize_player_data(players):
-    return [
-        {
-            'id': p['id'],
-            'name': p['name'],
-            'score': p.get('score', 0),
-            'correct_guesses': p.get('correct_guesses', 0)
+    return [serialize_player(p) for p in players]
+
+# Payload builders for batched large-room broadcasts; they run at flush time
+def build_player_list_summary(game_id):
+    def build(changes):
+        game = game_manager.get_game(game_id)
+        if not game:
+            return None
+        removed = [player_id for kind, player_id in changes if kind == 'removed']
+        gone = set(removed)
+        joined = [player for kind, player in changes if kind == 'added' and player['id'] not in gone]
+        return {
+            "seq": game['lobby_seq'],
+            "summary": True,
+            "playerCount": len(game['players']),
+            "joined": len(changes) - len(removed),
+            "left": len(removed),
+            "sample": joined[-LARGE_ROOM_SAMPLE:],
+            "removed": removed[-LARGE_ROOM_SAMPLE:]
+        }
+    return build
+
+def build_tracks_added(results):
+    # addTrack results carry one track, addTracks and importPlaylist results a batch;
+    # every track has its own seq, so `seq` is the last and the client counts back from it
+    return {
+        "seq": results[-1]['seq'],
+        "tracks": [track for result in results for track in result.get('tracks') or [result['track']]]
+    }
+
+def build_ready_update(game_id, event):
+    def build(_):
+        if game_id not in game_manager.games:
+            return None
+        ready = game_manager.get_ready_state(game_id)
+        payload = {"readyCount": ready['ready_count'], "totalPlayers": ready['total_players']}
+        if event == 'gameReadyToStart':
+            payload["canStart"] = ready['can_start']
+        return payload
+    return build
+
+def build_leaderboard_update(game_id):
+    def build(_):
+        game = game_manager.get_game(game_id)
+        if not game:
+            return None
+        return {
+            "leaderboard": game_manager.get_leaderboard(game_id, limit=LARGE_ROOM_TOP_K),
+            "totalPlayers": len(game['players'])
         }
-        for p in players
-    ]
+    return build
+
+async def broadcast_player_left(game_id, result):
+    """Tell the room a player left: one delta, or a batched summary in large rooms."""
+    if game_manager.is_large_room(game_id):
+        broadcaster.schedule(game_id, 'playerListUpdate', build_player_list_summary(game_id),
+                             ('removed', result['player_id']))
+        broadcaster.schedule(game_id, 'readyPlayersUpdate', build_ready_update(game_id, 'readyPlayersUpdate'))
+        broadcaster.schedule(game_id, 'gameReadyToStart', build_ready_update(game_id, 'gameReadyToStart'))
+        return
+    await sio.emit('playerListUpdate', {
+        "seq": result['seq'],
+        "removed": result['player_id']
+    }, room=game_id)
+
+async def finish_game(game_id):
+    """End a game and send everyone the final results."""
+    large = game_manager.is_large_room(game_id)
+    result = await game_manager.end_game(game_id)
+    leaderboard = result['leaderboard']
+    broadcaster.discard(game_id)
+    
+    if not large:
+        await sio.emit('gameEnd', {"finalLeaderboard": leaderboard}, room=game_id)
+        return
+    
+    await sio.emit('gameEnd', {
+        "finalLeaderboard": leaderboard[:LARGE_ROOM_TOP_K],
+        "totalPlayers": len(leaderboard)
+    }, room=game_id)
+    # Everyone outside the top K still learns where they finished
+    game = game_manager.get_game(game_id)
+    sockets = {p['id']: p['socket_id'] for p in game['players']}
+    for rank, entry in enumerate(leaderboard, start=1):
+        if entry['id'] in sockets:
+            await sio.emit('finalRank', {
+                "rank": rank,
+                "score": entry['score'],
+                "totalPlayers": len(leaderboard)
+            }, room=sockets[entry['id']])
 
 # Countdown timer function
 async def start_countdown_timer(game_id: str, time_limit: int):
@@ -63,6 +359,8 @@ async def start_countdown_timer(game_id: str, time_limit: int):
         active_timers[game_id].cancel()
     
     async def countdown():
+        # Ticks outlive the handler that started them; keep them out of its trace
+        tracer.detach()
         for time_left in range(time_limit, -1, -1):
             try:
                 # Send time update to all players in the game
@@ -71,45 +369,189 @@ async def start_countdown_timer(game_id: str, time_limit: int):
                 }, room=game_id)
                 
                 if time_left > 0:
-                    await asyncio.sleep(1)  # Wait 1 second
+                    await game_manager.clock.sleep(1)  # Wait 1 second
                 else:
                     # Time's up! Send final update
-                    print(f"⏰ Time's up for game {game_id}")
+                    log.debug("⏰ Time's up", game_id=game_id)
                     break
                     
             except asyncio.CancelledError:
-                print(f"⏰ Timer cancelled for game {game_id}")
+                log.debug("⏰ Timer cancelled", game_id=game_id)
                 break
             except Exception as e:
-                print(f"❌ Error in countdown timer for game {game_id}: {e}")
+                log.exception("❌ Error in countdown timer", game_id=game_id, error=e)
                 break
         
-        # Clean up timer reference
-        if game_id in active_timers:
+        # Clean up timer reference, unless the next round's timer already replaced it
+        if active_timers.get(game_id) is asyncio.current_task():
             del active_timers[game_id]
     
     # Start the countdown task
     timer_task = asyncio.create_task(countdown())
     active_timers[game_id] = timer_task
-    print(f"⏰ Started countdown timer for game {game_id} ({time_limit}s)")
+    log.debug("⏰ Started countdown timer", game_id=game_id, seconds=time_limit)
+
+async def drain_games(timeout: float) -> None:
+    """Graceful drain, run by serve.py before the server shuts down.
+
+    Stops new games, joins and rounds, waits for running rounds to finish,
+    ends the games in progress so players get their final results, and
+    flushes pending persistence.
+    """
+    game_manager.draining = True
+    running = list(active_timers.values())
+    log.info("🛑 Draining", games=len(game_manager.games), running_rounds=len(running))
+    
+    if running:
+        _, unfinished = await asyncio.wait(running, timeout=timeout)
+        for task in unfinished:
+            task.cancel()
+    
+    for game_id in game_manager.get_game_ids('playing'):
+        await finish_game(game_id)
+    
+    for game_id in game_manager.get_game_ids('lobby'):
+        await sio.emit('error', {"message": DRAINING_MESSAGE}, room=game_id)
+    
+    await persistence.flush()
+    log.info("✅ Drain complete")
+
+def observed(handler):
+    """Record how long an event handler takes, and run it in its own trace span."""
+    event = handler.__name__
+    span_name = f'socketio.{event}'
+    
+    @functools.wraps(handler)
+    async def timed(sid, *args):
+        data = args[0] if args else None
+        game_id = data.get('gameId') if isinstance(data, dict) else None
+        with HANDLER_SECONDS.time(event=event), tracer.span(span_name, sid=sid, game_id=game_id):
+            return await handler(sid, *args)
+    
+    return timed
+
+# Set when a handler answers its sender with an error; each handler runs in its own task and context
+event_failed: ContextVar[bool] = ContextVar('event_failed', default=False)
+
+async def emit_error(sid, message):
+    event_failed.set(True)
+    await sio.emit('error', {"message": message}, room=sid)
+
+def limited(handler):
+    """Drop an event over its sender's rate limit, or a repeat of an idempotent one, before any work.
+    
+    A repeat only counts as one while the first is running or once it has
+    succeeded; an event that failed can be retried with the same payload.
+    """
+    event = handler.__name__
+    
+    @functools.wraps(handler)
+    async def check(sid, data=None):
+        verdict = event_limiter.check(sid, event, data)
+        if verdict == DUPLICATE:
+            return
+        if verdict == LIMITED:
+            if event_limiter.should_notify(sid, event):
+                sio_log.debug("🚦 Rate limited", event=event, sid=sid)
+                await sio.emit('error', {"message": "Too many requests. Please slow down."}, room=sid)
+            return
+        token = event_failed.set(False)
+        failed = True
+        try:
+            result = await handler(sid, data)
+            failed = event_failed.get()
+            return result
+        finally:
+            if failed:
+                event_limiter.release(sid, event, data)
+            event_failed.reset(token)
+    
+    return check
+
+# Game event handlers by event name, for events forwarded from other nodes
+game_event_handlers = {}
+
+def game_event(handler):
+    """Run a game event on the node that owns its gameId, forwarding it there if needed."""
+    game_event_handlers[handler.__name__] = handler
+    
+    @functools.wraps(handler)
+    async def route(sid, data=None):
+        game_id = data.get('gameId') if isinstance(data, dict) else None
+        if cluster and game_id and not cluster.owns(game_id):
+            if not await cluster.forward(game_id, handler.__name__, sid, data):
+                await emit_error(sid, "Game not found.")
+            return
+        return await handler(sid, data)
+    
+    return route
+
+async def dispatch_forwarded_event(event: str, sid: str, data):
+    """Handle an event another node forwarded for a game owned here."""
+    if event == 'disconnect':
+        await remove_disconnected_player(sid)
+    elif event in game_event_handlers:
+        await game_event_handlers[event](sid, data)
+    else:
+        log.warning("⚠️ Ignoring forwarded event", event=event, sid=sid)
 
 # Include routers
 app.include_router(game_routes.router, prefix="/api/game", tags=["game"])
 app.include_router(deezer_routes.router, prefix="/api/deezer", tags=["deezer"])
+app.include_router(admin_routes.router, prefix="/api/admin", tags=["admin"], include_in_schema=False)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    with tracer.span('http', method=request.method) as span:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template so ids in paths don't create new series
+            route = request.scope.get('route')
+            path = route.path if route is not None else 'unmatched'
+            HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method, route=path)
+            HTTP_REQUESTS.inc(method=request.method, route=path, status=str(status))
+            span.rename(f'http {request.method} {path}')
+            span.set(status=status)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
 
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
+    # Fail health checks while draining so the proxy stops sending new sockets
+    if game_manager.draining:
+        return ResponseClass(status_code=503, content={"status": "DRAINING"})
     return {"status": "OK"}
 
 # Socket.IO event handlers
 @sio.event
+@observed
 async def connect(sid, environ):
-    print(f"Socket connected: {sid}")
+    sio_log.debug("Socket connected", sid=sid)
 
 @sio.event
+@observed
 async def disconnect(sid):
-    print(f"Socket disconnected: {sid}")
+    sio_log.debug("Socket disconnected", sid=sid)
+    event_limiter.forget(sid)
+    
+    # A player in a game owned by another node is removed there
+    remote_game_id = cluster.forget(sid) if cluster else None
+    if remote_game_id:
+        await cluster.forward(remote_game_id, 'disconnect', sid, None)
+        return
+    
+    await remove_disconnected_player(sid)
+
+async def remove_disconnected_player(sid):
+    await spectators.unsubscribe(sid)
     
     # Get player info before removing
     player_info = game_manager.get_player_info(sid)
@@ -121,200 +563,290 @@ async def disconnect(sid):
         
         if result and result.get('game_ended'):
             # Game ended, notify all players
+            broadcaster.discard(game_id)
             await sio.emit('gameEnded', {"message": "Game ended by host."}, room=game_id)
         elif result:
-            # Player left, update player list
-            await sio.emit('playerListUpdate', {
-                "players": result['players']
-            }, room=game_id)
+            # Player left, send only the removed player
+            await broadcast_player_left(game_id, result)
         
         # Leave the room
         await sio.leave_room(sid, game_id)
 
 @sio.event
-async def createGame(sid):
+@limited
+@observed
+async def createGame(sid, data=None):
     try:
-        print(f"CREATE GAME: {sid}")
-        game_id, host_id = await game_manager.create_game(sid)
+        sio_log.debug("CREATE GAME", sid=sid)
+        mode = (data or {}).get('mode', 'classic') if isinstance(data, dict) else 'classic'
+        game_id, host_id = await game_manager.create_game(sid, mode=mode)
+        tracer.set_attributes(game_id=game_id)
         
         # Join the socket to the game room
         await sio.enter_room(sid, game_id)
         
-        await sio.emit('gameCreated', {"gameId": game_id, "hostId": host_id}, room=sid)
+        await sio.emit('gameCreated', {
+            "gameId": game_id,
+            "hostId": host_id,
+            "mode": mode,
+            "maxPlayers": game_manager.get_game(game_id)['max_players']
+        }, room=sid)
+    except ValueError as ve:
+        sio_log.info("❌ Error creating game", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
     except Exception as e:
-        print(f"Error creating game: {e}")
-        await sio.emit('error', {"message": "Failed to create game. Please try again."}, room=sid)
+        sio_log.exception("Error creating game", sid=sid, error=e)
+        await emit_error(sid, "Failed to create game. Please try again.")
 
 @sio.event
+@limited
+@game_event
+@observed
 async def joinGame(sid, data):
     try:
-        print(f"🎮 JOIN GAME REQUEST: {sid}")
-        print(f"📋 Join data: {data}")
+        sio_log.debug("🎮 JOIN GAME REQUEST", sid=sid, payload=data)
         
         game_id = data.get('gameId')
         player_name = data.get('playerName')
         if not game_id or not player_name:
-            print(f"❌ Missing data: gameId={game_id}, playerName={player_name}")
-            await sio.emit('error', {"message": "Game ID and Player Name are required."}, room=sid)
+            sio_log.info("❌ Missing join data", sid=sid, game_id=game_id, player_name=player_name)
+            await emit_error(sid, "Game ID and Player Name are required.")
             return
 
-        print(f"🔍 Looking for game: {game_id}")
         result = await game_manager.join_game(game_id, player_name, sid)
-        print(f"✅ Join result: {result}")
+        sio_log.info("✅ Joined game", game_id=game_id, player_id=result['player_id'],
+                     players=len(result['players']), payload=result)
         
         # Join the socket to the game room
         await sio.enter_room(sid, game_id)
-        print(f"🏠 Socket {sid} joined room {game_id}")
         
+        large = game_manager.is_large_room(game_id)
+        players = game_manager.get_player_sample(game_id, LARGE_ROOM_SAMPLE) if large else result["players"]
         await sio.emit('playerJoined', {
             "playerId": result["player_id"],
             "gameId": game_id,
-            "players": result["players"],
+            "players": serialize_player_data(players),
+            "playerCount": len(result["players"]),
+            "tracks": result["tracks"],
+            "seq": result["seq"],
             "player": result["player"] # Send the new player object to the joining player
         }, room=sid)
-        print(f"📤 Sent playerJoined event to {sid}")
         
-        # Notify other players in the game room
-        await sio.emit('playerListUpdate', { # Use a more specific event name
-            "players": result["players"]
+        if large:
+            # Joins are summarized once per tick for the whole room
+            broadcaster.schedule(game_id, 'playerListUpdate', build_player_list_summary(game_id),
+                                 ('added', serialize_player(result["player"])))
+            broadcaster.schedule(game_id, 'readyPlayersUpdate', build_ready_update(game_id, 'readyPlayersUpdate'))
+            broadcaster.schedule(game_id, 'gameReadyToStart', build_ready_update(game_id, 'gameReadyToStart'))
+            return
+        
+        # Notify other players in the game room with just the new player
+        await sio.emit('playerListUpdate', {
+            "seq": result["seq"],
+            "added": serialize_player(result["player"])
         }, room=game_id, skip_sid=sid)
-        print(f"📤 Sent playerListUpdate to room {game_id}")
         
     except ValueError as ve:
-        print(f"❌ Error joining game (ValueError): {ve}")
-        await sio.emit('error', {"message": str(ve)}, room=sid)
+        sio_log.info("❌ Error joining game", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
     except Exception as e:
-        print(f"❌ Error joining game: {e}")
-        await sio.emit('error', {"message": "Failed to join game. Please try again."}, room=sid)
+        sio_log.exception("❌ Error joining game", sid=sid, error=e)
+        await emit_error(sid, "Failed to join game. Please try again.")
 
 @sio.event
+@limited
+@game_event
+@observed
 async def addTrack(sid, data):
     try:
-        print(f"🎵 ADD TRACK REQUEST: {sid}")
-        print(f"📋 Track data: {data}")
+        sio_log.debug("🎵 ADD TRACK REQUEST", sid=sid, payload=data)
         
         game_id = data.get('gameId')
         track = data.get('track')
         player_id = data.get('playerId')
         
         if not game_id or not track or not player_id:
-            print(f"❌ Missing data: gameId={game_id}, track={bool(track)}, playerId={player_id}")
-            await sio.emit('error', {"message": "Game ID, Track, and Player ID are required."}, room=sid)
+            sio_log.info("❌ Missing track data", sid=sid, game_id=game_id, track=bool(track), player_id=player_id)
+            await emit_error(sid, "Game ID, Track, and Player ID are required.")
             return
             
-        print(f"🔍 Adding track to game: {game_id}")
-        print(f"🎵 Track details: {track.get('name', 'Unknown')} by {track.get('artists', [])}")
         
         # Add track to game using GameManager
-        tracks = game_manager.add_track(game_id, track, player_id)
-        print(f"✅ Track added successfully. Total tracks: {len(tracks)}")
+        result = game_manager.add_track(game_id, track, player_id)
+        sio_log.info("✅ Track added", game_id=game_id, track_id=track.get('id'), total_tracks=result['total_tracks'])
         
-        # Notify all players in the game
+        if game_manager.is_large_room(game_id):
+            # New tracks go out together once per tick
+            broadcaster.schedule(game_id, 'tracksAdded', build_tracks_added, result)
+            return
+        
+        # Notify all players in the game with just the new track
         await sio.emit('trackAdded', {
-            "tracks": tracks
+            "seq": result['seq'],
+            "track": result['track']
         }, room=game_id)
-        print(f"📤 Sent trackAdded event to room {game_id}")
         
     except ValueError as ve:
-        print(f"❌ Error adding track (ValueError): {ve}")
-        await sio.emit('error', {"message": str(ve)}, room=sid)
+        sio_log.info("❌ Error adding track", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
+    except Exception as e:
+        sio_log.exception("❌ Error adding track", sid=sid, error=e)
+        await emit_error(sid, "Failed to add track. Please try again.")
+
+async def broadcast_tracks_added(sid, game_id, result):
+    """One `tracksAdded` delta for a batch of tracks, and what was added and skipped to the sender."""
+    await sio.emit('tracksImported', {
+        "tracks": result['tracks'],
+        "added": len(result['tracks']),
+        "skipped": result['skipped'],
+        "totalTracks": result['total_tracks']
+    }, room=sid)
+    if game_manager.is_large_room(game_id):
+        broadcaster.schedule(game_id, 'tracksAdded', build_tracks_added, result)
+        return
+    await sio.emit('tracksAdded', {
+        "seq": result['seq'],
+        "tracks": result['tracks']
+    }, room=game_id)
+
+@sio.event
+@limited
+@game_event
+@observed
+async def addTracks(sid, data):
+    try:
+        sio_log.debug("🎵 ADD TRACKS REQUEST", sid=sid, payload=data)
+        
+        game_id = data.get('gameId')
+        tracks = data.get('tracks')
+        player_id = data.get('playerId')
+        
+        if not game_id or not isinstance(tracks, list) or not tracks or not player_id:
+            sio_log.info("❌ Missing tracks data", sid=sid, game_id=game_id, player_id=player_id)
+            await emit_error(sid, "Game ID, Tracks, and Player ID are required.")
+            return
+        
+        result = game_manager.add_tracks(game_id, tracks, player_id)
+        sio_log.info("✅ Tracks added", game_id=game_id, added=len(result['tracks']),
+                     total_tracks=result['total_tracks'], **result['skipped'])
+        await broadcast_tracks_added(sid, game_id, result)
+        
+    except ValueError as ve:
+        sio_log.info("❌ Error adding tracks", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
     except Exception as e:
-        print(f"❌ Error adding track: {e}")
-        await sio.emit('error', {"message": "Failed to add track. Please try again."}, room=sid)
+        sio_log.exception("❌ Error adding tracks", sid=sid, error=e)
+        await emit_error(sid, "Failed to add tracks. Please try again.")
 
 @sio.event
+@limited
+@game_event
+@observed
+async def importPlaylist(sid, data):
+    try:
+        sio_log.debug("🎵 IMPORT PLAYLIST REQUEST", sid=sid, payload=data)
+        
+        game_id = data.get('gameId')
+        player_id = data.get('playerId')
+        source = data.get('source', 'playlist')
+        source_id = data.get('sourceId')
+        
+        if not game_id or not player_id or not source_id:
+            sio_log.info("❌ Missing import data", sid=sid, game_id=game_id, player_id=player_id)
+            await emit_error(sid, "Game ID, Player ID, and Source ID are required.")
+            return
+        
+        # Fail before calling Deezer when the player has no room left
+        if game_manager.remaining_tracks(game_id, player_id) <= 0:
+            raise ValueError('Maximum tracks per player reached')
+        
+        # One listing call returns the tracks with their previews; it blocks, so it runs off the loop
+        deezer_service = ensure_deezer_service(app)
+        tracks = await asyncio.to_thread(deezer_service.get_collection_tracks, source, str(source_id))
+        
+        # The lobby may have changed meanwhile; add_tracks checks everything again
+        result = game_manager.add_tracks(game_id, tracks, player_id)
+        sio_log.info("✅ Playlist imported", game_id=game_id, source=source, source_id=source_id,
+                     added=len(result['tracks']), total_tracks=result['total_tracks'], **result['skipped'])
+        await broadcast_tracks_added(sid, game_id, result)
+        
+    except ValueError as ve:
+        sio_log.info("❌ Error importing playlist", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
+    except Exception as e:
+        sio_log.exception("❌ Error importing playlist", sid=sid, error=e)
+        await emit_error(sid, "Failed to import tracks. Please try again.")
+
+@sio.event
+@limited
+@game_event
+@observed
 async def setReady(sid, data):
     try:
-        print(f"📤 setReady event received from {sid}")
-        print(f"📋 setReady data: {data}")
+        sio_log.debug("📤 SET READY REQUEST", sid=sid, payload=data)
         
         game_id = data.get('gameId')
         player_id = data.get('playerId')
         is_ready = data.get('isReady')
         
-        print(f"🔍 Parsed data: gameId={game_id}, playerId={player_id}, isReady={is_ready}")
         
         if not game_id or not player_id:
-            print(f"❌ Missing required data: gameId={game_id}, playerId={player_id}")
-            await sio.emit('error', {"message": "Game ID and Player ID are required."}, room=sid)
+            sio_log.info("❌ Missing ready data", sid=sid, game_id=game_id, player_id=player_id)
+            await emit_error(sid, "Game ID and Player ID are required.")
             return
             
         # Update player ready status
-        game = game_manager.get_game(game_id)
-        if not game:
-            print(f"❌ Game not found: {game_id}")
-            await sio.emit('error', {"message": "Game not found."}, room=sid)
+        ready = game_manager.set_ready(game_id, player_id, is_ready)
+        if not ready['changed']:
+            # Same ready state as before: nothing to tell the room
             return
-            
-        print(f"🎮 Found game with {len(game['players'])} players")
-        
-        # Find and update player ready status
-        player_found = False
-        for player in game['players']:
-            if player['id'] == player_id:
-                player['ready'] = is_ready
-                player_found = True
-                print(f"✅ Updated player {player_id} ready status to {is_ready}")
-                break
+        sio_log.debug("✅ Updated ready status", game_id=game_id, player_id=player_id, is_ready=is_ready)
         
-        if not player_found:
-            print(f"❌ Player {player_id} not found in game")
-            await sio.emit('error', {"message": "Player not found in game."}, room=sid)
+        if game_manager.is_large_room(game_id):
+            # Ready counts go out once per tick instead of the full id list per change
+            broadcaster.schedule(game_id, 'readyPlayersUpdate', build_ready_update(game_id, 'readyPlayersUpdate'))
+            broadcaster.schedule(game_id, 'gameReadyToStart', build_ready_update(game_id, 'gameReadyToStart'))
             return
         
-        # Get list of ready players
-        ready_players = [p['id'] for p in game['players'] if p.get('ready', False)]
-        print(f"📊 Ready players: {ready_players}")
+        ready_players = ready['ready_players']
         
         # Notify all players about ready status update
-        print(f"📤 Emitting readyPlayersUpdate to room {game_id}")
         await sio.emit('readyPlayersUpdate', {
             "readyPlayers": ready_players
         }, room=game_id)
         
         # Check if game can be started (but don't auto-start)
-        min_players = 2
-        total_players = len(game['players'])
-        all_ready = len(ready_players) == total_players
-        
-        can_start = (
-            total_players >= min_players and
-            all_ready  # Only require all players to be ready
-        )
-        
-        print(f"🚀 Game start check: total_players={total_players}, all_ready={all_ready}, can_start={can_start}")
+        total_players = ready['total_players']
+        can_start = ready['can_start']
         
         # Notify host that game can be started (instead of auto-starting)
         if can_start:
-            print(f"🚀 Game ready to start - notifying host")
-            await sio.emit('gameReadyToStart', {
-                "canStart": True,
-                "readyPlayers": ready_players,
-                "totalPlayers": total_players
-            }, room=game_id)
-        else:
-            # Notify that game is not ready to start
-            await sio.emit('gameReadyToStart', {
-                "canStart": False,
-                "readyPlayers": ready_players,
-                "totalPlayers": total_players
-            }, room=game_id)
+            sio_log.debug("🚀 Game ready to start", game_id=game_id, players=total_players)
+        await sio.emit('gameReadyToStart', {
+            "canStart": can_start,
+            "readyPlayers": ready_players,
+            "totalPlayers": total_players
+        }, room=game_id)
         
+    except ValueError as ve:
+        sio_log.info("❌ Error setting ready status", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
     except Exception as e:
-        print(f"❌ Error setting ready status: {e}")
-        import traceback
-        traceback.print_exc()
-        await sio.emit('error', {"message": "Failed to update ready status. Please try again."}, room=sid)
+        sio_log.exception("❌ Error setting ready status", sid=sid, error=e)
+        await emit_error(sid, "Failed to update ready status. Please try again.")
 
 @sio.event
+@limited
+@game_event
+@observed
 async def startGame(sid, data):
     try:
-        print(f"🚀 START GAME REQUEST: {sid}")
+        sio_log.debug("🚀 START GAME REQUEST", sid=sid)
         game_id = data.get('gameId')
         difficulty = data.get('difficulty', 'medium')
         
         if not game_id:
-            await sio.emit('error', {"message": "Game ID is required."}, room=sid)
+            await emit_error(sid, "Game ID is required.")
             return
         
         # Update game difficulty and time limit
@@ -327,7 +859,7 @@ async def startGame(sid, data):
             }
             game['time_limit'] = time_limits.get(difficulty, 15)
             game['difficulty'] = difficulty
-            print(f"🎯 Set difficulty to {difficulty} with {game['time_limit']}s time limit")
+            sio_log.debug("🎯 Set difficulty", game_id=game_id, difficulty=difficulty, time_limit=game['time_limit'])
             
         result = await game_manager.start_game(game_id)
         
@@ -337,12 +869,12 @@ async def startGame(sid, data):
         # Check if game is already finished (no tracks)
         if round_data.get('game_finished', False):
             # End the game immediately
-            end_result = await game_manager.end_game(game_id)
-            await sio.emit('gameEnd', {
-                "finalLeaderboard": end_result['leaderboard']
-            }, room=game_id)
+            await finish_game(game_id)
             return
         
+        # Lobby updates still batched go out before the game starts
+        await broadcaster.flush(game_id)
+        
         # Notify all players in the game
         await sio.emit('gameStarted', {
             "roundInfo": {
@@ -359,31 +891,36 @@ async def startGame(sid, data):
                 "total": round_data['total_rounds']
             },
             "timeLimit": round_data['time_limit'],
-            "difficulty": game.get('difficulty', 'medium')
+            "difficulty": game.get('difficulty', 'medium'),
+            # Opaque URL of the next round's preview, so clients can buffer it now
+            "preloadNext": round_data['preload_next']
         }, room=game_id)
         
         # Start the countdown timer for this round
         await start_countdown_timer(game_id, round_data['time_limit'])
         
-        print(f"✅ Game started with {result['total_rounds']} rounds")
+        sio_log.info("✅ Game started", game_id=game_id, rounds=result['total_rounds'])
         
     except ValueError as ve:
-        print(f"❌ Error starting game (ValueError): {ve}")
-        await sio.emit('error', {"message": str(ve)}, room=sid)
+        sio_log.info("❌ Error starting game", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
     except Exception as e:
-        print(f"❌ Error starting game: {e}")
-        await sio.emit('error', {"message": "Failed to start game. Please try again."}, room=sid)
+        sio_log.exception("❌ Error starting game", sid=sid, error=e)
+        await emit_error(sid, "Failed to start game. Please try again.")
 
 @sio.event
+@limited
+@game_event
+@observed
 async def submitGuess(sid, data):
     try:
-        print(f"🎯 SUBMIT GUESS REQUEST: {sid}")
+        sio_log.debug("🎯 SUBMIT GUESS REQUEST", sid=sid)
         game_id = data.get('gameId')
         player_id = data.get('playerId')
         guess = data.get('guess')
         
         if not game_id or not player_id or not guess:
-            await sio.emit('error', {"message": "Game ID, Player ID, and Guess are required."}, room=sid)
+            await emit_error(sid, "Game ID, Player ID, and Guess are required.")
             return
             
         # Process guess using GameManager
@@ -397,42 +934,52 @@ async def submitGuess(sid, data):
             "artistScore": result['artist_score'],
             "trackScore": result['track_score'],
             "totalScore": result['total_score'],
-            "speedBonus": result['speed_bonus']
+            "speedBonus": result['speed_bonus'],
+            "rank": result['rank']
         }, room=sid)
         
-        # Update leaderboard for all players
-        leaderboard = game_manager.get_leaderboard(game_id)
-        await sio.emit('leaderboardUpdate', {
-            "leaderboard": leaderboard
-        }, room=game_id)
+        # Update leaderboard for all players; large rooms get the top K once per tick
+        if game_manager.is_large_room(game_id):
+            broadcaster.schedule(game_id, 'leaderboardUpdate', build_leaderboard_update(game_id))
+        else:
+            leaderboard = game_manager.get_leaderboard(game_id)
+            await sio.emit('leaderboardUpdate', {
+                "leaderboard": leaderboard
+            }, room=game_id)
         
-        print(f"✅ Guess processed: {result['correct']}, Points: {result['points']}, Artist: {result['artist_score']}, Track: {result['track_score']}, Total: {result['total_score']}")
+        sio_log.debug("✅ Guess processed", game_id=game_id, correct=result['correct'], points=result['points'],
+                      artist=result['artist_score'], track=result['track_score'], total=result['total_score'])
         
     except ValueError as ve:
-        print(f"❌ Error submitting guess (ValueError): {ve}")
-        await sio.emit('error', {"message": str(ve)}, room=sid)
+        sio_log.info("❌ Error submitting guess", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
     except Exception as e:
-        print(f"❌ Error submitting guess: {e}")
-        await sio.emit('error', {"message": "Failed to submit guess. Please try again."}, room=sid)
+        sio_log.exception("❌ Error submitting guess", sid=sid, error=e)
+        await emit_error(sid, "Failed to submit guess. Please try again.")
 
 @sio.event
+@limited
+@game_event
+@observed
 async def nextRound(sid, data):
     try:
-        print(f"🔄 NEXT ROUND REQUEST: {sid}")
+        sio_log.debug("🔄 NEXT ROUND REQUEST", sid=sid)
         game_id = data.get('gameId')
         
         if not game_id:
-            await sio.emit('error', {"message": "Game ID is required."}, room=sid)
+            await emit_error(sid, "Game ID is required.")
             return
             
         # Get current game state
         game = game_manager.get_game(game_id)
         if not game:
-            await sio.emit('error', {"message": "Game not found."}, room=sid)
+            await emit_error(sid, "Game not found.")
             return
         
         # Start next round
         round_data = game_manager.start_next_round(game_id)
+        # The last round's leaderboard goes out before anything about the next one
+        await broadcaster.flush(game_id)
         
         # Check if game is finished
         if round_data.get('game_finished', False):
@@ -452,67 +999,152 @@ async def nextRound(sid, data):
                 "total": round_data['total_rounds']
             },
             "timeLimit": round_data['time_limit'],
-            "difficulty": game.get('difficulty', 'medium')
+            "difficulty": game.get('difficulty', 'medium'),
+            # Opaque URL of the next round's preview, so clients can buffer it now
+            "preloadNext": round_data['preload_next']
         }, room=game_id)
         
         # Start the countdown timer for this round
         await start_countdown_timer(game_id, round_data['time_limit'])
         
-        print(f"✅ Advanced to round {round_data['current_round']}")
+        sio_log.info("✅ Advanced round", game_id=game_id, round=round_data['current_round'])
         
     except Exception as e:
-        print(f"❌ Error advancing round: {e}")
-        await sio.emit('error', {"message": "Failed to advance round. Please try again."}, room=sid)
+        sio_log.exception("❌ Error advancing round", sid=sid, error=e)
+        await emit_error(sid, "Failed to advance round. Please try again.")
 
 @sio.event
+@limited
+@game_event
+@observed
 async def revealResults(sid, data):
     try:
-        print(f"🏆 REVEAL RESULTS REQUEST: {sid}")
+        sio_log.debug("🏆 REVEAL RESULTS REQUEST", sid=sid)
         game_id = data.get('gameId')
         
         if not game_id:
-            await sio.emit('error', {"message": "Game ID is required."}, room=sid)
+            await emit_error(sid, "Game ID is required.")
             return
             
-        # End the game and get final results
-        result = await game_manager.end_game(game_id)
-        
-        # Send final results to all players
-        await sio.emit('gameEnd', {
-            "finalLeaderboard": result['leaderboard']
-        }, room=game_id)
+        # End the game and send final results to all players
+        await finish_game(game_id)
         
-        print(f"✅ Results revealed for game {game_id}")
+        sio_log.info("✅ Results revealed", game_id=game_id)
         
     except Exception as e:
-        print(f"❌ Error revealing results: {e}")
-        await sio.emit('error', {"message": "Failed to reveal results. Please try again."}, room=sid)
+        sio_log.exception("❌ Error revealing results", sid=sid, error=e)
+        await emit_error(sid, "Failed to reveal results. Please try again.")
 
 @sio.event
+@limited
+@game_event
+@observed
 async def leaveGame(sid, data):
     try:
-        print(f"leaveGame: {sid}")
+        sio_log.debug("LEAVE GAME REQUEST", sid=sid)
         game_id = data.get('gameId')
         player_id = data.get('playerId')
         
         if not game_id or not player_id:
-            await sio.emit('error', {"message": "Game ID and Player ID are required."}, room=sid)
+            await emit_error(sid, "Game ID and Player ID are required.")
             return
             
         result = await game_manager.remove_player(sid)
         
         if result and result.get('game_ended'):
             # Game ended, notify all players
+            broadcaster.discard(game_id)
             await sio.emit('gameEnded', {"message": "Game ended by host."}, room=game_id)
         elif result:
-            # Player left, update player list
-            await sio.emit('playerListUpdate', {
-                "players": serialize_player_data(result['players'])
-            }, room=game_id)
+            # Player left, send only the removed player
+            await broadcast_player_left(game_id, result)
+        
+    except Exception as e:
+        sio_log.exception("Error leaving game", sid=sid, error=e)
+        await emit_error(sid, "Failed to leave game. Please try again.")
+
+@sio.event
+@limited
+@game_event
+@observed
+async def requestLobbySnapshot(sid, data):
+    try:
+        game_id = data.get('gameId')
+        
+        if not game_id:
+            await emit_error(sid, "Game ID is required.")
+            return
+        
+        player_info = game_manager.get_player_info(sid)
+        if not player_info or player_info['game_id'] != game_id:
+            raise ValueError('Not a player in this game')
+        
+        snapshot = game_manager.get_lobby_snapshot(game_id)
+        sio_log.debug("📸 Sending lobby snapshot", game_id=game_id, seq=snapshot['seq'], sid=sid)
+        
+        players = snapshot['players']
+        if game_manager.is_large_room(game_id):
+            players = game_manager.get_player_sample(game_id, LARGE_ROOM_SAMPLE)
+        await sio.emit('lobbySnapshot', {
+            "seq": snapshot['seq'],
+            "players": serialize_player_data(players),
+            "playerCount": len(snapshot['players']),
+            "tracks": snapshot['tracks']
+        }, room=sid)
+        
+    except ValueError as ve:
+        sio_log.info("❌ Error sending lobby snapshot", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
+    except Exception as e:
+        sio_log.exception("❌ Error sending lobby snapshot", sid=sid, error=e)
+        await emit_error(sid, "Failed to load lobby. Please try again.")
+
+@sio.event
+@limited
+@game_event
+@observed
+async def spectateGame(sid, data):
+    try:
+        game_id = data.get('gameId')
         
+        if not game_id:
+            await emit_error(sid, "Game ID is required.")
+            return
+        
+        snapshot = await spectators.subscribe(sid, game_id)
+        sio_log.debug("👀 Spectating", sid=sid, game_id=game_id, spectators=spectators.count(game_id))
+        
+        await sio.emit('spectatorSnapshot', snapshot, room=sid)
+        
+    except ValueError as ve:
+        sio_log.info("❌ Error spectating game", sid=sid, error=ve)
+        await emit_error(sid, str(ve))
     except Exception as e:
-        print(f"Error leaving game: {e}")
-        await sio.emit('error', {"message": "Failed to leave game. Please try again."}, room=sid)
+        sio_log.exception("❌ Error spectating game", sid=sid, error=e)
+        await emit_error(sid, "Failed to watch game. Please try again.")
+
+@sio.event
+@limited
+@game_event
+@observed
+async def requestSpectatorSnapshot(sid, data):
+    try:
+        await sio.emit('spectatorSnapshot', spectators.snapshot(sid), room=sid)
+    except ValueError as ve:
+        await emit_error(sid, str(ve))
+    except Exception as e:
+        sio_log.exception("❌ Error sending spectator snapshot", sid=sid, error=e)
+        await emit_error(sid, "Failed to load game. Please try again.")
+
+@sio.event
+@limited
+@game_event
+@observed
+async def stopSpectating(sid, data):
+    try:
+        await spectators.unsubscribe(sid)
+    except Exception as e:
+        sio_log.exception("❌ Error stopping spectating", sid=sid, error=e)
 
 # Mount Socket.IO app
 app.mount('/socket.io', socket_app)
@@ -520,22 +1152,34 @@ app.mount('/socket.io', socket_app)
 # Simplified Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return JSONResponse(
+    return ResponseClass(
         status_code=exc.status_code,
-        content={"error": exc.detail}
+        content={"error": exc.detail},
+        headers=exc.headers
     )
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
-    print(f"Unhandled exception: {exc}") # Log the full error for debugging
-    return JSONResponse(
+    log.error("Unhandled exception", path=request.url.path, error=exc, exc_info=exc)
+    return ResponseClass(
         status_code=500,
         content={"error": "An unexpected error occurred. Please try again later."}
     )
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Tune Guesser server")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print a cold start import-time breakdown and exit")
+    args = parser.parse_args()
+
+    if args.startup_report:
+        from benchmarks.startup_report import run_report
+        raise SystemExit(run_report())
+
+    # Development server with auto-reload; use serve.py in production
     import uvicorn
     port = int(os.getenv("PORT", 5001)) # Changed default port to 5001 to avoid conflict if Node server is also running
     host = os.getenv("HOST", "0.0.0.0")
-    print(f"Starting server on {host}:{port}")
+    log.info("Starting server", host=host, port=port)
     uvicorn.run("main:app", host=host, port=port, reload=True)
\ No newline at end of file
@@ -0,0 +1,46 @@
+-- Per-player rollups, updated incrementally when a game ends.
+-- Players have no accounts, so a player is identified by their normalized name.
+CREATE TABLE IF NOT EXISTS player_stats (
+  player_key VARCHAR(50) PRIMARY KEY,
+  name VARCHAR(50) NOT NULL,
+  games_played INTEGER NOT NULL DEFAULT 0,
+  total_score BIGINT NOT NULL DEFAULT 0,
+  best_score INTEGER NOT NULL DEFAULT 0,
+  total_guesses INTEGER NOT NULL DEFAULT 0,
+  correct_guesses INTEGER NOT NULL DEFAULT 0,
+  total_guess_time_seconds DECIMAL(12,2) NOT NULL DEFAULT 0,
+  last_played_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_player_stats_best_score ON player_stats(best_score DESC);
+
+-- Apply a batch of per-game deltas in one statement (called via Supabase RPC)
+CREATE OR REPLACE FUNCTION apply_player_stats(deltas JSONB) RETURNS VOID AS $$
+  INSERT INTO player_stats AS s (
+    player_key, name, games_played, total_score, best_score,
+    total_guesses, correct_guesses, total_guess_time_seconds, last_played_at
+  )
+  SELECT
+    d.player_key, d.name, d.games_played, d.total_score, d.best_score,
+    d.total_guesses, d.correct_guesses, d.total_guess_time_seconds, d.last_played_at
+  FROM jsonb_to_recordset(deltas) AS d(
+    player_key VARCHAR(50), name VARCHAR(50), games_played INTEGER, total_score BIGINT, best_score INTEGER,
+    total_guesses INTEGER, correct_guesses INTEGER, total_guess_time_seconds DECIMAL(12,2),
+    last_played_at TIMESTAMP WITH TIME ZONE
+  )
+  ON CONFLICT (player_key) DO UPDATE SET
+    name = EXCLUDED.name,
+    games_played = s.games_played + EXCLUDED.games_played,
+    total_score = s.total_score + EXCLUDED.total_score,
+    best_score = GREATEST(s.best_score, EXCLUDED.best_score),
+    total_guesses = s.total_guesses + EXCLUDED.total_guesses,
+    correct_guesses = s.correct_guesses + EXCLUDED.correct_guesses,
+    total_guess_time_seconds = s.total_guess_time_seconds + EXCLUDED.total_guess_time_seconds,
+    last_played_at = GREATEST(s.last_played_at, EXCLUDED.last_played_at);
+$$ LANGUAGE sql;
+
+ALTER TABLE player_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Player stats are viewable by everyone" ON player_stats FOR SELECT USING (true);
+CREATE POLICY "Player stats can be inserted by everyone" ON player_stats FOR INSERT WITH CHECK (true);
+CREATE POLICY "Player stats can be updated by everyone" ON player_stats FOR UPDATE USING (true);
@@ -0,0 +1,7 @@
+-- Keyset pagination for GET /api/game/: pages are read with
+--   WHERE (created_at, id) < ($cursor_created_at, $cursor_id)
+--   ORDER BY created_at DESC, id DESC
+-- which this index serves as a single range scan, however deep the page.
+-- It also covers every query the plain created_at index served.
+CREATE INDEX IF NOT EXISTS idx_games_created_at_id ON games(created_at DESC, id DESC);
+DROP INDEX IF EXISTS idx_games_created_at;
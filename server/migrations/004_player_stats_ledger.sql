@@ -0,0 +1,63 @@
+-- player_stats deltas are increments, so applying one twice (a flush that
+-- committed but whose acknowledgement was lost, then retried) would count
+-- the game twice. Each (game, player) delta is recorded here, and only
+-- deltas recorded for the first time are added to the rollups.
+CREATE TABLE IF NOT EXISTS player_stats_applied (
+  game_id VARCHAR(6) NOT NULL,
+  player_key VARCHAR(50) NOT NULL,
+  applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (game_id, player_key)
+);
+
+-- Deltas now carry game_id; replaces the function from 002_player_stats.sql
+CREATE OR REPLACE FUNCTION apply_player_stats(deltas JSONB) RETURNS VOID AS $$
+  WITH d AS (
+    SELECT * FROM jsonb_to_recordset(deltas) AS d(
+      game_id VARCHAR(6), player_key VARCHAR(50), name VARCHAR(50), games_played INTEGER, total_score BIGINT,
+      best_score INTEGER, total_guesses INTEGER, correct_guesses INTEGER,
+      total_guess_time_seconds DECIMAL(12,2), last_played_at TIMESTAMP WITH TIME ZONE
+    )
+  ), fresh AS (
+    INSERT INTO player_stats_applied (game_id, player_key)
+    SELECT game_id, player_key FROM d
+    ON CONFLICT DO NOTHING
+    RETURNING game_id, player_key
+  ), totals AS (
+    -- A batch can hold one player's deltas from several games, and an
+    -- upsert can't touch the same row twice, so combine them first
+    SELECT
+      d.player_key,
+      (array_agg(d.name ORDER BY d.last_played_at DESC NULLS LAST))[1] AS name,
+      SUM(d.games_played)::INTEGER AS games_played,
+      SUM(d.total_score)::BIGINT AS total_score,
+      MAX(d.best_score) AS best_score,
+      SUM(d.total_guesses)::INTEGER AS total_guesses,
+      SUM(d.correct_guesses)::INTEGER AS correct_guesses,
+      SUM(d.total_guess_time_seconds) AS total_guess_time_seconds,
+      MAX(d.last_played_at) AS last_played_at
+    FROM d JOIN fresh USING (game_id, player_key)
+    GROUP BY d.player_key
+  )
+  INSERT INTO player_stats AS s (
+    player_key, name, games_played, total_score, best_score,
+    total_guesses, correct_guesses, total_guess_time_seconds, last_played_at
+  )
+  SELECT
+    player_key, name, games_played, total_score, best_score,
+    total_guesses, correct_guesses, total_guess_time_seconds, last_played_at
+  FROM totals
+  ON CONFLICT (player_key) DO UPDATE SET
+    name = EXCLUDED.name,
+    games_played = s.games_played + EXCLUDED.games_played,
+    total_score = s.total_score + EXCLUDED.total_score,
+    best_score = GREATEST(s.best_score, EXCLUDED.best_score),
+    total_guesses = s.total_guesses + EXCLUDED.total_guesses,
+    correct_guesses = s.correct_guesses + EXCLUDED.correct_guesses,
+    total_guess_time_seconds = s.total_guess_time_seconds + EXCLUDED.total_guess_time_seconds,
+    last_played_at = GREATEST(s.last_played_at, EXCLUDED.last_played_at);
+$$ LANGUAGE sql;
+
+ALTER TABLE player_stats_applied ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Applied player stats are viewable by everyone" ON player_stats_applied FOR SELECT USING (true);
+CREATE POLICY "Applied player stats can be inserted by everyone" ON player_stats_applied FOR INSERT WITH CHECK (true);
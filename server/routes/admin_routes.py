@@ -0,0 +1,91 @@
+import asyncio
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+
+from services.game_manager import GameManager
+from services.profiling import SamplingProfiler, MemoryTracker, ProfilerBusy, game_memory
+from routes.dependencies import get_game_manager
+from services.log import get_logger
+
+log = get_logger('api')
+
+router = APIRouter()
+
+profiler = SamplingProfiler()
+memory_tracker = MemoryTracker()
+
+def require_admin(request: Request):
+    """Bearer ADMIN_TOKEN; with no token configured the admin API does not exist."""
+    expected = request.app.state.admin_token
+    if not expected:
+        raise HTTPException(status_code=404, detail='Not Found')
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not secrets.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail='Invalid admin token', headers={'WWW-Authenticate': 'Bearer'})
+
+@router.post('/profile', dependencies=[Depends(require_admin)])
+async def run_profile(seconds: float = 10, interval_ms: float = 5):
+    try:
+        if seconds <= 0 or interval_ms < 1:
+            raise HTTPException(status_code=400, detail='seconds must be positive and interval_ms at least 1')
+        # Sampling runs in a thread, so the loop keeps serving games and shows up in the profile
+        stacks = await asyncio.to_thread(profiler.run, seconds, interval_ms / 1000)
+        return Response(stacks, media_type='text/plain', headers={
+            'Content-Disposition': 'attachment; filename="profile.collapsed"'
+        })
+
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception('Profile error', error=e)
+        raise HTTPException(
+            status_code=500,
+            detail=f'Failed to profile: {str(e)}'
+        )
+
+@router.post('/memory/start', dependencies=[Depends(require_admin)])
+async def start_memory_tracking(frames: int = 1):
+    memory_tracker.start(max(1, min(frames, 25)))
+    return {'tracing': True}
+
+@router.post('/memory/stop', dependencies=[Depends(require_admin)])
+async def stop_memory_tracking():
+    memory_tracker.stop()
+    return {'tracing': False}
+
+@router.post('/memory/snapshot', dependencies=[Depends(require_admin)])
+async def take_memory_snapshot(top: int = 25):
+    try:
+        return await asyncio.to_thread(memory_tracker.snapshot, max(1, min(top, 500)))
+
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        log.exception('Memory snapshot error', error=e)
+        raise HTTPException(
+            status_code=500,
+            detail=f'Failed to take memory snapshot: {str(e)}'
+        )
+
+@router.get('/memory/games', dependencies=[Depends(require_admin)])
+async def get_game_memory(
+    limit: int = 50,
+    game_manager: GameManager = Depends(get_game_manager)
+):
+    # Walks live game state, so it runs on the loop where nothing mutates it meanwhile
+    games = game_memory(game_manager.games)
+    return {
+        'games': len(games),
+        'total_bytes': sum(entry['bytes'] for entry in games),
+        'largest': games[:max(1, limit)]
+    }
+
+@router.get('/loop', dependencies=[Depends(require_admin)])
+async def get_loop_lag(request: Request):
+    monitor = request.app.state.loop_monitor
+    if monitor is None:
+        raise HTTPException(status_code=404, detail='Loop monitor is disabled')
+    return monitor.summary()
@@ -1,12 +1,27 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
-from services.deezer_service import DeezerService
+from routes.dependencies import get_deezer_service
+from services.deezer_service import DeezerUnavailable
+from services.log import get_logger
+
+log = get_logger('api')
 
 router = APIRouter()
-deezer_service = DeezerService()
+
+def unavailable(e: DeezerUnavailable) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={'Retry-After': str(max(1, round(e.retry_after)))}
+    )
 
 @router.get('/search')
-async def search_tracks(q: str, limit: int = Query(default=20, le=50)):
+async def search_tracks(
+    q: str,
+    limit: int = Query(default=20, le=50),
+    deezer_service=Depends(get_deezer_service)
+):
     try:
         if not q or not q.strip():
             raise HTTPException(
@@ -20,23 +35,29 @@ async def search_tracks(q: str, limit: int = Query(default=20, le=50)):
                 detail='Deezer API not configured. Please check environment variables.'
             )
         
-        results = deezer_service.search_tracks(q, limit)
+        # DeezerService blocks on HTTP, so it runs off the event loop
+        results = await asyncio.to_thread(deezer_service.search_tracks, q, limit)
         
         return {
             'tracks': results['tracks'],
             'total': results['total'],
-            'query': q
+            'query': q,
+            'degraded': results['degraded']
         }
     
+    except DeezerUnavailable as e:
+        raise unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f'Deezer search error: {e}')
+        log.exception('Deezer search error', error=e)
         raise HTTPException(
             status_code=500,
             detail=f'Failed to search tracks: {str(e)}'
         )
 
 @router.get('/track/{track_id}')
-async def get_track(track_id: str):
+async def get_track(track_id: str, deezer_service=Depends(get_deezer_service)):
     try:
         if not deezer_service.is_configured():
             raise HTTPException(
@@ -44,18 +65,25 @@ async def get_track(track_id: str):
                 detail='Deezer API not configured'
             )
         
-        track = deezer_service.get_track(track_id)
+        track = await asyncio.to_thread(deezer_service.get_track, track_id)
         return {'track': track}
     
+    except DeezerUnavailable as e:
+        raise unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f'Get track error: {e}')
+        log.exception('Get track error', error=e)
         raise HTTPException(
             status_code=500,
             detail=f'Failed to get track: {str(e)}'
         )
 
 @router.get('/popular')
-async def get_popular_tracks(limit: int = Query(default=50, le=100)):
+async def get_popular_tracks(
+    limit: int = Query(default=50, le=100),
+    deezer_service=Depends(get_deezer_service)
+):
     try:
         if not deezer_service.is_configured():
             raise HTTPException(
@@ -63,11 +91,15 @@ async def get_popular_tracks(limit: int = Query(default=50, le=100)):
                 detail='Deezer API not configured'
             )
         
-        tracks = deezer_service.get_popular_tracks(limit)
+        tracks = await asyncio.to_thread(deezer_service.get_popular_tracks, limit)
         return {'tracks': tracks}
     
+    except DeezerUnavailable as e:
+        raise unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f'Get popular tracks error: {e}')
+        log.exception('Get popular tracks error', error=e)
         raise HTTPException(
             status_code=500,
             detail=f'Failed to get popular tracks: {str(e)}'
@@ -76,7 +108,8 @@ async def get_popular_tracks(limit: int = Query(default=50, le=100)):
 @router.post('/recommendations')
 async def get_recommendations(
     seed_tracks: List[str],
-    limit: int = Query(default=20, le=50)
+    limit: int = Query(default=20, le=50),
+    deezer_service=Depends(get_deezer_service)
 ):
     try:
         if not deezer_service.is_configured():
@@ -85,20 +118,26 @@ async def get_recommendations(
                 detail='Deezer API not configured'
             )
         
-        tracks = deezer_service.get_recommendations(seed_tracks, limit)
+        tracks = await asyncio.to_thread(deezer_service.get_recommendations, seed_tracks, limit)
         return {'tracks': tracks}
     
+    except DeezerUnavailable as e:
+        raise unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f'Get recommendations error: {e}')
+        log.exception('Get recommendations error', error=e)
         raise HTTPException(
             status_code=500,
             detail=f'Failed to get recommendations: {str(e)}'
         )
 
 @router.get('/status')
-def get_status():
+def get_status(deezer_service=Depends(get_deezer_service)):
+    status = deezer_service.status()
     return {
         'configured': deezer_service.is_configured(),
         'api': 'Deezer',
-        'status': 'Ready'
+        'status': 'Ready' if status['circuit']['state'] == 'closed' else 'Degraded',
+        **status
     } 
\ No newline at end of file
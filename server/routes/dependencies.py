@@ -0,0 +1,34 @@
+from fastapi import Request
+
+from services.cache import TTLCache
+from services.game_manager import GameManager
+from services.storage.base import Storage
+
+
+def get_storage(request: Request) -> Storage:
+    return request.app.state.storage
+
+
+def get_game_manager(request: Request) -> GameManager:
+    return request.app.state.game_manager
+
+
+def get_read_cache(request: Request) -> TTLCache:
+    return request.app.state.read_cache
+
+
+def get_preloader(request: Request):
+    return request.app.state.preloader
+
+
+def ensure_deezer_service(app):
+    """DeezerService, built on first use rather than at import."""
+    service = getattr(app.state, 'deezer_service', None)
+    if service is None:
+        from services.deezer_service import DeezerService
+        service = app.state.deezer_service = DeezerService()
+    return service
+
+
+def get_deezer_service(request: Request):
+    return ensure_deezer_service(request.app)
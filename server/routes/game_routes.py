@@ -1,104 +1,214 @@
-from fastapi import APIRouter, HTTPException
-from typing import Optional, List, Dict
-from services.supabase_client import supabase
+import base64
+import json
+import re
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response
+from typing import Optional, List, Dict, Tuple
+from services.cache import TTLCache
+from services.game_manager import GAME_ID_CHARS, GAME_ID_LENGTH, GameManager
+from services.storage.base import (
+    DEFAULT_GAME_LIST_FIELDS, Storage, game_list_columns, make_player_key, summarize_player_stats
+)
+from routes.dependencies import get_storage, get_game_manager, get_read_cache, get_preloader
+from services.log import get_logger
+
+log = get_logger('api')
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 100
+GAME_ID_RE = re.compile(f'[{GAME_ID_CHARS}]{{{GAME_ID_LENGTH}}}')
+
+def encode_cursor(game: dict) -> str:
+    """Opaque cursor pointing just past `game` in the recent games listing."""
+    created_at = game['created_at']
+    if not isinstance(created_at, str):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, game['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor. Both values end up in driver filters, so
+    anything that isn't a timestamp and a game id is rejected here."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, game_id = json.loads(raw)
+        if not isinstance(created_at, str) or not isinstance(game_id, str):
+            raise ValueError
+        datetime.fromisoformat(created_at)
+        if not GAME_ID_RE.fullmatch(game_id):
+            raise ValueError
+        return created_at, game_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+
 @router.get('/{game_id}')
-async def get_game(game_id: str):
+async def get_game(
+    game_id: str,
+    storage: Storage = Depends(get_storage),
+    game_manager: GameManager = Depends(get_game_manager),
+    read_cache: TTLCache = Depends(get_read_cache)
+):
     try:
-        response = await supabase.table('games').select("""
-            id,
-            host_id,
-            status,
-            created_at,
-            ended_at,
-            total_rounds,
-            players (id, name, score)
-        """).eq('id', game_id).single().execute()
+        # Live games are served from memory, everything else read-through the cache
+        game = game_manager.get_game_view(game_id)
+        if game is None:
+            game = await read_cache.get_or_load(('game', game_id), lambda: storage.get_game(game_id))
         
-        if not response.data:
+        if not game:
             raise HTTPException(status_code=404, detail='Game not found')
         
-        return {'game': response.data}
+        return {'game': game}
     
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f'Get game error: {e}')
+        log.exception('Get game error', error=e)
         raise HTTPException(
             status_code=500,
             detail=f'Failed to get game: {str(e)}'
         )
 
 @router.get('/')
-async def get_recent_games(limit: int = 10):
+async def get_recent_games(
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    storage: Storage = Depends(get_storage)
+):
     try:
-        response = await supabase.table('games').select("""
-            id,
-            status,
-            created_at,
-            ended_at,
-            total_rounds,
-            players (id, name, score)
-        """).order('created_at', desc=True).limit(limit).execute()
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        before = decode_cursor(cursor) if cursor else None
+        wanted = tuple(f.strip() for f in fields.split(',') if f.strip()) if fields else DEFAULT_GAME_LIST_FIELDS
+        try:
+            game_list_columns(wanted)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        games = await storage.list_recent_games(limit, before=before, fields=wanted)
         
-        return {'games': response.data}
+        # A full page means there may be more; the cursor is built before projecting
+        next_cursor = encode_cursor(games[-1]) if len(games) == limit else None
+        games = [{f: game[f] for f in wanted if f in game} for game in games]
+        
+        return {'games': games, 'next_cursor': next_cursor}
     
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f'Get games error: {e}')
+        log.exception('Get games error', error=e)
         raise HTTPException(
             status_code=500,
             detail=f'Failed to get games: {str(e)}'
         )
 
 @router.get('/{game_id}/leaderboard')
-async def get_leaderboard(game_id: str):
+async def get_leaderboard(
+    game_id: str,
+    storage: Storage = Depends(get_storage),
+    game_manager: GameManager = Depends(get_game_manager),
+    read_cache: TTLCache = Depends(get_read_cache)
+):
     try:
-        response = await supabase.table('players')\
-            .select('id, name, score')\
-            .eq('game_id', game_id)\
-            .order('score', desc=True)\
-            .execute()
+        leaderboard = game_manager.get_leaderboard_view(game_id)
+        if leaderboard is None:
+            leaderboard = await read_cache.get_or_load(
+                ('leaderboard', game_id),
+                lambda: storage.get_leaderboard(game_id)
+            )
         
-        return {'leaderboard': response.data}
+        return {'leaderboard': leaderboard}
     
     except Exception as e:
-        print(f'Get leaderboard error: {e}')
+        log.exception('Get leaderboard error', error=e)
         raise HTTPException(
             status_code=500,
             detail=f'Failed to get leaderboard: {str(e)}'
         )
 
+def preview_response(data: bytes, range_header: Optional[str]) -> Response:
+    """Audio response honouring a single `bytes=start-end` range, which Safari needs for media."""
+    headers = {'Cache-Control': 'private, max-age=900', 'Accept-Ranges': 'bytes'}
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', range_header or '')
+    if not match or not (match.group(1) or match.group(2)):
+        return Response(data, media_type='audio/mpeg', headers=headers)
+    
+    size = len(data)
+    if match.group(1):
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    else:
+        start, end = max(0, size - int(match.group(2))), size - 1
+    if start >= size or start > end:
+        return Response(status_code=416, headers={'Content-Range': f'bytes */{size}'})
+    
+    headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return Response(data[start:end + 1], status_code=206, media_type='audio/mpeg', headers=headers)
+
+@router.get('/preview/{token}')
+async def get_preview(token: str, request: Request, preloader=Depends(get_preloader)):
+    try:
+        entry = await preloader.get(token)
+        if entry is None:
+            raise HTTPException(status_code=404, detail='Preview not found')
+        
+        if entry['data'] is None:
+            # Warming failed, so the client fetches the preview itself
+            return RedirectResponse(entry['source_url'], status_code=307)
+        
+        return preview_response(entry['data'], request.headers.get('range'))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception('Get preview error', error=e)
+        raise HTTPException(
+            status_code=500,
+            detail=f'Failed to get preview: {str(e)}'
+        )
+
 @router.get('/player/{player_id}')
-async def get_player_stats(player_id: str):
+async def get_player_stats(player_id: str, storage: Storage = Depends(get_storage)):
     try:
         # Get player data
-        player_response = await supabase.table('players').select("""
-            id,
-            name,
-            score,
-            game_id,
-            games!inner (status, created_at, ended_at)
-        """).eq('id', player_id).single().execute()
+        player = await storage.get_player(player_id)
         
-        if not player_response.data:
+        if not player:
             raise HTTPException(status_code=404, detail='Player not found')
         
-        # Get player's game history
-        history_response = await supabase.table('players')\
-            .select('id, name, score, game_id')\
-            .eq('name', player_response.data['name'])\
-            .neq('id', player_id)\
-            .order('created_at', desc=True)\
-            .execute()
+        # Lifetime rollups for everyone who played under this name
+        stats = await storage.get_player_stats(make_player_key(player['name']))
         
         return {
-            'player': player_response.data,
-            'history': history_response.data or []
+            'player': player,
+            'stats': summarize_player_stats(stats) if stats else None
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f'Get player stats error: {e}')
+        log.exception('Get player stats error', error=e)
         raise HTTPException(
             status_code=500,
             detail=f'Failed to get player stats: {str(e)}'
-        )
\ No newline at end of file
+        )
+
+@router.get('/stats/{player_name}')
+async def get_stats_by_name(player_name: str, storage: Storage = Depends(get_storage)):
+    try:
+        stats = await storage.get_player_stats(make_player_key(player_name))
+        
+        if not stats:
+            raise HTTPException(status_code=404, detail='No stats for this player')
+        
+        return {'stats': summarize_player_stats(stats)}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception('Get stats error', error=e)
+        raise HTTPException(
+            status_code=500,
+            detail=f'Failed to get stats: {str(e)}'
+        )
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Production entry point.
+
+Usage:
+  python serve.py [--workers 4] [--host 0.0.0.0] [--port 5001] [--drain-timeout 45]
+  python serve.py --workers 4 --print-nginx > /etc/nginx/conf.d/tune_guesser.conf
+  python serve.py --workers 4 --message-queue redis://localhost:6379/0
+
+Game state lives in process memory. With --workers N, worker i listens on
+port + i and only creates games whose id hashes to i. Without a message
+queue, every socket of a game has to reach that worker: the proxy routes
+sockets by their gameId query with the same hash (services/routing.py), and
+--print-nginx writes a matching config. With --message-queue, workers form
+a cluster (services/cluster.py): sockets can connect to any worker, events
+are forwarded to the worker that owns the game on a consistent hash ring,
+and room broadcasts go over the queue.
+
+uvloop and httptools are used when installed. On SIGTERM or SIGINT each
+worker drains: no new games, joins or rounds, running rounds are allowed to
+finish, games in progress are ended with their final results, and pending
+persistence is flushed. A second signal skips the drain.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from importlib.util import find_spec
+
+import uvicorn
+
+from services.log import configure_logging_from_env, get_logger
+
+log = get_logger('server')
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains live games before its normal shutdown."""
+
+    def __init__(self, config: uvicorn.Config, drain_timeout: float):
+        super().__init__(config)
+        self.drain_timeout = drain_timeout
+        self.drain_task = None
+
+    def handle_exit(self, sig, frame) -> None:
+        if self.drain_task is None and not self.should_exit:
+            self.drain_task = asyncio.get_event_loop().create_task(self.drain_and_exit())
+        else:
+            super().handle_exit(sig, frame)
+
+    async def drain_and_exit(self) -> None:
+        import main
+        try:
+            await main.drain_games(self.drain_timeout)
+        except Exception as e:
+            log.exception("❌ Error draining games", error=e)
+        self.should_exit = True
+
+
+def run_worker(index: int, args) -> None:
+    # Workers get their own process group so a terminal Ctrl-C reaches only
+    # the supervisor, which then asks each worker to drain exactly once
+    if args.workers > 1:
+        os.setpgrp()
+
+    os.environ['WORKER_INDEX'] = str(index)
+    os.environ['WORKER_COUNT'] = str(args.workers)
+    if args.message_queue:
+        os.environ['MESSAGE_QUEUE_URL'] = args.message_queue
+    os.environ.setdefault('SOCKETIO_PING_INTERVAL', str(args.ping_interval))
+    os.environ.setdefault('SOCKETIO_PING_TIMEOUT', str(args.ping_timeout))
+
+    import main
+
+    config = uvicorn.Config(
+        main.socket_app,
+        host=args.host,
+        port=args.port + index,
+        loop='uvloop' if find_spec('uvloop') else 'asyncio',
+        http='httptools' if find_spec('httptools') else 'h11',
+        # Engine.IO already sends heartbeats, so protocol-level pings are off by default
+        ws_ping_interval=args.ws_ping_interval or None,
+        ws_ping_timeout=args.ws_ping_timeout,
+        ws_max_size=1_000_000,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=5,
+        backlog=2048,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1'),
+        log_level=os.getenv('LOG_LEVEL', 'info'),
+        access_log=False
+    )
+    log.info('🚀 Worker starting', worker=index, workers=args.workers, host=args.host,
+             port=args.port + index, loop=config.loop, http=config.http)
+    DrainingServer(config, args.drain_timeout).run()
+
+
+def supervise(args) -> None:
+    """Run one process per worker, restart crashed ones, stop them all on a signal."""
+    ctx = multiprocessing.get_context('spawn')
+    # Workers configure logging when they import main; the supervisor does it here
+    configure_logging_from_env()
+
+    def start(index: int):
+        process = ctx.Process(target=run_worker, args=(index, args), name=f'worker-{index}')
+        process.start()
+        return process
+
+    workers = {index: start(index) for index in range(args.workers)}
+    stopping = False
+
+    def stop(sig, frame):
+        nonlocal stopping
+        if stopping:
+            for process in workers.values():
+                if process.is_alive():
+                    process.kill()
+            return
+        stopping = True
+        log.info('🛑 Stopping workers', workers=len(workers))
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopping:
+        for index, process in list(workers.items()):
+            if not process.is_alive() and not stopping:
+                log.warning('⚠️ Worker exited, restarting', worker=index, exitcode=process.exitcode)
+                workers[index] = start(index)
+        time.sleep(1)
+
+    # Drain timeout plus time to flush persistence and close the storage driver
+    deadline = time.monotonic() + args.drain_timeout + 15
+    for process in workers.values():
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            log.warning('⚠️ Worker did not stop in time, killing it', worker=process.name)
+            process.kill()
+
+
+def nginx_config(args) -> str:
+    servers = '\n'.join(f'    server 127.0.0.1:{args.port + i};' for i in range(args.workers))
+    if args.message_queue:
+        flags = ' --message-queue URL'
+        routing = ''
+        balance = """    # Cluster mode: any worker serves any socket, sockets stick by client address
+    hash $remote_addr consistent;"""
+    else:
+        flags = ''
+        routing = """# Sockets and preview URLs carrying ?gameId=, and /api/game/<ID> and
+# /api/game/<ID>/leaderboard, go to the worker that owns the game, which
+# serves it from memory. The hash must stay the generic (non-consistent)
+# one with servers in worker order, see services/routing.py. Everything
+# else sticks by client address.
+map $uri $tune_guesser_path_route {
+    "~^/api/game/(?<route_game_id>[A-Z0-9]{6})(/leaderboard)?/?$" $route_game_id;
+    default $remote_addr;
+}
+
+map $arg_gameId $tune_guesser_route {
+    ""      $tune_guesser_path_route;
+    default $arg_gameId;
+}
+
+"""
+        balance = '    hash $tune_guesser_route;'
+    return f"""# Generated by `python serve.py --workers {args.workers}{flags} --print-nginx`.
+{routing}map $http_upgrade $connection_upgrade {{
+    default upgrade;
+    ""      close;
+}}
+
+upstream tune_guesser {{
+{balance}
+{servers}
+}}
+
+server {{
+    listen 80;
+
+    location / {{
+        proxy_pass http://tune_guesser;
+        proxy_http_version 1.1;
+        proxy_set_header Upgrade $http_upgrade;
+        proxy_set_header Connection $connection_upgrade;
+        proxy_set_header Host $host;
+        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto $scheme;
+        proxy_read_timeout 120s;
+    }}
+}}
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', 5001)), help='port of worker 0')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', 1)))
+    parser.add_argument('--drain-timeout', type=float, default=float(os.getenv('DRAIN_TIMEOUT', 45)),
+                        help='seconds to wait for running rounds on shutdown')
+    parser.add_argument('--ping-interval', type=float, default=20, help='Engine.IO heartbeat interval')
+    parser.add_argument('--ping-timeout', type=float, default=15, help='Engine.IO heartbeat timeout')
+    parser.add_argument('--ws-ping-interval', type=float, default=0, help='WebSocket protocol pings, 0 to disable')
+    parser.add_argument('--ws-ping-timeout', type=float, default=20)
+    parser.add_argument('--keep-alive', type=int, default=15, help='HTTP keep-alive timeout')
+    parser.add_argument('--message-queue', default=os.getenv('MESSAGE_QUEUE_URL'),
+                        help='Redis URL; run the workers as one cluster instead of proxy-routed shards')
+    parser.add_argument('--print-nginx', action='store_true', help='print a matching nginx config and exit')
+    args = parser.parse_args()
+
+    if args.print_nginx:
+        print(nginx_config(args), end='')
+    elif args.workers > 1:
+        supervise(args)
+    else:
+        run_worker(0, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.log import get_logger
+
+log = get_logger('broadcast')
+
+# Builds an event payload from the items queued this tick; None skips the emit
+Build = Callable[[List[Any]], Optional[dict]]
+Emit = Callable[[str, dict, str], Awaitable[None]]
+
+
+class TickBroadcaster:
+    """Coalesces room broadcasts and sends them at most once per tick.
+
+    Each (room, event) keeps its latest payload builder plus any items queued
+    since the last flush. The builder runs at flush time, so a burst of
+    guesses in a large room costs one leaderboard build and one room emit
+    per tick instead of one per guess.
+    """
+
+    def __init__(self, emit: Emit, tick: float = 0.25):
+        self.emit = emit
+        self.tick = tick
+        self.pending: Dict[str, Dict[str, list]] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.stats = {'scheduled': 0, 'emitted': 0}
+
+    def schedule(self, room: str, event: str, build: Build, item: Any = None) -> None:
+        events = self.pending.setdefault(room, {})
+        entry = events.get(event)
+        if entry is None:
+            entry = events[event] = [build, []]
+        entry[0] = build
+        if item is not None:
+            entry[1].append(item)
+        self.stats['scheduled'] += 1
+
+        if room not in self.tasks:
+            self.tasks[room] = asyncio.create_task(self._flush_later(room))
+
+    async def _flush_later(self, room: str) -> None:
+        await asyncio.sleep(self.tick)
+        if self.tasks.get(room) is asyncio.current_task():
+            del self.tasks[room]
+        await self._send(room)
+
+    async def flush(self, room: str) -> None:
+        """Send what is pending for `room` now, e.g. before a round or game change."""
+        task = self.tasks.pop(room, None)
+        if task is not None:
+            task.cancel()
+        await self._send(room)
+
+    def discard(self, room: str) -> None:
+        task = self.tasks.pop(room, None)
+        if task is not None:
+            task.cancel()
+        self.pending.pop(room, None)
+
+    async def _send(self, room: str) -> None:
+        events = self.pending.pop(room, None)
+        if not events:
+            return
+        for event, (build, items) in events.items():
+            try:
+                payload = build(items)
+                if payload is not None:
+                    await self.emit(event, payload, room)
+                    self.stats['emitted'] += 1
+            except Exception as e:
+                log.exception("❌ Error broadcasting", event=event, room=room, error=e)
@@ -0,0 +1,71 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """Small LRU cache with per-entry expiry for read-through lookups.
+
+    Concurrent misses for the same key share one loader call, so a burst of
+    spectator polls for an evicted game costs a single database query.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self.inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            if self.entries.pop(key, None) is not None:
+                self.stats['invalidations'] += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            self.stats['hits'] += 1
+            return value
+
+        self.stats['misses'] += 1
+        inflight = self.inflight.get(key)
+        if inflight is not None:
+            return await inflight
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            value = await loader()
+            # Misses are not cached so a game persisted a moment later shows up
+            if value:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # There may be no other waiters; retrieve it so asyncio doesn't warn
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an upstream that is failing."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f'{name} is unavailable, retry in {retry_after:.0f}s')
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Stops calling an upstream that errors or slows down, and probes it to come back.
+
+    Closed: calls go through and their outcome is kept for `window`
+    seconds. Once there are at least `min_calls` in the window and the
+    share that failed, or that took over `slow_call_seconds`, reaches
+    `failure_rate` / `slow_call_rate`, the circuit opens.
+
+    Open: `before_call` raises CircuitOpen right away, so callers fall back
+    without waiting on the upstream. After `open_seconds` it half-opens.
+
+    Half open: up to `probes` calls go through. One failing or slow probe
+    opens the circuit again; `probes` good ones close it.
+
+    Calls come from worker threads (`asyncio.to_thread`), so state is
+    guarded by a lock.
+    """
+
+    def __init__(self, name: str, failure_rate: float = 0.5, slow_call_rate: float = 0.5,
+                 slow_call_seconds: float = 2.0, min_calls: int = 10, window: float = 30.0,
+                 open_seconds: float = 30.0, probes: int = 1,
+                 on_change: Optional[Callable[[str], None]] = None, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self.on_change = on_change
+        self.clock = clock
+        self.state = CLOSED
+        self.stats = {'opened': 0, 'rejected': 0}
+        # (finished at, failed, slow) per call in the window
+        self._calls: deque = deque()
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_passed = 0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpen unless a call may go to the upstream now."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - self.clock()
+                if remaining > 0:
+                    self.stats['rejected'] += 1
+                    raise CircuitOpen(self.name, remaining)
+                self._set_state(HALF_OPEN)
+                self._probes_started = self._probes_passed = 0
+            if self.state == HALF_OPEN:
+                if self._probes_started >= self.probes:
+                    self.stats['rejected'] += 1
+                    raise CircuitOpen(self.name, 0)
+                self._probes_started += 1
+
+    def record(self, seconds: float, failed: bool) -> None:
+        """Outcome of a call `before_call` let through."""
+        slow = seconds >= self.slow_call_seconds
+        now = self.clock()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._open(now)
+                else:
+                    self._probes_passed += 1
+                    if self._probes_passed >= self.probes:
+                        self._calls.clear()
+                        self._set_state(CLOSED)
+                return
+            if self.state == OPEN:
+                # Started before the circuit opened
+                return
+
+            self._calls.append((now, failed, slow))
+            while self._calls and self._calls[0][0] < now - self.window:
+                self._calls.popleft()
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, call_failed, _ in self._calls if call_failed)
+            slow_calls = sum(1 for _, _, call_slow in self._calls if call_slow)
+            if failures / total >= self.failure_rate or slow_calls / total >= self.slow_call_rate:
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._calls.clear()
+        self.stats['opened'] += 1
+        self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        if self.on_change is not None:
+            self.on_change(state)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'calls_in_window': len(self._calls),
+                'retry_after': max(0.0, self._opened_at + self.open_seconds - self.clock())
+                if self.state == OPEN else 0.0,
+                **self.stats
+            }
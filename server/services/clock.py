@@ -0,0 +1,125 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, List, Optional, Tuple
+
+
+class Clock:
+    """Wall-clock time and sleeping for game timing (round starts, guess times, countdowns)."""
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Time that only moves when every task on the clock is asleep.
+
+    Tasks started with `spawn` (or the coroutine given to `run`) sleep on
+    the clock instead of the event loop. Once all of them are waiting,
+    the clock jumps straight to the earliest wake-up, so a game that takes
+    minutes of wall-clock time runs in however long its code takes.
+    Wake-ups at the same instant fire in the order they were scheduled,
+    which keeps runs with the same seed identical.
+    """
+
+    # Loop iterations a spawned task may stay busy before it is assumed to be
+    # waiting on something other than the clock, which would never finish
+    MAX_IDLE_SPINS = 10000
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.elapsed = 0.0
+        self.timers: List[Tuple[float, int, asyncio.Future]] = []
+        self.stats = {'advances': 0, 'wakeups': 0}
+        self._order = itertools.count()
+        self._running = 0
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.elapsed)
+
+    async def sleep(self, seconds: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.timers, (self.elapsed + max(0.0, seconds), next(self._order), future))
+        self._running -= 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                # Cancelled while asleep; it was never woken, so count it back in here
+                self._running += 1
+            raise
+
+    def spawn(self, coro: Awaitable) -> asyncio.Task:
+        """Start a task whose sleeps run on this clock."""
+        self._running += 1
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._running -= 1
+
+    async def join(self, tasks: List[asyncio.Task]) -> List[Any]:
+        """Wait for tasks spawned on this clock; the waiting task counts as asleep meanwhile."""
+        waiter = asyncio.get_running_loop().create_future()
+        pending = {task for task in tasks if not task.done()}
+
+        def child_done(task: asyncio.Task) -> None:
+            # Runs right after _task_done for the same task, so the clock never
+            # sees everything idle between a child finishing and the waiter waking
+            pending.discard(task)
+            if not pending and not waiter.done():
+                self._running += 1
+                waiter.set_result(None)
+
+        if pending:
+            for task in pending:
+                task.add_done_callback(child_done)
+            self._running -= 1
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.cancelled():
+                    self._running += 1
+                raise
+        return [task.result() for task in tasks]
+
+    async def _settle(self) -> None:
+        spins = 0
+        while self._running > 0:
+            spins += 1
+            if spins > self.MAX_IDLE_SPINS:
+                raise RuntimeError('A task on the virtual clock is waiting on something other than the clock')
+            await asyncio.sleep(0)
+
+    def _advance(self) -> None:
+        when = self.timers[0][0]
+        self.elapsed = max(self.elapsed, when)
+        self.stats['advances'] += 1
+        while self.timers and self.timers[0][0] <= when:
+            _, _, future = heapq.heappop(self.timers)
+            if not future.done():
+                self._running += 1
+                self.stats['wakeups'] += 1
+                future.set_result(None)
+
+    async def run(self, coro: Awaitable) -> Any:
+        """Run `coro` to completion, advancing virtual time whenever everything is asleep."""
+        main = self.spawn(coro)
+        while True:
+            await self._settle()
+            if main.done():
+                return main.result()
+            # Drop the timers of sleeps that were cancelled
+            while self.timers and self.timers[0][2].done():
+                heapq.heappop(self.timers)
+            if not self.timers:
+                raise RuntimeError('Every task on the virtual clock is blocked and none is sleeping')
+            self._advance()
+
+
+SYSTEM_CLOCK = Clock()
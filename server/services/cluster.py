@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.routing import HashRing
+from services.log import get_logger
+
+log = get_logger('cluster')
+
+# Handles an event forwarded from another node: (event, sid, data)
+Dispatch = Callable[[str, str, Any], Awaitable[None]]
+
+
+class Cluster:
+    """Multi-node mode: every game lives on the node its id hashes to.
+
+    Sockets can connect to any node. Room broadcasts and room membership go
+    over the Socket.IO message queue (AsyncRedisManager), so a game's owner
+    can emit to, and move between rooms, sockets held by other nodes. Events
+    for a game owned elsewhere are published on the owner's channel of the
+    same Redis and handled there as if the socket were local.
+
+    Forwarded events keep their publish order within a game but different
+    games are handled concurrently, so a slow handler only holds up its own
+    game.
+    """
+
+    def __init__(self, node_id: str, nodes: List[str], url: str, channel: str = 'tune_guesser'):
+        if node_id not in nodes:
+            raise ValueError(f'Node {node_id} is not one of the cluster nodes {nodes}')
+        self.node_id = node_id
+        self.ring = HashRing(nodes)
+        self.url = url
+        self.channel = channel
+        # Sockets on this node that play in a game owned by another node
+        self.remote_sessions: Dict[str, str] = {}
+        self.redis = None
+        self._task: Optional[asyncio.Task] = None
+        # Forwarded events waiting per game, and the task working through each
+        self._inbox: Dict[str, deque] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self.stats = {'forwarded': 0, 'received': 0, 'undeliverable': 0}
+
+    def owns(self, game_id: str) -> bool:
+        return self.ring.owner(game_id) == self.node_id
+
+    def _node_channel(self, node_id: str) -> str:
+        return f'{self.channel}:node:{node_id}'
+
+    def client_manager(self):
+        """Socket.IO client manager that shares rooms and emits between nodes."""
+        import socketio
+        return socketio.AsyncRedisManager(self.url, channel=f'{self.channel}:socketio')
+
+    async def start(self, dispatch: Dispatch) -> None:
+        from redis import asyncio as aioredis
+        self.redis = aioredis.Redis.from_url(self.url)
+        self._task = asyncio.create_task(self._listen(dispatch))
+        log.info('🔗 Cluster node listening', node=self.node_id, nodes=len(self.ring.nodes), url=self.url)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for worker in list(self._workers.values()):
+            worker.cancel()
+        self._workers.clear()
+        self._inbox.clear()
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    async def _listen(self, dispatch: Dispatch) -> None:
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self._node_channel(self.node_id))
+                async for message in pubsub.listen():
+                    self.stats['received'] += 1
+                    raw = message['data']
+                    try:
+                        payload = json.loads(raw)
+                        game_id, event, sid = payload['game_id'], payload['event'], payload['sid']
+                    except (ValueError, TypeError, KeyError) as e:
+                        log.warning('⚠️ Dropping malformed forwarded event', data=raw, error=e)
+                        continue
+                    self._submit(game_id, (event, sid, payload.get('data')), dispatch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning('⚠️ Cluster channel error, resubscribing', node=self.node_id, error=e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _submit(self, game_id: str, item: tuple, dispatch: Dispatch) -> None:
+        """Queue a forwarded event behind the ones already waiting for its game."""
+        inbox = self._inbox.get(game_id)
+        if inbox is not None:
+            inbox.append(item)
+            return
+        self._inbox[game_id] = deque([item])
+        self._workers[game_id] = asyncio.create_task(self._work(game_id, dispatch))
+
+    async def _work(self, game_id: str, dispatch: Dispatch) -> None:
+        inbox = self._inbox[game_id]
+        try:
+            while inbox:
+                event, sid, data = inbox.popleft()
+                try:
+                    await dispatch(event, sid, data)
+                except Exception as e:
+                    log.exception('❌ Error handling forwarded event', event=event, game_id=game_id, error=e)
+        finally:
+            # Nothing can be appended between the empty check and here
+            self._inbox.pop(game_id, None)
+            self._workers.pop(game_id, None)
+
+    async def forward(self, game_id: str, event: str, sid: str, data: Any) -> bool:
+        """Send an event to the node that owns `game_id`. False if no node is listening."""
+        if event != 'disconnect':
+            self.remote_sessions[sid] = game_id
+        payload = json.dumps({'game_id': game_id, 'event': event, 'sid': sid, 'data': data})
+        receivers = await self.redis.publish(self._node_channel(self.ring.owner(game_id)), payload)
+        if not receivers:
+            self.stats['undeliverable'] += 1
+            return False
+        self.stats['forwarded'] += 1
+        return True
+
+    def forget(self, sid: str) -> Optional[str]:
+        """Drop a disconnected socket; returns the remote game it was playing in."""
+        return self.remote_sessions.pop(sid, None)
+
+
+def create_cluster() -> Optional[Cluster]:
+    """Cluster for MESSAGE_QUEUE_URL, or None when running a single node.
+
+    NODE_ID and CLUSTER_NODES (comma separated) name this node and all
+    nodes. Under serve.py they default to the worker's index and count.
+    """
+    url = os.getenv('MESSAGE_QUEUE_URL')
+    if not url:
+        return None
+
+    worker_count = int(os.getenv('WORKER_COUNT', 1))
+    default_nodes = ','.join(f'worker-{i}' for i in range(worker_count))
+    nodes = [n.strip() for n in os.getenv('CLUSTER_NODES', default_nodes).split(',') if n.strip()]
+    node_id = os.getenv('NODE_ID', f"worker-{os.getenv('WORKER_INDEX', 0)}")
+    return Cluster(node_id, nodes, url)
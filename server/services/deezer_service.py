@@ -1,16 +1,138 @@
 import os
-from typing import List, Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional, Tuple
 import requests
-from dotenv import load_dotenv
 
-load_dotenv()
+from services.cache import TTLCache
+from services.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from services.metrics import metrics
+from services.tracing import tracer
+from services.log import get_logger
+
+log = get_logger('deezer')
+
+DEEZER_SECONDS = metrics.histogram(
+    'tune_guesser_deezer_request_seconds', 'Deezer API call latency', ['endpoint']
+)
+DEEZER_ERRORS = metrics.counter(
+    'tune_guesser_deezer_errors_total', 'Failed Deezer API calls', ['endpoint']
+)
+DEEZER_FALLBACKS = metrics.counter(
+    'tune_guesser_deezer_fallbacks_total', 'Deezer calls answered without Deezer', ['endpoint', 'source']
+)
+DEEZER_CIRCUIT_STATE = metrics.gauge(
+    'tune_guesser_deezer_circuit_state', 'Deezer circuit breaker: 0 closed, 1 half open, 2 open'
+)
+CIRCUIT_STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Listings a game can import tracks from
+COLLECTIONS = {
+    'playlist': '/playlist/{id}/tracks',
+    'album': '/album/{id}',
+    'artist': '/artist/{id}/top'
+}
+
+
+class DeezerUnavailable(ValueError):
+    """Deezer is down or the circuit is open, and there was nothing cached to answer with."""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeezerQuotaExceeded(ValueError):
+    pass
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Errors that say Deezer is unhealthy, as opposed to a bad request or a missing track."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, DeezerQuotaExceeded)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return False
+
+
+def convert_track(track: Dict) -> Dict:
+    """Convert a Deezer track to the Spotify-like format the game uses."""
+    album = track['album']
+    return {
+        'id': str(track['id']),
+        'name': track['title'],
+        'artists': [
+            {
+                'id': str(track['artist']['id']),
+                'name': track['artist']['name']
+            }
+        ],
+        'album': {
+            'id': str(album['id']),
+            'name': album['title'],
+            'images': [
+                {
+                    'url': album['cover'],
+                    'width': 300,
+                    'height': 300
+                },
+                {
+                    'url': album['cover_medium'],
+                    'width': 250,
+                    'height': 250
+                },
+                {
+                    'url': album['cover_small'],
+                    'width': 120,
+                    'height': 120
+                }
+            ]
+        },
+        'preview_url': track.get('preview'),
+        'duration_ms': track.get('duration', 0) * 1000,  # Convert seconds to ms
+        'popularity': track.get('rank', 0),
+        'explicit': False  # Deezer doesn't provide explicit info in search
+    }
+
 
 class DeezerService:
+    """Deezer API client that keeps answering, from cache, while Deezer is down.
+
+    Every call has a timeout and goes through a circuit breaker. Responses
+    are cached: fresh for DEEZER_CACHE_TTL seconds, then kept up to
+    DEEZER_STALE_TTL to answer with when Deezer errors or the circuit is
+    open. Tracks seen in any response also go into a small catalogue,
+    which serves searches and charts nothing was cached for.
+    """
+
+    CATALOGUE_SIZE = 5000
+
     def __init__(self):
-        self.base_url = "https://api.deezer.com"
+        # DEEZER_API_URL points at a stand-in (tools/deezer_standin.py) for load tests
+        self.base_url = os.getenv("DEEZER_API_URL", "https://api.deezer.com").rstrip('/')
+        self.timeout = float(os.getenv("DEEZER_TIMEOUT", 3))
+        self.fresh_ttl = float(os.getenv("DEEZER_CACHE_TTL", 300))
+        self.cache = TTLCache(
+            ttl=float(os.getenv("DEEZER_STALE_TTL", 86400)),
+            max_entries=int(os.getenv("DEEZER_CACHE_MAX_ENTRIES", 5000))
+        )
+        self.catalogue: 'OrderedDict[str, Dict]' = OrderedDict()
+        # Calls run in worker threads; the cache and catalogue are shared between them
+        self.lock = threading.Lock()
+        self.breaker = CircuitBreaker(
+            'Deezer',
+            failure_rate=float(os.getenv("DEEZER_CIRCUIT_FAILURE_RATE", 0.5)),
+            slow_call_rate=float(os.getenv("DEEZER_CIRCUIT_SLOW_RATE", 0.5)),
+            slow_call_seconds=float(os.getenv("DEEZER_SLOW_MS", 1500)) / 1000,
+            min_calls=int(os.getenv("DEEZER_CIRCUIT_MIN_CALLS", 10)),
+            open_seconds=float(os.getenv("DEEZER_CIRCUIT_OPEN_SECONDS", 30)),
+            on_change=self._circuit_changed
+        )
+        DEEZER_CIRCUIT_STATE.set(CIRCUIT_STATES[CLOSED])
         self.spotify = None  # Keep for compatibility
         self.token_expiration = None  # Keep for compatibility
-        print('✅ Deezer API client initialized')
+        log.info('✅ Deezer API client initialized', base_url=self.base_url, timeout=self.timeout)
     
     def initialize_client(self) -> None:
         # Deezer API doesn't require authentication for basic operations
@@ -21,173 +143,163 @@ class DeezerService:
         # Deezer API doesn't require token management
         # This method is kept for compatibility with existing code
         pass
+
+    def _circuit_changed(self, state: str) -> None:
+        DEEZER_CIRCUIT_STATE.set(CIRCUIT_STATES[state])
+        if state == OPEN:
+            log.warning('⚠️ Deezer circuit open, answering from cache', retry_in=self.breaker.open_seconds)
+        elif state == CLOSED:
+            log.info('✅ Deezer circuit closed')
     
-    def search_tracks(self, query: str, limit: int = 20) -> Dict:
-        print(f'Searching for tracks: {query}')
+    def _get(self, endpoint: str, path: str, params: Optional[Dict] = None) -> Dict:
+        """GET an API path and return its JSON, timed and counted under `endpoint`."""
+        self.breaker.before_call()
+        start = time.perf_counter()
+        failed = False
         try:
-            response = requests.get(
-                f"{self.base_url}/search",
-                params={
-                    'q': query,
-                    'limit': limit
-                }
-            )
+            with tracer.span(f'deezer.{endpoint}', path=path):
+                response = requests.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
             response.raise_for_status()
-            
             data = response.json()
-            print(f'Search results: {data}')
-            
-            tracks = []
-            for track in data.get('data', []):
-                # Convert Deezer track format to match Spotify format
-                track_data = {
-                    'id': str(track['id']),
-                    'name': track['title'],
-                    'artists': [
-                        {
-                            'id': str(track['artist']['id']),
-                            'name': track['artist']['name']
-                        }
-                    ],
-                    'album': {
-                        'id': str(track['album']['id']),
-                        'name': track['album']['title'],
-                        'images': [
-                            {
-                                'url': track['album']['cover'],
-                                'width': 300,
-                                'height': 300
-                            },
-                            {
-                                'url': track['album']['cover_medium'],
-                                'width': 250,
-                                'height': 250
-                            },
-                            {
-                                'url': track['album']['cover_small'],
-                                'width': 120,
-                                'height': 120
-                            }
-                        ]
-                    },
-                    'preview_url': track.get('preview'),
-                    'duration_ms': track.get('duration', 0) * 1000,  # Convert seconds to ms
-                    'popularity': track.get('rank', 0),
-                    'explicit': False  # Deezer doesn't provide explicit info in search
-                }
-                tracks.append(track_data)
+            # Deezer reports errors (quota, missing data) with HTTP 200 and an error body
+            if isinstance(data, dict) and 'error' in data:
+                error = data['error']
+                if isinstance(error, dict) and error.get('code') == 4:
+                    raise DeezerQuotaExceeded(f"Deezer error: {error}")
+                raise ValueError(f"Deezer error: {error}")
+            return data
+        except Exception as e:
+            failed = is_upstream_failure(e)
+            DEEZER_ERRORS.inc(endpoint=endpoint)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            DEEZER_SECONDS.observe(elapsed, endpoint=endpoint)
+            self.breaker.record(elapsed, failed)
+
+    def _get_cached(self, endpoint: str, path: str, params: Optional[Dict] = None) -> Tuple[Any, bool]:
+        """`_get` through the response cache: (data, True) when it was answered from a stale entry."""
+        cached = self._cached(path, params)
+        if cached is not None and time.monotonic() - cached[0] < self.fresh_ttl:
+            return cached[1], False
+
+        try:
+            data = self._get(endpoint, path, params)
+        except Exception as e:
+            if cached is not None and (isinstance(e, CircuitOpen) or is_upstream_failure(e)):
+                DEEZER_FALLBACKS.inc(endpoint=endpoint, source='cache')
+                return cached[1], True
+            raise
+
+        with self.lock:
+            self.cache.set(self._cache_key(path, params), (time.monotonic(), data))
+        return data, False
+
+    @staticmethod
+    def _cache_key(path: str, params: Optional[Dict]) -> tuple:
+        return path, tuple(sorted((params or {}).items()))
+
+    def _cached(self, path: str, params: Optional[Dict] = None) -> Optional[Tuple[float, Any]]:
+        """(fetched at, data) of a cached response however old, or None."""
+        with self.lock:
+            return self.cache.get(self._cache_key(path, params))
+
+    def _convert_all(self, items: List[Dict]) -> List[Dict]:
+        """Tracks with previews, added to the catalogue as they go by."""
+        tracks = [convert_track(track) for track in items if track.get('preview')]
+        with self.lock:
+            for track in tracks:
+                self.catalogue[track['id']] = track
+                self.catalogue.move_to_end(track['id'])
+            while len(self.catalogue) > self.CATALOGUE_SIZE:
+                self.catalogue.popitem(last=False)
+        return tracks
+
+    def _catalogue_search(self, query: str, limit: int) -> List[Dict]:
+        words = query.lower().split()
+        with self.lock:
+            tracks = list(self.catalogue.values())
+        matches = [
+            track for track in tracks
+            if all(word in f"{track['artists'][0]['name']} {track['name']}".lower() for word in words)
+        ]
+        matches.sort(key=lambda track: track['popularity'], reverse=True)
+        return matches[:limit]
+
+    def _unavailable(self, error: Exception, message: str) -> DeezerUnavailable:
+        retry_after = error.retry_after if isinstance(error, CircuitOpen) else self.breaker.open_seconds
+        return DeezerUnavailable(message, retry_after)
+    
+    def search_tracks(self, query: str, limit: int = 20) -> Dict:
+        log.debug('Searching for tracks', query=query)
+        try:
+            data, stale = self._get_cached('search', '/search', params={
+                'q': query,
+                'limit': limit
+            })
+            log.debug('Search results', results=len(data.get('data', [])), total=data.get('total', 0), payload=data)
             
             # Filter tracks with preview URLs
-            tracks_with_previews = [t for t in tracks if t['preview_url']]
+            tracks_with_previews = self._convert_all(data.get('data', []))
             
             return {
                 'tracks': tracks_with_previews,
-                'total': data.get('total', 0)
+                'total': data.get('total', 0),
+                'degraded': stale
             }
         
         except Exception as e:
-            print(f'Deezer search error: {e}')
+            if isinstance(e, CircuitOpen) or is_upstream_failure(e):
+                # Nothing cached for this query: search the tracks seen so far
+                tracks = self._catalogue_search(query, limit)
+                if tracks:
+                    DEEZER_FALLBACKS.inc(endpoint='search', source='catalogue')
+                    return {'tracks': tracks, 'total': len(tracks), 'degraded': True}
+                DEEZER_FALLBACKS.inc(endpoint='search', source='none')
+                log.debug('Deezer search unavailable', query=query, error=e)
+                raise self._unavailable(e, 'Search is unavailable right now')
+            log.warning('Deezer search error', query=query, error=e)
             raise ValueError('Failed to search tracks')
     
     def get_track(self, track_id: str) -> Dict:
         try:
-            response = requests.get(f"{self.base_url}/track/{track_id}")
-            response.raise_for_status()
-            
-            track = response.json()
-            
-            return {
-                'id': str(track['id']),
-                'name': track['title'],
-                'artists': [
-                    {
-                        'id': str(track['artist']['id']),
-                        'name': track['artist']['name']
-                    }
-                ],
-                'album': {
-                    'id': str(track['album']['id']),
-                    'name': track['album']['title'],
-                    'images': [
-                        {
-                            'url': track['album']['cover'],
-                            'width': 300,
-                            'height': 300
-                        },
-                        {
-                            'url': track['album']['cover_medium'],
-                            'width': 250,
-                            'height': 250
-                        },
-                        {
-                            'url': track['album']['cover_small'],
-                            'width': 120,
-                            'height': 120
-                        }
-                    ]
-                },
-                'preview_url': track.get('preview'),
-                'duration_ms': track.get('duration', 0) * 1000,
-                'popularity': track.get('rank', 0),
-                'explicit': False
-            }
+            data, _ = self._get_cached('track', f"/track/{track_id}")
+            return convert_track(data)
         
         except Exception as e:
-            print(f'Deezer get track error: {e}')
+            if isinstance(e, CircuitOpen) or is_upstream_failure(e):
+                with self.lock:
+                    track = self.catalogue.get(str(track_id))
+                if track is not None:
+                    DEEZER_FALLBACKS.inc(endpoint='track', source='catalogue')
+                    return track
+                DEEZER_FALLBACKS.inc(endpoint='track', source='none')
+                raise self._unavailable(e, 'Failed to get track')
+            log.warning('Deezer get track error', track_id=track_id, error=e)
             raise ValueError('Failed to get track')
     
     def get_popular_tracks(self, limit: int = 50) -> List[Dict]:
         try:
             # Get popular tracks from Deezer charts
-            response = requests.get(f"{self.base_url}/chart/0/tracks", params={'limit': limit})
-            response.raise_for_status()
-            
-            data = response.json()
-            tracks = []
-            
-            for track in data.get('data', []):
-                if track.get('preview'):  # Only include tracks with previews
-                    track_data = {
-                        'id': str(track['id']),
-                        'name': track['title'],
-                        'artists': [
-                            {
-                                'id': str(track['artist']['id']),
-                                'name': track['artist']['name']
-                            }
-                        ],
-                        'album': {
-                            'id': str(track['album']['id']),
-                            'name': track['album']['title'],
-                            'images': [
-                                {
-                                    'url': track['album']['cover'],
-                                    'width': 300,
-                                    'height': 300
-                                },
-                                {
-                                    'url': track['album']['cover_medium'],
-                                    'width': 250,
-                                    'height': 250
-                                },
-                                {
-                                    'url': track['album']['cover_small'],
-                                    'width': 120,
-                                    'height': 120
-                                }
-                            ]
-                        },
-                        'preview_url': track.get('preview'),
-                        'duration_ms': track.get('duration', 0) * 1000,
-                        'popularity': track.get('rank', 0)
-                    }
-                    tracks.append(track_data)
-            
-            return tracks
+            data, _ = self._get_cached('chart', '/chart/0/tracks', params={'limit': limit})
+            # Only include tracks with previews
+            return self._convert_all(data.get('data', []))
         
         except Exception as e:
-            print(f'Deezer get popular tracks error: {e}')
+            if isinstance(e, CircuitOpen) or is_upstream_failure(e):
+                return self._popular_fallback(limit, e)
+            log.warning('Deezer get popular tracks error', error=e)
             raise ValueError('Failed to get popular tracks')
+
+    def _popular_fallback(self, limit: int, error: Exception) -> List[Dict]:
+        """The most popular catalogue tracks, without calling Deezer."""
+        with self.lock:
+            tracks = sorted(self.catalogue.values(), key=lambda track: track['popularity'], reverse=True)[:limit]
+        if not tracks:
+            DEEZER_FALLBACKS.inc(endpoint='chart', source='none')
+            raise self._unavailable(error, 'Failed to get popular tracks')
+        DEEZER_FALLBACKS.inc(endpoint='chart', source='catalogue')
+        return tracks
     
     def get_recommendations(self, seed_tracks: List[str], limit: int = 20) -> List[Dict]:
         try:
@@ -201,56 +313,49 @@ class DeezerService:
             artist_id = first_track['artists'][0]['id']
             
             # Get artist's top tracks
-            response = requests.get(f"{self.base_url}/artist/{artist_id}/top", params={'limit': limit})
-            response.raise_for_status()
-            
-            data = response.json()
-            tracks = []
-            
-            for track in data.get('data', []):
-                if track.get('preview'):
-                    track_data = {
-                        'id': str(track['id']),
-                        'name': track['title'],
-                        'artists': [
-                            {
-                                'id': str(track['artist']['id']),
-                                'name': track['artist']['name']
-                            }
-                        ],
-                        'album': {
-                            'id': str(track['album']['id']),
-                            'name': track['album']['title'],
-                            'images': [
-                                {
-                                    'url': track['album']['cover'],
-                                    'width': 300,
-                                    'height': 300
-                                },
-                                {
-                                    'url': track['album']['cover_medium'],
-                                    'width': 250,
-                                    'height': 250
-                                },
-                                {
-                                    'url': track['album']['cover_small'],
-                                    'width': 120,
-                                    'height': 120
-                                }
-                            ]
-                        },
-                        'preview_url': track.get('preview'),
-                        'duration_ms': track.get('duration', 0) * 1000,
-                        'popularity': track.get('rank', 0)
-                    }
-                    tracks.append(track_data)
-            
-            return tracks
+            data, _ = self._get_cached('artist_top', f"/artist/{artist_id}/top", params={'limit': limit})
+            return self._convert_all(data.get('data', []))
         
         except Exception as e:
-            print(f'Deezer recommendations error: {e}')
+            if isinstance(e, (CircuitOpen, DeezerUnavailable)) or is_upstream_failure(e):
+                # Deezer is struggling: answer from what is cached rather than
+                # making a second slow call for the chart
+                cached = self._cached('/chart/0/tracks', {'limit': limit})
+                if cached is not None:
+                    DEEZER_FALLBACKS.inc(endpoint='chart', source='cache')
+                    return self._convert_all(cached[1].get('data', []))
+                return self._popular_fallback(limit, e)
+            log.warning('Deezer recommendations error', error=e)
             # Fallback to popular tracks if recommendations fail
             return self.get_popular_tracks(limit)
+
+    def get_collection_tracks(self, kind: str, collection_id: str, limit: int = 50) -> List[Dict]:
+        """Tracks with previews of a playlist, an album or an artist's top tracks, from one listing call."""
+        if kind not in COLLECTIONS:
+            raise ValueError(f"Unknown source {kind!r}, expected one of {', '.join(COLLECTIONS)}")
+        if not str(collection_id).isdigit():
+            raise ValueError(f'Invalid {kind} id')
+        try:
+            path = COLLECTIONS[kind].format(id=collection_id)
+            if kind == 'album':
+                # Album tracks don't carry their album, so take it from the album itself
+                album, _ = self._get_cached('album', path)
+                items = [{**track, 'album': album} for track in album.get('tracks', {}).get('data', [])]
+            else:
+                data, _ = self._get_cached(kind, path, params={'limit': limit})
+                items = data.get('data', [])
+            return self._convert_all(items[:limit])
+        
+        except Exception as e:
+            if isinstance(e, CircuitOpen) or is_upstream_failure(e):
+                DEEZER_FALLBACKS.inc(endpoint=kind, source='none')
+                raise self._unavailable(e, f'Failed to load {kind}')
+            log.warning('Deezer collection error', kind=kind, collection_id=collection_id, error=e)
+            raise ValueError(f'Failed to load {kind}')
+
+    def status(self) -> dict:
+        return {'circuit': self.breaker.summary(), 'cached_responses': len(self.cache.entries),
+                'catalogue_tracks': len(self.catalogue)}
     
     def is_configured(self) -> bool:
         # Deezer API doesn't require configuration
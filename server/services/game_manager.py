@@ -1,22 +1,75 @@
+import math
 import uuid
-from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple, Any
-from services.supabase_client import supabase
+from services.persistence import PersistenceQueue
+from services.cache import TTLCache
+from services.clock import Clock, SYSTEM_CLOCK
+from services.storage.base import make_player_key
+from services.leaderboard import Ranking
+from services.tracing import tracer, traced
 import random
 
+DRAINING_MESSAGE = 'Server is restarting. Please try again in a moment.'
+
+# Player cap of a classic game; large rooms take GameManager.large_room_max_players
+MAX_PLAYERS = 8
+MAX_TRACKS_PER_PLAYER = 10
+GAME_MODES = ('classic', 'large')
+GAME_ID_CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+GAME_ID_LENGTH = 6
+
 class GameManager:
-    def __init__(self):
+    def __init__(
+        self,
+        persistence: Optional[PersistenceQueue] = None,
+        read_cache: Optional[TTLCache] = None,
+        router: Optional[Any] = None,
+        large_room_max_players: int = 500,
+        preloader: Optional[Any] = None,
+        clock: Optional[Clock] = None,
+        rng: Optional[random.Random] = None
+    ):
         self.games: Dict[str, dict] = {}
         self.player_sockets: Dict[str, dict] = {}
+        # Write-behind queue; game events never wait on the database
+        self.persistence = persistence
+        # REST read cache for games that are no longer live in memory
+        self.read_cache = read_cache
+        # With several processes, only mint game ids this one owns
+        # (services.routing.WorkerShard or services.cluster.Cluster)
+        self.router = router
+        # Set during a graceful drain: no new games, players or rounds
+        self.draining = False
+        self.large_room_max_players = large_room_max_players
+        # Warms the next round's preview while the current one plays
+        # (services.preload.PreviewPreloader)
+        self.preloader = preloader
+        # Round timing and randomness (ids, shuffles); a services.clock.VirtualClock
+        # and a seeded Random make games reproducible and run in virtual time
+        self.clock = clock or SYSTEM_CLOCK
+        self.rng = rng or random.SystemRandom()
+    
+    def new_id(self) -> str:
+        """A random UUID4 string drawn from this manager's RNG."""
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
     
     def generate_game_id(self) -> str:
-        """Generate a 6-character alphanumeric game ID."""
-        chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-        return ''.join(random.choice(chars) for _ in range(6))
+        """Generate a 6-character alphanumeric game ID owned by this process."""
+        while True:
+            game_id = ''.join(self.rng.choice(GAME_ID_CHARS) for _ in range(GAME_ID_LENGTH))
+            if game_id not in self.games and (self.router is None or self.router.owns(game_id)):
+                return game_id
     
-    async def create_game(self, host_socket_id: str, difficulty: str = 'medium') -> Tuple[str, str]:
+    @traced()
+    async def create_game(self, host_socket_id: str, difficulty: str = 'medium', mode: str = 'classic') -> Tuple[str, str]:
+        if self.draining:
+            raise ValueError(DRAINING_MESSAGE)
+        
+        if mode not in GAME_MODES:
+            raise ValueError('Invalid game mode')
+        
         game_id = self.generate_game_id()
-        host_id = str(uuid.uuid4())
+        host_id = self.new_id()
         
         # Set time limit based on difficulty
         time_limits = {
@@ -39,7 +92,19 @@ class GameManager:
             'round_start_time': None,
             'time_limit': time_limit,
             'difficulty': difficulty,
-            'created_at': datetime.now(timezone.utc)
+            'mode': mode,
+            'max_players': self.large_room_max_players if mode == 'large' else MAX_PLAYERS,
+            # Indexes over 'players' so per-player lookups don't scan the list
+            'player_index': {},
+            'ready_players': {},
+            'track_counts': {},
+            'ranking': Ranking(),
+            'joined_count': 0,
+            'lobby_seq': 0,
+            'round_guesses': [],
+            'tracks_persisted': False,
+            'created_at': self.clock.now(),
+            'ended_at': None
         }
         
         self.games[game_id] = game
@@ -49,19 +114,21 @@ class GameManager:
             'is_host': True
         }
         
-        try:
-            supabase.table('games').insert({
+        if self.persistence:
+            self.persistence.insert('games', {
                 'id': game_id,
                 'host_id': host_id,
                 'status': 'lobby',
                 'created_at': game['created_at'].isoformat()
-            }).execute()
-        except Exception as e:
-            print(f'Error saving game to database: {e}')
+            })
         
         return game_id, host_id
     
+    @traced()
     async def join_game(self, game_id: str, player_name: str, socket_id: str) -> dict:
+        if self.draining:
+            raise ValueError(DRAINING_MESSAGE)
+        
         game = self.games.get(game_id)
         if not game:
             raise ValueError('Game not found')
@@ -69,54 +136,122 @@ class GameManager:
         if game['status'] != 'lobby':
             raise ValueError('Game already started')
         
-        if len(game['players']) >= 8:
+        if len(game['players']) >= game['max_players']:
             raise ValueError('Game is full')
         
-        player_id = str(uuid.uuid4())
+        player_id = self.new_id()
         player = {
             'id': player_id,
             'name': player_name,
             'socket_id': socket_id,
             'score': 0,
             'correct_guesses': 0,
+            'total_guesses': 0,
+            'total_guess_time': 0.0,
         }
         
         game['players'].append(player)
+        game['player_index'][player_id] = player
+        game['joined_count'] += 1
+        game['ranking'].add(player_id, game['joined_count'])
         self.player_sockets[socket_id] = {
             'game_id': game_id,
             'player_id': player_id,
             'is_host': False
         }
         
-        try:
-            supabase.table('players').insert({
+        if self.persistence:
+            self.persistence.insert('players', {
                 'id': player_id,
                 'game_id': game_id,
                 'name': player_name,
                 'score': 0
-            }).execute()
-        except Exception as e:
-            print(f'Error saving player to database: {e}')
+            })
 
         return {
             'player_id': player_id,
             'player': player,
-            'players': game['players']
+            'players': game['players'],
+            'tracks': game['tracks'],
+            # Large rooms summarize the player list, so only tracks advance the lobby sequence
+            'seq': game['lobby_seq'] if game['mode'] == 'large' else self._next_lobby_seq(game)
+        }
+    
+    @traced()
+    def add_track(self, game_id: str, track: dict, player_id: str) -> dict:
+        game = self._lobby_game(game_id)
+        
+        if game['track_counts'].get(player_id, 0) >= MAX_TRACKS_PER_PLAYER:
+            raise ValueError('Maximum tracks per player reached')
+        
+        game_track = self._game_track(track, player_id)
+        
+        game['tracks'].append(game_track)
+        game['track_counts'][player_id] = game['track_counts'].get(player_id, 0) + 1
+        return {
+            'track': game_track,
+            'total_tracks': len(game['tracks']),
+            'seq': self._next_lobby_seq(game)
         }
     
-    def add_track(self, game_id: str, track: dict, player_id: str) -> List[dict]:
+    @traced()
+    def add_tracks(self, game_id: str, tracks: List[dict], player_id: str) -> dict:
+        """Add a batch of tracks in one step, as a single lobby delta.
+        
+        Tracks without a preview or already in the game are skipped, and
+        the rest are cut at the player's track limit. Every track is checked
+        before the game changes, so a bad one leaves the game as it was.
+        Each added track takes its own lobby seq, like an `add_track`, and
+        `seq` is the last of them.
+        """
+        game = self._lobby_game(game_id)
+        
+        remaining = self.remaining_tracks(game_id, player_id)
+        if remaining <= 0:
+            raise ValueError('Maximum tracks per player reached')
+        
+        present = {track['id'] for track in game['tracks']}
+        added = []
+        skipped = {'no_preview': 0, 'duplicate': 0, 'over_limit': 0}
+        for track in tracks:
+            if not track.get('preview_url'):
+                skipped['no_preview'] += 1
+            elif track.get('id') in present:
+                skipped['duplicate'] += 1
+            elif len(added) >= remaining:
+                skipped['over_limit'] += 1
+            else:
+                present.add(track['id'])
+                added.append(self._game_track(track, player_id))
+        
+        if not added:
+            raise ValueError('None of these tracks can be added')
+        
+        game['tracks'].extend(added)
+        game['track_counts'][player_id] = game['track_counts'].get(player_id, 0) + len(added)
+        return {
+            'tracks': added,
+            'skipped': skipped,
+            'total_tracks': len(game['tracks']),
+            'seq': self._next_lobby_seq(game, len(added))
+        }
+    
+    def remaining_tracks(self, game_id: str, player_id: str) -> int:
+        """How many more tracks the player may add."""
+        game = self._lobby_game(game_id)
+        return max(0, MAX_TRACKS_PER_PLAYER - game['track_counts'].get(player_id, 0))
+    
+    def _lobby_game(self, game_id: str) -> dict:
         game = self.games.get(game_id)
         if not game:
             raise ValueError('Game not found')
         
         if game['status'] != 'lobby':
             raise ValueError('Cannot add tracks after game started')
-        
-        player_tracks = [t for t in game['tracks'] if t['added_by'] == player_id]
-        if len(player_tracks) >= 10:
-            raise ValueError('Maximum tracks per player reached')
-        
-        game_track = {
+        return game
+    
+    def _game_track(self, track: dict, player_id: str) -> dict:
+        return {
             'id': track['id'],
             'name': track['name'],
             'artists': track['artists'],
@@ -126,11 +261,75 @@ class GameManager:
             'added_by': player_id,
             #'added_at': datetime.now(timezone.utc)
         }
+    
+    @traced()
+    def set_ready(self, game_id: str, player_id: str, is_ready: bool) -> dict:
+        """Update a player's ready flag; `changed` is False when it already had that value."""
+        game = self.games.get(game_id)
+        if not game:
+            raise ValueError('Game not found')
         
-        game['tracks'].append(game_track)
-        return game['tracks']
+        player = game['player_index'].get(player_id)
+        if not player:
+            raise ValueError('Player not found in game')
+        
+        was_ready = player_id in game['ready_players']
+        player['ready'] = is_ready
+        if is_ready:
+            game['ready_players'][player_id] = True
+        else:
+            game['ready_players'].pop(player_id, None)
+        
+        return {
+            'changed': was_ready != bool(is_ready),
+            **self.get_ready_state(game_id)
+        }
+    
+    def get_ready_state(self, game_id: str) -> dict:
+        game = self.games.get(game_id)
+        if not game:
+            raise ValueError('Game not found')
+        
+        total_players = len(game['players'])
+        ready_count = len(game['ready_players'])
+        return {
+            'ready_players': list(game['ready_players']),
+            'ready_count': ready_count,
+            'total_players': total_players,
+            # Only require all players to be ready
+            'can_start': total_players >= 2 and ready_count == total_players
+        }
+    
+    def is_large_room(self, game_id: str) -> bool:
+        game = self.games.get(game_id)
+        return bool(game) and game['mode'] == 'large'
     
+    def _next_lobby_seq(self, game: dict, count: int = 1) -> int:
+        """Advance the lobby sequence number shared by player and track deltas."""
+        game['lobby_seq'] += count
+        return game['lobby_seq']
+    
+    def get_lobby_snapshot(self, game_id: str) -> dict:
+        """Full lobby state for clients that detected a gap in the delta stream."""
+        game = self.games.get(game_id)
+        if not game:
+            raise ValueError('Game not found')
+        
+        # Once the game starts, tracks are in round order and would give the answers away
+        if game['status'] != 'lobby':
+            raise ValueError('Game already started')
+        
+        return {
+            'seq': game['lobby_seq'],
+            'players': game['players'],
+            'tracks': game['tracks']
+        }
+    
+    @traced()
     async def start_game(self, game_id: str) -> dict:
+        if self.draining:
+            raise ValueError(DRAINING_MESSAGE)
+        
         game = self.games.get(game_id)
         if not game:
             raise ValueError('Game not found')
@@ -143,32 +342,40 @@ class GameManager:
         
         # Shuffle tracks (even if empty, game can still start)
         if game['tracks']:
-            game['tracks'] = random.sample(game['tracks'], len(game['tracks']))
+            with tracer.span('shuffle_tracks', tracks=len(game['tracks'])):
+                game['tracks'] = self.rng.sample(game['tracks'], len(game['tracks']))
             game['total_rounds'] = min(len(game['tracks']), 20)
         else:
             game['total_rounds'] = 0
         
+        # Database ids for game_tracks rows so buffered guesses can reference them
+        for track in game['tracks']:
+            track['row_id'] = self.new_id()
+        
         game['status'] = 'playing'
+        self._preload(game, 0)
         
-        try:
-            supabase.table('games').update({
+        if self.persistence:
+            self.persistence.update('games', game_id, {
                 'status': 'playing',
                 'total_rounds': game['total_rounds']
-            }).eq('id', game_id).execute()
-        except Exception as e:
-            print(f'Error updating game status: {e}')
+            })
         
         return {
             'status': 'playing',
             'total_rounds': game['total_rounds']
         }
     
+    @traced()
     def start_next_round(self, game_id: str) -> dict:
         game = self.games.get(game_id)
         if not game:
             raise ValueError('Game not found')
         
-        if game['current_round'] >= game['total_rounds']:
+        self._close_round(game)
+        
+        # While draining no new round starts; the drain ends the game instead
+        if self.draining or game['current_round'] >= game['total_rounds']:
             # Return a special response indicating game is finished
             # The caller should handle this by calling end_game separately
             return {
@@ -179,38 +386,59 @@ class GameManager:
         
         game['current_round'] += 1
         game['current_track'] = game['tracks'][game['current_round'] - 1]
-        game['round_start_time'] = datetime.now(timezone.utc)
+        game['round_start_time'] = self.clock.now()
         
         # Reset player guesses
         for player in game['players']:
             player['current_guess'] = None
             player['guess_time'] = None
         
+        # This round's preview was warmed during the last one; start on the next
+        current_hint = self._preload(game, game['current_round'] - 1)
+        next_hint = self._preload(game, game['current_round'])
+        
+        track = {
+            'id': game['current_track']['id'],
+            'preview_url': game['current_track']['preview_url'],
+            'album': game['current_track']['album']
+        }
+        if current_hint:
+            track['preload'] = current_hint
+        
         return {
             'game_finished': False,
             'current_round': game['current_round'],
             'total_rounds': game['total_rounds'],
-            'track': {
-                'id': game['current_track']['id'],
-                'preview_url': game['current_track']['preview_url'],
-                'album': game['current_track']['album']
-            },
+            'track': track,
+            'preload_next': next_hint,
             'time_limit': game['time_limit']
         }
     
+    def _preload(self, game: dict, index: int) -> Optional[dict]:
+        """Start warming the preview of the round at `index`; returns its opaque client hint."""
+        if self.preloader is None or index >= game['total_rounds']:
+            return None
+        
+        # Kept apart from the tracks, which lobby snapshots send to clients
+        tokens = game.setdefault('preload_tokens', {})
+        if index not in tokens:
+            tokens[index] = self.preloader.prepare(game['tracks'][index])
+        return self.preloader.hint(game['id'], tokens[index])
+    
+    @traced()
     def submit_guess(self, game_id: str, player_id: str, guess: str) -> dict:
         game = self.games.get(game_id)
         if not game:
             raise ValueError('Game not found')
         
-        player = next((p for p in game['players'] if p['id'] == player_id), None)
+        player = game['player_index'].get(player_id)
         if not player:
             raise ValueError('Player not found')
         
         if player.get('current_guess'):
             raise ValueError('Already submitted guess for this round')
         
-        now = datetime.now(timezone.utc)
+        now = self.clock.now()
         time_elapsed = (now - game['round_start_time']).total_seconds()
         
         # Add 5 extra seconds for hard mode
@@ -223,6 +451,8 @@ class GameManager:
         
         player['current_guess'] = guess
         player['guess_time'] = time_elapsed
+        player['total_guesses'] += 1
+        player['total_guess_time'] += time_elapsed
         
         # Calculate score based on artist and track name matching
         score_result = self.calculate_guess_score(guess, game['current_track'])
@@ -237,28 +467,45 @@ class GameManager:
             final_points = round(base_points * speed_multiplier)
             
             player['score'] += final_points
+            game['ranking'].update(player_id, player['score'])
             if score_result['total_score'] >= 0.8:  # Consider it a "correct" guess if 80%+ accurate
                 player['correct_guesses'] += 1
             
-            return {
+            result = {
                 'correct': score_result['total_score'] >= 0.8,
                 'points': final_points,
                 'new_score': player['score'],
                 'artist_score': score_result['artist_score'],
                 'track_score': score_result['track_score'],
                 'total_score': score_result['total_score'],
-                'speed_bonus': round((speed_multiplier - 1) * 100, 1)  # Percentage bonus
+                'speed_bonus': round((speed_multiplier - 1) * 100, 1),  # Percentage bonus
+                'rank': game['ranking'].rank(player_id)
+            }
+        else:
+            result = {
+                'correct': False,
+                'points': 0,
+                'new_score': player['score'],
+                'artist_score': score_result['artist_score'],
+                'track_score': score_result['track_score'],
+                'total_score': score_result['total_score'],
+                'speed_bonus': 0,
+                'rank': game['ranking'].rank(player_id)
             }
         
-        return {
-            'correct': False,
-            'points': 0,
-            'new_score': player['score'],
-            'artist_score': score_result['artist_score'],
-            'track_score': score_result['track_score'],
-            'total_score': score_result['total_score'],
-            'speed_bonus': 0
-        }
+        # Buffered until the round closes, then written in one bulk insert
+        game['round_guesses'].append({
+            'id': self.new_id(),
+            'game_id': game_id,
+            'player_id': player_id,
+            'track_id': game['current_track']['row_id'],
+            'guess': guess,
+            'is_correct': result['correct'],
+            'points_awarded': result['points'],
+            'guess_time_seconds': round(time_elapsed, 2)
+        })
+        
+        return result
     
     def calculate_guess_score(self, guess: str, track: dict) -> dict:
         """
@@ -374,46 +621,119 @@ class GameManager:
         
         return matching_words >= len(title_words) * 0.6
     
-    def get_leaderboard(self, game_id: str) -> List[dict]:
+    @traced()
+    def get_leaderboard(self, game_id: str, limit: Optional[int] = None) -> List[dict]:
+        """Players by score, highest first; with `limit`, only the top ones."""
         game = self.games.get(game_id)
         if not game:
             raise ValueError('Game not found')
         
-        return sorted(
-            [
-                {
-                    'id': p['id'],
-                    'name': p['name'],
-                    'score': p['score'],
-                    'correct_guesses': p['correct_guesses']
-                }
-                for p in game['players']
-            ],
-            key=lambda x: x['score'],
-            reverse=True
-        )
+        players = game['player_index']
+        return [
+            {
+                'id': player_id,
+                'name': players[player_id]['name'],
+                'score': players[player_id]['score'],
+                'correct_guesses': players[player_id]['correct_guesses']
+            }
+            for player_id in game['ranking'].top(limit)
+        ]
     
+    def get_player_sample(self, game_id: str, size: int) -> List[dict]:
+        """The most recently joined players, used instead of the full list in large rooms."""
+        game = self.games.get(game_id)
+        if not game:
+            raise ValueError('Game not found')
+        
+        return game['players'][-size:] if size > 0 else []
+    
+    @traced()
     async def end_game(self, game_id: str) -> dict:
         game = self.games.get(game_id)
         if not game:
             raise ValueError('Game not found')
         
+        if game['status'] == 'finished':
+            # Already persisted and rolled up; don't count the game twice
+            return {
+                'status': 'finished',
+                'leaderboard': self.get_leaderboard(game_id)
+            }
+        
+        self._close_round(game)
         game['status'] = 'finished'
+        game['ended_at'] = self.clock.now()
         leaderboard = self.get_leaderboard(game_id)
         
-        try:
-            supabase.table('games').update({
+        if self.read_cache:
+            self.read_cache.invalidate(('game', game_id), ('leaderboard', game_id))
+        
+        if self.persistence:
+            self.persistence.update('games', game_id, {
                 'status': 'finished',
-                'ended_at': datetime.now(timezone.utc).isoformat()
-            }).eq('id', game_id).execute()
-        except Exception as e:
-            print(f'Error updating game status: {e}')
+                'ended_at': game['ended_at'].isoformat()
+            })
+            # Final scores for every player in one bulk upsert
+            self.persistence.upsert_many('players', [
+                {
+                    'id': p['id'],
+                    'game_id': game_id,
+                    'name': p['name'],
+                    'score': p['score'],
+                    'correct_guesses': p['correct_guesses']
+                }
+                for p in game['players']
+            ])
+            # Incremental rollups so the stats endpoint is a single key lookup
+            self.persistence.add_player_stats([
+                {
+                    'game_id': game_id,
+                    'player_key': make_player_key(p['name']),
+                    'name': p['name'],
+                    'games_played': 1,
+                    'total_score': p['score'],
+                    'best_score': p['score'],
+                    'total_guesses': p['total_guesses'],
+                    'correct_guesses': p['correct_guesses'],
+                    'total_guess_time_seconds': round(p['total_guess_time'], 2),
+                    'last_played_at': game['ended_at'].isoformat()
+                }
+                for p in game['players']
+            ])
         
         return {
             'status': 'finished',
             'leaderboard': leaderboard
         }
     
+    def _close_round(self, game: dict) -> None:
+        """Hand the buffered tracks and round guesses to the persistence queue in bulk."""
+        if not self.persistence:
+            game['round_guesses'] = []
+            return
+        
+        if game['status'] == 'playing' and not game['tracks_persisted']:
+            self.persistence.insert_many('game_tracks', [
+                {
+                    'id': track['row_id'],
+                    'game_id': game['id'],
+                    'track_id': track['id'],
+                    'name': track['name'][:200],
+                    'artist': ', '.join(a['name'] for a in track['artists'])[:200],
+                    'album': (track.get('album') or {}).get('name', '')[:200],
+                    'preview_url': track['preview_url'],
+                    # The host has no players row, so host-added tracks have no FK
+                    'added_by': None if track['added_by'] == game['host_id'] else track['added_by']
+                }
+                for track in game['tracks']
+            ])
+            game['tracks_persisted'] = True
+        
+        if game['round_guesses']:
+            self.persistence.insert_many('guesses', game['round_guesses'])
+            game['round_guesses'] = []
+    
+    @traced()
     async def remove_player(self, socket_id: str) -> Optional[dict]:
         player_info = self.player_sockets.get(socket_id)
         if not player_info:
@@ -429,19 +749,91 @@ class GameManager:
             return None
         
         if is_host:
+            if self.read_cache:
+                # Persistence is write-behind, so keep serving the final state
+                # from the cache until the database has caught up
+                self.read_cache.set(('game', game_id), self.get_game_view(game_id))
+                self.read_cache.set(('leaderboard', game_id), self.get_leaderboard_view(game_id))
             self.games.pop(game_id, None)
             return {'game_id': game_id, 'game_ended': True}
         else:
-            game['players'] = [p for p in game['players'] if p['id'] != player_id]
+            if game['player_index'].pop(player_id, None):
+                game['players'] = [p for p in game['players'] if p['id'] != player_id]
+            game['ready_players'].pop(player_id, None)
+            game['ranking'].remove(player_id)
             self.player_sockets.pop(socket_id, None)
             return {
                 'game_id': game_id,
+                'player_id': player_id,
                 'players': game['players'],
+                'seq': game['lobby_seq'] if game['mode'] == 'large' else self._next_lobby_seq(game),
                 'game_ended': False
             }
     
     def get_game(self, game_id: str) -> Optional[dict]:
         return self.games.get(game_id)
     
+    def get_game_ids(self, status: Optional[str] = None) -> List[str]:
+        """Ids of live games, optionally only those in one status."""
+        return [game_id for game_id, game in self.games.items() if status is None or game['status'] == status]
+    
+    def get_game_view(self, game_id: str) -> Optional[dict]:
+        """Live game in the same shape as the REST game endpoint."""
+        game = self.games.get(game_id)
+        if not game:
+            return None
+        
+        return {
+            'id': game['id'],
+            'host_id': game['host_id'],
+            'status': game['status'],
+            'created_at': game['created_at'].isoformat(),
+            'ended_at': game['ended_at'].isoformat() if game['ended_at'] else None,
+            'total_rounds': game['total_rounds'],
+            'players': [{'id': p['id'], 'name': p['name'], 'score': p['score']} for p in game['players']]
+        }
+    
+    def get_leaderboard_view(self, game_id: str) -> Optional[List[dict]]:
+        """Live leaderboard in the same shape as the REST leaderboard endpoint."""
+        if game_id not in self.games:
+            return None
+        
+        return [
+            {'id': p['id'], 'name': p['name'], 'score': p['score']}
+            for p in self.get_leaderboard(game_id)
+        ]
+    
+    def get_spectator_view(self, game_id: str, top_k: int = 10) -> Optional[dict]:
+        """Public state of a live game for spectators; no player ids, guesses or tracks lists."""
+        game = self.games.get(game_id)
+        if not game:
+            return None
+        
+        playing = game['status'] == 'playing' and game['current_track'] is not None
+        time_left = None
+        if playing and game['round_start_time']:
+            elapsed = (self.clock.now() - game['round_start_time']).total_seconds()
+            time_left = max(0, math.ceil(game['time_limit'] - elapsed))
+        
+        return {
+            'gameId': game_id,
+            'status': game['status'],
+            'mode': game['mode'],
+            'difficulty': game['difficulty'],
+            'round': {'current': game['current_round'], 'total': game['total_rounds']},
+            'timeLeft': time_left,
+            'track': {
+                'preview_url': game['current_track']['preview_url'],
+                'album': game['current_track']['album']
+            } if playing else None,
+            'playerCount': len(game['players']),
+            'readyCount': len(game['ready_players']),
+            'trackCount': len(game['tracks']),
+            'leaderboard': [
+                {'name': entry['name'], 'score': entry['score']}
+                for entry in self.get_leaderboard(game_id, limit=top_k)
+            ]
+        }
+    
     def get_player_info(self, socket_id: str) -> Optional[dict]:
         return self.player_sockets.get(socket_id)
\ No newline at end of file
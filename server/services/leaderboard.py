@@ -0,0 +1,52 @@
+import bisect
+from typing import Dict, List, Optional, Tuple
+
+
+class Ranking:
+    """Player ids ordered by score, highest first, ties in join order.
+
+    Keeps a sorted list of (-score, join order) keys, so a score change or a
+    rank lookup is a binary search instead of sorting every player. That is
+    what lets large rooms send a top-K leaderboard and each player's own rank
+    after every guess.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[int, int]] = []
+        self._ids: List[str] = []
+        self._key_by_id: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, player_id: str, order: int, score: int = 0) -> None:
+        key = (-score, order)
+        index = bisect.bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._ids.insert(index, player_id)
+        self._key_by_id[player_id] = key
+
+    def remove(self, player_id: str) -> None:
+        key = self._key_by_id.pop(player_id, None)
+        if key is None:
+            return
+        index = bisect.bisect_left(self._keys, key)
+        del self._keys[index]
+        del self._ids[index]
+
+    def update(self, player_id: str, score: int) -> None:
+        key = self._key_by_id.get(player_id)
+        if key is None or key[0] == -score:
+            return
+        self.remove(player_id)
+        self.add(player_id, key[1], score)
+
+    def rank(self, player_id: str) -> Optional[int]:
+        """1-based position of the player, or None if not ranked."""
+        key = self._key_by_id.get(player_id)
+        if key is None:
+            return None
+        return bisect.bisect_left(self._keys, key) + 1
+
+    def top(self, limit: Optional[int] = None) -> List[str]:
+        return self._ids[:limit] if limit is not None else list(self._ids)
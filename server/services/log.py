@@ -0,0 +1,219 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+ROOT = 'tune_guesser'
+LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING, 'error': logging.ERROR}
+
+
+class _Settings:
+    def __init__(self):
+        self.sample_rates: Dict[str, float] = {}
+        self.payloads = False
+        self.payload_max = 1024
+        self.stats = {'sampled_out': 0, 'dropped': 0}
+
+
+_settings = _Settings()
+
+
+def _dumps(obj: Any) -> str:
+    # Fields and payloads may hold anything (datetimes, exceptions); never fail on them
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=str, separators=(',', ':'), ensure_ascii=False)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """`socketio=0.1,deezer=0.5`: share of debug and info records kept per logger."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, rate = item.partition('=')
+        try:
+            rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            raise ValueError(f'Invalid LOG_SAMPLE entry {item!r}, expected logger=rate')
+    return rates
+
+
+def cap_payload(payload: Any) -> str:
+    """Payload as JSON, cut to the configured size. Serialized now, since the caller may mutate it."""
+    try:
+        text = _dumps(payload)
+    except Exception:
+        text = repr(payload)
+    if len(text) > _settings.payload_max:
+        return f'{text[:_settings.payload_max]}…(+{len(text) - _settings.payload_max} chars)'
+    return text
+
+
+class Log:
+    """A message plus key=value fields, e.g. `log.info('Game started', game_id=game_id, rounds=10)`.
+
+    Records below the logger's level cost one check. Debug and info records
+    are sampled per logger (LOG_SAMPLE); warnings and errors always go out.
+    `payload=` is only serialized when LOG_PAYLOADS is on, and is capped at
+    LOG_PAYLOAD_MAX characters.
+    """
+
+    __slots__ = ('name', 'logger')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.logger = logging.getLogger(f'{ROOT}.{name}')
+
+    def _log(self, level: int, msg: str, payload: Any, fields: dict, exc_info: Any = None) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.WARNING:
+            rate = _settings.sample_rates.get(self.name, 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                _settings.stats['sampled_out'] += 1
+                return
+        if payload is not None and _settings.payloads:
+            fields['payload'] = cap_payload(payload)
+        self.logger.log(level, msg, exc_info=exc_info, extra={'fields': fields})
+
+    def debug(self, msg: str, payload: Any = None, **fields: Any) -> None:
+        self._log(logging.DEBUG, msg, payload, fields)
+
+    def info(self, msg: str, payload: Any = None, **fields: Any) -> None:
+        self._log(logging.INFO, msg, payload, fields)
+
+    def warning(self, msg: str, payload: Any = None, **fields: Any) -> None:
+        self._log(logging.WARNING, msg, payload, fields)
+
+    def error(self, msg: str, payload: Any = None, exc_info: Any = None, **fields: Any) -> None:
+        self._log(logging.ERROR, msg, payload, fields, exc_info)
+
+    def exception(self, msg: str, payload: Any = None, **fields: Any) -> None:
+        """An error with the traceback of the exception being handled."""
+        self._log(logging.ERROR, msg, payload, fields, exc_info=True)
+
+
+def get_logger(name: str) -> Log:
+    return Log(name)
+
+
+def _fields(record: logging.LogRecord) -> dict:
+    return getattr(record, 'fields', None) or {}
+
+
+class TextFormatter(logging.Formatter):
+    """`12:00:01.234 INFO  socketio  ✅ Guess processed game_id=ABC123 points=750`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        stamp = time.strftime('%H:%M:%S', time.localtime(record.created))
+        name = record.name[len(ROOT) + 1:] if record.name.startswith(f'{ROOT}.') else record.name
+        line = f'{stamp}.{int(record.msecs):03d} {record.levelname:<7} {name:<10} {record.getMessage()}'
+        inline, blocks = [], []
+        for key, value in _fields(record).items():
+            # Multi-line values (stacks) go under the line, so the line itself stays greppable
+            if isinstance(value, str) and '\n' in value:
+                blocks.append(f'{key}:\n{value.rstrip()}')
+            else:
+                inline.append(f'{key}={value}')
+        if inline:
+            line += ' ' + ' '.join(inline)
+        for block in blocks:
+            line += '\n' + block
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, then the record's fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+            **_fields(record)
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return _dumps(entry)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Enqueues records as they are and never blocks; formatting is left to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _settings.stats['dropped'] += 1
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: str = 'info', fmt: str = 'text', sample: str = '', payloads: bool = False,
+                      payload_max: int = 1024, max_queue: int = 10000) -> None:
+    """Route the app's loggers through a bounded queue to a listener thread writing stdout."""
+    global _listener
+    if level.lower() not in LEVELS:
+        raise ValueError(f'Unknown LOG_LEVEL {level!r}, expected one of {", ".join(LEVELS)}')
+    if fmt not in ('text', 'json'):
+        raise ValueError(f'Unknown LOG_FORMAT {fmt!r}, expected text or json')
+
+    _settings.sample_rates = parse_sample_rates(sample)
+    _settings.payloads = payloads
+    _settings.payload_max = payload_max
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(queue.Queue(max_queue), stream)
+
+    root = logging.getLogger(ROOT)
+    root.handlers = [_DroppingQueueHandler(_listener.queue)]
+    root.setLevel(LEVELS[level.lower()])
+    root.propagate = False
+    _listener.start()
+
+
+def configure_logging_from_env() -> None:
+    """configure_logging() from LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE, LOG_PAYLOADS and LOG_PAYLOAD_MAX."""
+    configure_logging(
+        level=os.getenv('LOG_LEVEL', 'info'),
+        fmt=os.getenv('LOG_FORMAT', 'text'),
+        sample=os.getenv('LOG_SAMPLE', ''),
+        payloads=os.getenv('LOG_PAYLOADS', '0') == '1',
+        payload_max=int(os.getenv('LOG_PAYLOAD_MAX', 1024))
+    )
+
+
+def stop_logging() -> None:
+    """Write out whatever is still queued."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> dict:
+    return dict(_settings.stats)
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,137 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import List, Optional
+
+from services.metrics import metrics
+from services.log import get_logger
+
+log = get_logger('loop')
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _format_stack(frame) -> str:
+    frames = traceback.extract_stack(frame)
+    # Drop the event loop's own frames above the callback that is blocking
+    for index in range(len(frames) - 1, -1, -1):
+        if frames[index].filename.endswith(('asyncio/events.py', 'asyncio\\events.py')):
+            frames = frames[index + 1:] or frames
+            break
+    return ''.join(traceback.format_list(frames))
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopMonitor:
+    """Measures event-loop lag and captures the stack of code that blocks it.
+
+    A task on the loop sleeps `interval` seconds and records how late it
+    wakes up; that delay is time the loop spent running something else.
+    A watchdog thread checks the task's heartbeat, and when the loop has
+    not come back for `threshold` seconds it samples the loop thread's
+    stack, which is then the blocking call. One stack is kept per stall.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, window: int = 600, max_stalls: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: deque = deque(maxlen=window)
+        self.stalls: deque = deque(maxlen=max_stalls)
+        self.stats = {'stalls': 0, 'max_lag': 0.0}
+        self._heartbeat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._open_stall: Optional[dict] = None
+
+        self.lag_seconds = metrics.histogram(
+            'tune_guesser_event_loop_lag_seconds', 'How late the event loop ran a timer', buckets=LAG_BUCKETS
+        )
+        metrics.gauge('tune_guesser_event_loop_lag_quantile_seconds',
+                      'Event loop lag over the recent window', ['quantile'], collect=self.quantiles)
+        metrics.counter('tune_guesser_event_loop_stalls_total',
+                        'Times the event loop was blocked for longer than the stall threshold',
+                        collect=lambda: self.stats['stalls'])
+
+    async def start(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+        log.info('✅ Event loop monitor started', stall_ms=round(self.threshold * 1000))
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+
+    async def _measure(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            self.samples.append(lag)
+            self.lag_seconds.observe(lag)
+            stall = self._open_stall
+            if stall is not None:
+                # The stall is over; record how long it actually lasted
+                stall['blocked_ms'] = round(lag * 1000, 1)
+                self._open_stall = None
+            if lag > self.stats['max_lag']:
+                self.stats['max_lag'] = lag
+
+    def _watch(self) -> None:
+        # Beats are `interval` apart, so the loop is stalled once a beat is
+        # `threshold` late; poll often enough to catch the stall while it lasts
+        poll = max(0.005, min(self.interval, self.threshold) / 4)
+        captured_for = None
+        while not self._stopping.wait(poll):
+            beat = self._heartbeat
+            late = time.monotonic() - beat - self.interval
+            if late < self.threshold or captured_for == beat:
+                continue
+            captured_for = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = _format_stack(frame)
+            stall = {'at': time.time(), 'blocked_ms': round(late * 1000, 1), 'stack': stack}
+            self.stats['stalls'] += 1
+            self.stalls.append(stall)
+            self._open_stall = stall
+            log.warning(f'⚠️ Event loop blocked for over {late * 1000:.0f}ms', stack=stack)
+
+    def quantiles(self) -> dict:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {}
+        values = {(str(q),): _quantile(ordered, q) for q in QUANTILES}
+        values[('1.0',)] = ordered[-1]
+        return values
+
+    def summary(self) -> dict:
+        """Recent lag percentiles in milliseconds and the last captured stalls."""
+        return {
+            'lag_ms': {f'p{float(q) * 100:g}': round(value * 1000, 2) for (q,), value in self.quantiles().items()},
+            'max_lag_ms': round(self.stats['max_lag'] * 1000, 2),
+            'stalls': self.stats['stalls'],
+            'recent_stalls': list(self.stalls)
+        }
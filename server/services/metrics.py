@@ -0,0 +1,188 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from services.log import get_logger
+
+log = get_logger('metrics')
+
+# Seconds; from sub-millisecond handlers up to slow Deezer or database calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+# Read at scrape time: a number, or a value per tuple of label values
+Collect = Callable[[], Union[float, Dict[LabelValues, float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), collect: Optional[Collect] = None):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.collect = collect
+        self.values: Dict[LabelValues, float] = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        try:
+            return tuple(str(labels[name]) for name in self.labels)
+        except KeyError as e:
+            raise ValueError(f'Missing label {e} for metric {self.name}')
+
+    def samples(self) -> List[Tuple[str, LabelValues, float, str]]:
+        """(suffix, label values, value, extra label) rows to render."""
+        if self.collect is not None:
+            collected = self.collect()
+            values = collected if isinstance(collected, dict) else {(): collected}
+        else:
+            with self.lock:
+                values = dict(self.values)
+        return [('', key, value, '') for key, value in values.items()]
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for suffix, key, value, extra in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.labels, key, extra)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (+Inf last), sum]
+        self.series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[Tuple[str, LabelValues, float, str]]:
+        with self.lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self.series.items()}
+        rows = []
+        for key, (counts, total) in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                rows.append(('_bucket', key, cumulative, f'le="{_format_value(bound)}"'))
+            rows.append(('_sum', key, total, ''))
+            rows.append(('_count', key, cumulative, ''))
+        return rows
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text format (version 0.0.4)."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = (), collect: Optional[Collect] = None) -> Counter:
+        return self.register(Counter(name, help, labels, collect))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (), collect: Optional[Collect] = None) -> Gauge:
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        blocks = []
+        for metric in self.metrics.values():
+            try:
+                blocks.append(metric.render())
+            except Exception as e:
+                # One failing collector must not take the whole scrape down
+                log.warning("⚠️ Could not collect metric", metric=metric.name, error=e)
+        return '\n'.join(blocks) + '\n'
+
+
+# Process-wide registry served at /metrics
+metrics = MetricsRegistry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def instrument_packets(packet_class: type, emits: Counter, emit_bytes: Counter) -> type:
+    """A Socket.IO packet class that counts emitted events and their encoded size.
+
+    Room emits encode their packet once and send it to every member, so
+    these count emits and payload bytes per emit, before the fan-out.
+    """
+    from socketio import packet
+
+    class InstrumentedPacket(packet_class):
+        def encode(self):
+            encoded = super().encode()
+            if self.packet_type in (packet.EVENT, packet.BINARY_EVENT) and self.data:
+                parts = encoded if isinstance(encoded, list) else [encoded]
+                size = sum(len(p.encode() if isinstance(p, str) else p) for p in parts)
+                event = str(self.data[0])
+                emits.inc(event=event)
+                emit_bytes.inc(size, event=event)
+            return encoded
+
+    InstrumentedPacket.__name__ = packet_class.__name__
+    return InstrumentedPacket
@@ -0,0 +1,268 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.storage.base import Storage, merge_player_stats
+from services.tracing import tracer
+from services.log import get_logger
+
+log = get_logger('persistence')
+
+
+class PersistenceQueue:
+    """Write-behind queue for game and player mutations.
+
+    Game events enqueue mutations and return immediately. A background task
+    coalesces mutations to the same row and flushes them to the database in
+    bulk, either when `max_batch` rows are pending or every `flush_interval`
+    seconds. When the database rejects a batch its rows are retried one by
+    one, so a single bad row can't hold back the rest; rows that still fail
+    are requeued and retried with exponential backoff. When the database
+    can't be reached the batch is requeued whole without per-row retries. Player stats are queued per game and
+    player, and storage applies each of those at most once, so a retry of a
+    batch that did commit never counts a game twice.
+    """
+
+    # Flush order so foreign keys always point at rows that already exist
+    TABLE_ORDER = ('games', 'players', 'game_tracks', 'guesses', 'player_stats')
+    # When writes to one row are merged, the strongest operation is kept
+    OP_ORDER = ('insert', 'upsert', 'update', 'stats')
+
+    def __init__(
+        self,
+        storage: Storage,
+        max_batch: int = 200,
+        flush_interval: float = 0.5,
+        max_pending: int = 20000,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0
+    ):
+        self.storage = storage
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # (table, row id) -> {'op': 'insert' | 'upsert' | 'update', 'key': column, 'row': dict, 'attempts': int}
+        self.pending: 'OrderedDict[Tuple[str, Any], dict]' = OrderedDict()
+        self.stats = {'enqueued': 0, 'coalesced': 0, 'flushed': 0, 'batches': 0, 'retries': 0, 'dropped': 0}
+
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._failures = 0
+
+    def insert(self, table: str, row: dict, key: str = 'id') -> None:
+        self._enqueue(table, 'insert', row, key)
+
+    def insert_many(self, table: str, rows: List[dict], key: str = 'id') -> None:
+        for row in rows:
+            self._enqueue(table, 'insert', row, key)
+
+    def upsert_many(self, table: str, rows: List[dict], key: str = 'id') -> None:
+        """Queue complete rows that may or may not exist yet (one bulk upsert)."""
+        for row in rows:
+            self._enqueue(table, 'upsert', row, key)
+
+    def update(self, table: str, row_id: Any, patch: dict, key: str = 'id') -> None:
+        self._enqueue(table, 'update', {**patch, key: row_id}, key)
+
+    def add_player_stats(self, deltas: List[dict]) -> None:
+        """Queue per-game player_stats deltas, one slot per (game_id, player_key)."""
+        for delta in deltas:
+            self._enqueue('player_stats', 'stats', delta, 'player_key',
+                          row_id=(delta['game_id'], delta['player_key']))
+
+    def _enqueue(self, table: str, op: str, row: dict, key: str, row_id: Any = None) -> None:
+        slot = (table, row[key] if row_id is None else row_id)
+        self.stats['enqueued'] += 1
+
+        existing = self.pending.get(slot)
+        if existing:
+            if op == 'stats':
+                existing['row'] = merge_player_stats(existing['row'], row)
+            else:
+                # Later writes win; an insert followed by updates stays a single insert
+                existing['row'].update(row)
+                existing['op'] = self._stronger(existing['op'], op)
+            self.stats['coalesced'] += 1
+            return
+
+        if len(self.pending) >= self.max_pending:
+            self.stats['dropped'] += 1
+            log.warning('⚠️ Persistence queue full, dropping a row', max_pending=self.max_pending, op=op, table=table)
+            return
+
+        self.pending[slot] = {'op': op, 'key': key, 'row': dict(row), 'attempts': 0}
+
+        if len(self.pending) >= self.max_batch and self._wake is not None:
+            self._wake.set()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        log.info('💾 Persistence queue started')
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop the background task and drain everything still pending."""
+        self._stopping = True
+        if self._task is not None:
+            self._wake.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+
+        if self.pending:
+            log.warning('⚠️ Persistence queue stopped with unflushed rows', rows=len(self.pending))
+        else:
+            log.info('💾 Persistence queue drained')
+
+    async def _run(self) -> None:
+        while True:
+            if not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+            ok = await self.flush()
+
+            if self._stopping and ok and not self.pending:
+                return
+
+            if not ok:
+                delay = min(self.backoff_max, self.backoff_base * (2 ** (self._failures - 1)))
+                await asyncio.sleep(delay)
+
+    async def flush(self) -> bool:
+        """Write all pending rows. Returns False if any row failed and was requeued."""
+        if not self.pending:
+            return True
+
+        batch = self.pending
+        self.pending = OrderedDict()
+        failed_rows = False
+
+        with tracer.span('persistence.flush', rows=len(batch)):
+            groups = self._group(batch)
+            for index, (table, op, key, entries) in enumerate(groups):
+                try:
+                    await self._write(table, op, key, entries)
+                except Exception as e:
+                    self.stats['retries'] += 1
+                    log.warning('Error flushing', op=op, table=table, rows=len(entries), error=e)
+                    if self.storage.is_unavailable(e):
+                        failed = entries
+                    else:
+                        failed = await self._write_each(table, op, key, entries)
+                    if len(failed) == len(entries):
+                        # Nothing went through: requeue this group and every
+                        # group after it to keep FK order
+                        self._failures += 1
+                        for _, _, _, pending in groups[index:]:
+                            self._requeue(pending)
+                        return False
+                    self._requeue(failed)
+                    failed_rows = True
+                    failed_slots = {slot for slot, _ in failed}
+                    entries = [item for item in entries if item[0] not in failed_slots]
+
+                self.stats['flushed'] += len(entries)
+                self.stats['batches'] += 1
+
+        if failed_rows:
+            self._failures += 1
+            return False
+        self._failures = 0
+        return True
+
+    async def _write_each(self, table: str, op: str, key: str, entries: List[Tuple[Tuple[str, Any], dict]]) -> List[Tuple[Tuple[str, Any], dict]]:
+        """Retry a rejected group row by row and return the rows that still fail.
+
+        Stops at the first error that means the database went away, and
+        returns the rows not tried yet as failed too.
+        """
+        if len(entries) == 1:
+            return entries
+
+        failed = []
+        for index, item in enumerate(entries):
+            try:
+                await self._write(table, op, key, [item])
+            except Exception as e:
+                if self.storage.is_unavailable(e):
+                    return failed + entries[index:]
+                log.warning('Error flushing row', op=op, table=table, key=item[0][1], error=e)
+                failed.append(item)
+        return failed
+
+    def _group(self, batch: 'OrderedDict[Tuple[str, Any], dict]') -> List[Tuple[str, str, str, List[Tuple[Tuple[str, Any], dict]]]]:
+        """Split pending rows into (table, op, key, entries) groups in flush order."""
+        by_group: Dict[Tuple[str, str, str], List[Tuple[Tuple[str, Any], dict]]] = {}
+        for slot, entry in batch.items():
+            by_group.setdefault((slot[0], entry['op'], entry['key']), []).append((slot, entry))
+
+        def order(group_key):
+            table, op, _ = group_key
+            rank = self.TABLE_ORDER.index(table) if table in self.TABLE_ORDER else len(self.TABLE_ORDER)
+            return (self.OP_ORDER.index(op), rank)
+
+        groups = []
+        for group_key in sorted(by_group, key=order):
+            entries = by_group[group_key]
+            for start in range(0, len(entries), self.max_batch):
+                groups.append((*group_key, entries[start:start + self.max_batch]))
+        return groups
+
+    def _requeue(self, entries: List[Tuple[Tuple[str, Any], dict]]) -> None:
+        for slot, entry in entries:
+            entry['attempts'] += 1
+            if entry['attempts'] > self.max_retries:
+                self.stats['dropped'] += 1
+                log.error('⚠️ Giving up on a row', op=entry['op'], table=slot[0], key=slot[1], retries=self.max_retries)
+                continue
+
+            newer = self.pending.get(slot)
+            if newer and entry['op'] == 'stats':
+                entry['row'] = merge_player_stats(entry['row'], newer['row'])
+            elif newer:
+                # Newer values win, but the failed insert must still happen first
+                entry['row'].update(newer['row'])
+                entry['op'] = self._stronger(entry['op'], newer['op'])
+            self.pending[slot] = entry
+
+    def _stronger(self, op: str, other: str) -> str:
+        return min(op, other, key=self.OP_ORDER.index)
+
+    async def _write(self, table: str, op: str, key: str, entries: List[Tuple[Tuple[str, Any], dict]]) -> None:
+        rows = [entry['row'] for _, entry in entries]
+
+        if op == 'insert':
+            await self.storage.insert(table, rows)
+            return
+
+        if op == 'upsert':
+            await self.storage.upsert(table, rows, key=key)
+            return
+
+        if op == 'stats':
+            await self.storage.apply_player_stats(rows)
+            return
+
+        # Rows that received the same patch are updated in one statement
+        by_patch: Dict[tuple, List[Any]] = {}
+        for row in rows:
+            patch = tuple(sorted((k, v) for k, v in row.items() if k != key))
+            by_patch.setdefault(patch, []).append(row[key])
+
+        for patch, ids in by_patch.items():
+            await self.storage.update(table, dict(patch), ids, key=key)
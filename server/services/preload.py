@@ -0,0 +1,106 @@
+import asyncio
+import secrets
+from typing import Callable, Dict, Optional
+
+from services.cache import TTLCache
+from services.tracing import tracer
+from services.log import get_logger
+
+log = get_logger('preload')
+
+# Looks up a fresh track by Deezer id (DeezerService.get_track); blocking
+Resolve = Callable[[str], dict]
+# Downloads a preview URL and returns its bytes; blocking
+Fetch = Callable[[str], bytes]
+
+
+def fetch_preview(url: str, timeout: float = 5.0, max_bytes: int = 2_000_000) -> bytes:
+    import requests
+    response = requests.get(url, timeout=timeout, stream=True)
+    response.raise_for_status()
+    data = b''
+    for chunk in response.iter_content(64 * 1024):
+        data += chunk
+        if len(data) > max_bytes:
+            raise ValueError(f'Preview is larger than {max_bytes} bytes')
+    return data
+
+
+def strip_id3(data: bytes) -> bytes:
+    """Drop a leading ID3v2 tag, which can carry the title and artist."""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return data
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return data[10 + size + footer:]
+
+
+class PreviewPreloader:
+    """Warms round previews ahead of time and serves them under opaque tokens.
+
+    `prepare` returns a random token at once and, in the background,
+    re-resolves the track (Deezer preview URLs expire) and downloads the
+    preview into memory. Clients get only the token URL as a preload hint,
+    which says nothing about the track, so they can buffer the next round
+    while the current one plays.
+    """
+
+    def __init__(
+        self,
+        resolve: Optional[Resolve] = None,
+        fetch: Fetch = fetch_preview,
+        ttl: float = 900.0,
+        max_entries: int = 256
+    ):
+        self.resolve = resolve
+        self.fetch = fetch
+        # token -> {'source_url': str, 'data': Optional[bytes]}
+        self.entries = TTLCache(ttl=ttl, max_entries=max_entries)
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.stats = {'prepared': 0, 'warmed': 0, 'failed': 0, 'served': 0, 'fallbacks': 0}
+
+    def prepare(self, track: dict) -> str:
+        token = secrets.token_urlsafe(12)
+        entry = {'source_url': track['preview_url'], 'data': None}
+        self.entries.set(token, entry)
+        self.tasks[token] = asyncio.create_task(self._warm(token, entry, track))
+        self.stats['prepared'] += 1
+        return token
+
+    @staticmethod
+    def hint(game_id: str, token: str) -> dict:
+        # gameId lets a proxy route the request to the worker that holds the game
+        return {'token': token, 'url': f'/api/game/preview/{token}?gameId={game_id}'}
+
+    async def _warm(self, token: str, entry: dict, track: dict) -> None:
+        try:
+            with tracer.span('preload.warm', track_id=track['id']):
+                if self.resolve is not None:
+                    try:
+                        fresh = await asyncio.to_thread(self.resolve, track['id'])
+                        if fresh.get('preview_url'):
+                            entry['source_url'] = fresh['preview_url']
+                    except Exception as e:
+                        log.warning("⚠️ Could not re-resolve track, using its stored preview", track_id=track['id'], error=e)
+                entry['data'] = strip_id3(await asyncio.to_thread(self.fetch, entry['source_url']))
+            self.stats['warmed'] += 1
+        except Exception as e:
+            self.stats['failed'] += 1
+            log.warning("⚠️ Could not preload preview", track_id=track['id'], error=e)
+        finally:
+            self.tasks.pop(token, None)
+
+    async def get(self, token: str) -> Optional[dict]:
+        """The preloaded entry for a token, waiting for it if it is still warming."""
+        task = self.tasks.get(token)
+        if task is not None:
+            await asyncio.shield(task)
+        entry = self.entries.get(token)
+        if entry is not None:
+            self.stats['served' if entry['data'] is not None else 'fallbacks'] += 1
+        return entry
+
+    async def stop(self) -> None:
+        for task in list(self.tasks.values()):
+            task.cancel()
+        self.tasks.clear()
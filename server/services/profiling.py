@@ -0,0 +1,144 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+MAX_PROFILE_SECONDS = 60.0
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _frame_label(code) -> str:
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread from a background thread.
+
+    Nothing is installed in the profiled code, so overhead is one
+    `sys._current_frames()` walk per interval and the server runs as usual
+    while it is profiled. Output is the collapsed-stack format read by
+    flamegraph.pl and speedscope: `thread;outer;...;inner count` per line.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def run(self, seconds: float, interval: float = 0.005) -> str:
+        if not self.lock.acquire(blocking=False):
+            raise ProfilerBusy('A profile is already running')
+        try:
+            return self._sample(min(seconds, MAX_PROFILE_SECONDS), interval)
+        finally:
+            self.lock.release()
+
+    def _sample(self, seconds: float, interval: float) -> str:
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f'thread-{ident}'))
+                stacks[';'.join(reversed(labels))] += 1
+            time.sleep(interval)
+        return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+class MemoryTracker:
+    """tracemalloc snapshots, each compared with the one before it.
+
+    tracemalloc slows every allocation down while it runs, so it is only
+    on between `start` and `stop`.
+    """
+
+    def __init__(self):
+        self.previous: Optional[tracemalloc.Snapshot] = None
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.previous = None
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self.previous = None
+
+    def snapshot(self, top: int = 25) -> dict:
+        if not tracemalloc.is_tracing():
+            raise ValueError('tracemalloc is not running')
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        result = {
+            'traced_bytes': current,
+            'peak_bytes': peak,
+            'top': [
+                {'where': str(stat.traceback), 'bytes': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:top]
+            ],
+            'diff': None
+        }
+        if self.previous is not None:
+            result['diff'] = [
+                {'where': str(stat.traceback), 'bytes': stat.size, 'bytes_diff': stat.size_diff,
+                 'count_diff': stat.count_diff}
+                for stat in snapshot.compare_to(self.previous, 'lineno')[:top]
+            ]
+        self.previous = snapshot
+        return result
+
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """Bytes held by `obj` and everything it references, each object counted once."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    else:
+        if hasattr(obj, '__dict__'):
+            size += deep_sizeof(vars(obj), seen)
+        for slot in getattr(type(obj), '__slots__', ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def game_memory(games: Dict[str, dict]) -> List[dict]:
+    """Approximate memory per game, largest first, with the largest fields of each."""
+    breakdown = []
+    # Objects shared between games (interned strings, small ints) count for the first game only
+    seen: set = set()
+    for game_id, game in list(games.items()):
+        fields = {key: deep_sizeof(value, seen) for key, value in list(game.items())}
+        breakdown.append({
+            'game_id': game_id,
+            'status': game.get('status'),
+            'players': len(game.get('players', [])),
+            'tracks': len(game.get('tracks', [])),
+            'bytes': sys.getsizeof(game) + sum(fields.values()),
+            'fields': dict(sorted(fields.items(), key=lambda item: item[1], reverse=True)[:5])
+        })
+    breakdown.sort(key=lambda entry: entry['bytes'], reverse=True)
+    return breakdown
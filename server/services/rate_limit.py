@@ -0,0 +1,156 @@
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+ALLOW = 'allow'
+DUPLICATE = 'duplicate'
+LIMITED = 'limited'
+
+# Events per second and burst size for each client event
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    'createGame': (0.1, 3),
+    'joinGame': (0.5, 5),
+    'addTrack': (2, 10),
+    'addTracks': (0.5, 3),
+    'importPlaylist': (0.2, 3),
+    'setReady': (1, 5),
+    'startGame': (0.5, 3),
+    'submitGuess': (2, 5),
+    'nextRound': (1, 5),
+    'revealResults': (0.5, 3),
+    'leaveGame': (0.5, 3),
+    'requestLobbySnapshot': (0.5, 3),
+    'spectateGame': (0.5, 3),
+    'requestSpectatorSnapshot': (1, 3),
+    'stopSpectating': (0.5, 3)
+}
+DEFAULT_LIMIT = (5, 20)
+
+
+def _field(data: Any, *path: str) -> Any:
+    for name in path:
+        data = data.get(name) if isinstance(data, dict) else None
+    return data
+
+
+# Idempotent events: a repeat with the same key inside the dedupe window
+# changes nothing, so it is dropped before the handler does any work
+DEFAULT_DEDUPE: Dict[str, Callable[[Any], Hashable]] = {
+    'setReady': lambda d: (_field(d, 'gameId'), _field(d, 'playerId'), _field(d, 'isReady')),
+    'joinGame': lambda d: (_field(d, 'gameId'), _field(d, 'playerName')),
+    'addTrack': lambda d: (_field(d, 'gameId'), _field(d, 'playerId'), _field(d, 'track', 'id')),
+    'importPlaylist': lambda d: (_field(d, 'gameId'), _field(d, 'playerId'), _field(d, 'source'), _field(d, 'sourceId')),
+    'submitGuess': lambda d: (_field(d, 'gameId'), _field(d, 'playerId'), _field(d, 'guess')),
+    'requestLobbySnapshot': lambda d: _field(d, 'gameId'),
+    'spectateGame': lambda d: _field(d, 'gameId')
+}
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse `event=rate/burst,...`, e.g. `createGame=0.1/3,setReady=2/5`."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        try:
+            event, value = item.split('=')
+            rate, burst = value.split('/')
+            limits[event.strip()] = (float(rate), float(burst))
+        except ValueError:
+            raise ValueError(f'Invalid rate limit {item!r}, expected event=rate/burst')
+    return limits
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated', 'notified')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        # Whether the client was told about the current run of rejections
+        self.notified = False
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.notified = False
+            return True
+        return False
+
+
+class EventLimiter:
+    """Per-socket, per-event token buckets plus duplicate suppression.
+
+    Runs in front of the Socket.IO handlers, so a flood of events from one
+    client is dropped before it causes any game work or room broadcast.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        default: Tuple[float, float] = DEFAULT_LIMIT,
+        dedupe: Optional[Dict[str, Callable[[Any], Hashable]]] = None,
+        dedupe_window: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.default = default
+        self.dedupe = DEFAULT_DEDUPE if dedupe is None else dedupe
+        self.dedupe_window = dedupe_window
+        self.clock = clock
+        self.buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        # sid -> {event: (key, accepted at)}
+        self.last_seen: Dict[str, Dict[str, Tuple[Hashable, float]]] = {}
+        self.stats = {'allowed': Counter(), 'duplicates': Counter(), 'rate_limited': Counter()}
+
+    def check(self, sid: str, event: str, data: Any = None) -> str:
+        """ALLOW, DUPLICATE or LIMITED for one incoming event."""
+        now = self.clock()
+
+        key_of = self.dedupe.get(event)
+        key = None
+        if key_of is not None:
+            key = key_of(data)
+            previous = self.last_seen.get(sid, {}).get(event)
+            if previous is not None and previous[0] == key and now - previous[1] < self.dedupe_window:
+                self.stats['duplicates'][event] += 1
+                return DUPLICATE
+
+        buckets = self.buckets.setdefault(sid, {})
+        bucket = buckets.get(event)
+        if bucket is None:
+            rate, burst = self.limits.get(event, self.default)
+            bucket = buckets[event] = TokenBucket(rate, burst, now)
+        if not bucket.take(now):
+            self.stats['rate_limited'][event] += 1
+            return LIMITED
+
+        if key_of is not None:
+            self.last_seen.setdefault(sid, {})[event] = (key, now)
+        self.stats['allowed'][event] += 1
+        return ALLOW
+
+    def release(self, sid: str, event: str, data: Any = None) -> None:
+        """Forget an allowed event's dedupe key after it failed, so the client can retry it right away."""
+        key_of = self.dedupe.get(event)
+        if key_of is None:
+            return
+        seen = self.last_seen.get(sid, {})
+        previous = seen.get(event)
+        # A later event with another key may have replaced it meanwhile
+        if previous is not None and previous[0] == key_of(data):
+            del seen[event]
+
+    def should_notify(self, sid: str, event: str) -> bool:
+        """True once per run of rejections, so a flooding client gets one error, not one per event."""
+        bucket = self.buckets.get(sid, {}).get(event)
+        if bucket is None or bucket.notified:
+            return False
+        bucket.notified = True
+        return True
+
+    def forget(self, sid: str) -> None:
+        self.buckets.pop(sid, None)
+        self.last_seen.pop(sid, None)
@@ -0,0 +1,53 @@
+import bisect
+import hashlib
+import zlib
+from typing import Iterable, List, Tuple
+
+
+def worker_for_game(game_id: str, worker_count: int) -> int:
+    """Index of the worker that owns `game_id`.
+
+    Matches the first pick of nginx's generic `hash $key` balancing (without
+    `consistent`) over equally weighted servers listed in worker order:
+    ((crc32(key) >> 16) & 0x7fff) % number_of_servers.
+    """
+    if worker_count <= 1:
+        return 0
+    return ((zlib.crc32(game_id.encode()) >> 16) & 0x7fff) % worker_count
+
+
+class WorkerShard:
+    """Proxy-routed workers (serve.py without a message queue): the proxy picks the worker."""
+
+    def __init__(self, index: int, count: int):
+        self.index = index
+        self.count = count
+
+    def owns(self, game_id: str) -> bool:
+        return worker_for_game(game_id, self.count) == self.index
+
+
+class HashRing:
+    """Consistent hash ring mapping game ids to node ids.
+
+    Each node gets `replicas` points on the ring so games spread evenly, and
+    adding or removing a node only moves the games that hashed to it.
+    """
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 128):
+        self.nodes = sorted(set(nodes))
+        if not self.nodes:
+            raise ValueError('HashRing needs at least one node')
+        points: List[Tuple[int, str]] = sorted(
+            (self._hash(f'{node}#{i}'), node) for node in self.nodes for i in range(replicas)
+        )
+        self._keys = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+    def owner(self, key: str) -> str:
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._owners[index]
@@ -0,0 +1,82 @@
+import os
+import json
+from typing import Any
+
+from services.log import get_logger
+
+log = get_logger('server')
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional speedup
+    msgpack = None
+
+
+class OrjsonModule:
+    """Drop-in for the `json` module used by python-socketio packets.
+
+    Socket.IO text packets must be `str`, and the packet encoder passes
+    json-module keyword arguments (e.g. `separators`) that orjson ignores.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    @staticmethod
+    def loads(s, **kwargs) -> Any:
+        return orjson.loads(s)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode a payload as compact JSON bytes with the fastest available encoder."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def get_rest_serializer() -> str:
+    """Serializer for REST responses: `orjson` or `json` (WIRE_SERIALIZER, default auto)."""
+    choice = os.getenv('WIRE_SERIALIZER', 'auto').lower()
+    if choice in ('auto', 'orjson') and orjson is not None:
+        return 'orjson'
+    if choice == 'orjson':
+        log.warning('⚠️ WIRE_SERIALIZER=orjson but orjson is not installed, using json')
+    return 'json'
+
+
+def get_response_class():
+    """FastAPI default response class matching the configured REST serializer."""
+    if get_rest_serializer() == 'orjson':
+        from fastapi.responses import ORJSONResponse
+        return ORJSONResponse
+    from fastapi.responses import JSONResponse
+    return JSONResponse
+
+
+def get_socketio_options() -> dict:
+    """Keyword arguments for `socketio.AsyncServer` from SOCKETIO_SERIALIZER.
+
+    - `default`: stdlib JSON text packets (what every Socket.IO client speaks)
+    - `orjson`: the same JSON text packets, encoded with orjson
+    - `msgpack`: binary msgpack packets; clients must use socket.io-msgpack-parser
+    """
+    choice = os.getenv('SOCKETIO_SERIALIZER', 'auto').lower()
+
+    if choice == 'msgpack':
+        if msgpack is not None:
+            return {'serializer': 'msgpack'}
+        log.warning('⚠️ SOCKETIO_SERIALIZER=msgpack but msgpack is not installed, using JSON packets')
+        choice = 'auto'
+
+    if choice in ('auto', 'orjson') and orjson is not None:
+        return {'json': OrjsonModule}
+    if choice == 'orjson':
+        log.warning('⚠️ SOCKETIO_SERIALIZER=orjson but orjson is not installed, using json')
+    return {}
+
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from services.log import get_logger
+
+log = get_logger('spectators')
+
+# Builds the public view of a game, or None once it is gone
+View = Callable[[str], Optional[dict]]
+
+
+class SpectatorHub:
+    """Read-only subscriptions to the public state of games.
+
+    Spectators sit in their own room, never the players' room, so they get
+    none of the private or lobby traffic and don't count toward the player
+    cap. A new spectator gets a snapshot, then once per tick the spectator
+    room gets one delta with the fields that changed since the last tick.
+    However many spectators or game events there are, a game costs one view
+    build and at most one room emit per tick.
+
+    Spectators whose socket has fallen behind (more than `max_backlog`
+    packets queued) are left out of deltas and resynced with a snapshot once
+    their queue drains.
+    """
+
+    def __init__(
+        self,
+        sio: Any,
+        view: View,
+        tick: float = 0.5,
+        max_per_game: int = 5000,
+        max_backlog: int = 32,
+        snapshot_interval: float = 2.0
+    ):
+        self.sio = sio
+        self.view = view
+        self.tick = tick
+        self.max_per_game = max_per_game
+        self.max_backlog = max_backlog
+        self.snapshot_interval = snapshot_interval
+        # game_id -> {sid: {'last_snapshot': monotonic time, 'stale': bool}}
+        self.games: Dict[str, Dict[str, dict]] = {}
+        self.sessions: Dict[str, str] = {}
+        self.last_views: Dict[str, dict] = {}
+        self.seqs: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'snapshots': 0, 'deltas': 0, 'skipped': 0, 'rejected': 0}
+
+    @staticmethod
+    def room(game_id: str) -> str:
+        return f'spectate:{game_id}'
+
+    def count(self, game_id: Optional[str] = None) -> int:
+        if game_id is None:
+            return len(self.sessions)
+        return len(self.games.get(game_id, {}))
+
+    async def subscribe(self, sid: str, game_id: str) -> dict:
+        """Add a spectator and return its snapshot."""
+        current = self.sessions.get(sid)
+        if current == game_id:
+            # A repeated subscribe (e.g. after a reconnect) always gets its snapshot
+            return self.snapshot(sid, force=True)
+
+        spectators = self.games.get(game_id, {})
+        if len(spectators) >= self.max_per_game:
+            self.stats['rejected'] += 1
+            raise ValueError('Too many spectators for this game')
+
+        view = self.view(game_id)
+        if view is None:
+            raise ValueError('Game not found')
+
+        if current is not None:
+            await self.unsubscribe(sid)
+
+        self.games.setdefault(game_id, {})[sid] = {'last_snapshot': time.monotonic(), 'stale': False}
+        self.sessions[sid] = game_id
+        # The first spectator's snapshot is the baseline for the first delta
+        self.last_views.setdefault(game_id, view)
+        await self.sio.enter_room(sid, self.room(game_id))
+        self.stats['snapshots'] += 1
+        return {'seq': self.seqs.get(game_id, 0), **view}
+
+    async def unsubscribe(self, sid: str) -> Optional[str]:
+        game_id = self.sessions.pop(sid, None)
+        if game_id is None:
+            return None
+
+        spectators = self.games.get(game_id, {})
+        spectators.pop(sid, None)
+        if not spectators:
+            self._forget_game(game_id)
+        await self.sio.leave_room(sid, self.room(game_id))
+        return game_id
+
+    def snapshot(self, sid: str, force: bool = False) -> dict:
+        """Current public view for a spectator, at most once per `snapshot_interval` unless forced."""
+        game_id = self.sessions.get(sid)
+        if game_id is None:
+            raise ValueError('Not spectating a game')
+
+        spectator = self.games[game_id][sid]
+        now = time.monotonic()
+        if not force and now - spectator['last_snapshot'] < self.snapshot_interval:
+            self.stats['rejected'] += 1
+            raise ValueError('Too many snapshot requests. Please wait a moment.')
+
+        view = self.view(game_id)
+        if view is None:
+            raise ValueError('Game not found')
+
+        spectator['last_snapshot'] = now
+        spectator['stale'] = False
+        self.stats['snapshots'] += 1
+        return {'seq': self.seqs.get(game_id, 0), **view}
+
+    def _forget_game(self, game_id: str) -> None:
+        self.games.pop(game_id, None)
+        self.last_views.pop(game_id, None)
+        self.seqs.pop(game_id, None)
+
+    def _backlog(self, sid: str) -> int:
+        """Packets queued for a local socket; 0 for sockets held by other nodes."""
+        eio_sid = self.sio.manager.eio_sid_from_sid(sid, '/')
+        socket = self.sio.eio.sockets.get(eio_sid) if eio_sid else None
+        return socket.queue.qsize() if socket else 0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            for game_id in list(self.games):
+                try:
+                    await self.publish(game_id)
+                except Exception as e:
+                    log.exception("❌ Error streaming game to spectators", game_id=game_id, error=e)
+
+    async def publish(self, game_id: str) -> None:
+        """Send spectators of one game what changed since the last tick."""
+        spectators = self.games.get(game_id)
+        if not spectators:
+            return
+        room = self.room(game_id)
+        view = self.view(game_id)
+
+        if view is None:
+            # The game left memory; tell everyone and drop the subscriptions
+            await self.sio.emit('spectatorDelta', {
+                'seq': self.seqs.get(game_id, 0) + 1,
+                'changes': {'status': 'closed'}
+            }, room=room)
+            for sid in list(spectators):
+                self.sessions.pop(sid, None)
+            self._forget_game(game_id)
+            await self.sio.close_room(room)
+            return
+
+        last = self.last_views.get(game_id)
+        self.last_views[game_id] = view
+        changes = {key: value for key, value in view.items() if last is None or last.get(key) != value}
+        if changes:
+            self.seqs[game_id] = self.seqs.get(game_id, 0) + 1
+
+        lagging: List[str] = []
+        for sid, spectator in spectators.items():
+            if self._backlog(sid) > self.max_backlog:
+                spectator['stale'] = True
+                lagging.append(sid)
+            elif spectator['stale']:
+                # Caught up again: one snapshot instead of the deltas it missed
+                await self.sio.emit('spectatorSnapshot', self.snapshot(sid, force=True), room=sid)
+                lagging.append(sid)
+
+        if not changes:
+            return
+        self.stats['skipped'] += len(lagging)
+        self.stats['deltas'] += 1
+        await self.sio.emit('spectatorDelta', {
+            'seq': self.seqs[game_id],
+            'changes': changes
+        }, room=room, skip_sid=lagging)
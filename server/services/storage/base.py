@@ -0,0 +1,176 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Columns each driver accepts on writes; mirrors migrations/001_initial_schema.sql
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'games': ('id', 'host_id', 'status', 'total_rounds', 'created_at', 'ended_at'),
+    'players': ('id', 'game_id', 'name', 'score', 'correct_guesses', 'created_at'),
+    'game_tracks': ('id', 'game_id', 'track_id', 'name', 'artist', 'album', 'preview_url', 'added_by', 'created_at'),
+    'guesses': (
+        'id', 'game_id', 'player_id', 'track_id', 'guess', 'is_correct',
+        'points_awarded', 'guess_time_seconds', 'created_at'
+    ),
+    'player_stats': (
+        'player_key', 'name', 'games_played', 'total_score', 'best_score',
+        'total_guesses', 'correct_guesses', 'total_guess_time_seconds', 'last_played_at'
+    ),
+}
+
+# Fields the recent-games listing can project; `players` embeds the player list
+GAME_LIST_FIELDS = ('id', 'host_id', 'status', 'created_at', 'ended_at', 'total_rounds', 'players')
+DEFAULT_GAME_LIST_FIELDS = ('id', 'status', 'created_at', 'ended_at', 'total_rounds', 'players')
+
+# Rollup counters that are summed when deltas are combined
+PLAYER_STATS_SUMS = (
+    'games_played', 'total_score', 'total_guesses', 'correct_guesses', 'total_guess_time_seconds'
+)
+
+
+class Storage(ABC):
+    """Interface shared by every storage driver.
+
+    Writes take whole batches so the persistence queue can flush in bulk.
+    Reads return plain dicts in the shapes the REST routes have always
+    returned (games embed their `players`, players embed their `games`).
+    Every write and read is abstract, so a driver missing one fails when it
+    is constructed rather than on first use.
+    """
+
+    name = 'base'
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def is_unavailable(self, error: Exception) -> bool:
+        """True if `error` means the backend couldn't be reached (connection
+        lost, timeout) rather than that it rejected the rows."""
+        return isinstance(error, (OSError, asyncio.TimeoutError))
+
+    # Writes
+
+    @abstractmethod
+    async def insert(self, table: str, rows: List[dict]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert(self, table: str, rows: List[dict], key: str = 'id') -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update(self, table: str, patch: dict, ids: List, key: str = 'id') -> None:
+        raise NotImplementedError
+
+    # Reads
+
+    @abstractmethod
+    async def get_game(self, game_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_recent_games(
+        self,
+        limit: int,
+        before: Optional[Tuple[str, str]] = None,
+        fields: Sequence[str] = DEFAULT_GAME_LIST_FIELDS
+    ) -> List[dict]:
+        """Newest games first, keyset-paginated on (created_at, id).
+
+        `before` is the (created_at, id) of the last game on the previous
+        page. Rows always carry `id` and `created_at` so the caller can build
+        the next cursor, whatever `fields` asks for.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_leaderboard(self, game_id: str) -> List[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_player(self, player_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def apply_player_stats(self, deltas: List[dict]) -> None:
+        """Add per-game deltas to the player_stats rollups (see merge_player_stats).
+
+        Each delta carries the `game_id` it came from. A (game_id, player_key)
+        delta is applied at most once, so a retried batch never counts a
+        game twice (see migrations/004_player_stats_ledger.sql).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_player_stats(self, player_key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+
+def check_columns(table: str, columns: Iterable[str]) -> None:
+    """Reject unknown tables and columns before they reach generated SQL."""
+    allowed = TABLE_COLUMNS.get(table)
+    if allowed is None:
+        raise ValueError(f'Unknown table: {table}')
+
+    unknown = set(columns) - set(allowed)
+    if unknown:
+        raise ValueError(f'Unknown columns for {table}: {sorted(unknown)}')
+
+
+def game_list_columns(fields: Sequence[str]) -> Tuple[Tuple[str, ...], bool]:
+    """Split projected fields into games columns (keyset columns first) and whether to embed players."""
+    unknown = set(fields) - set(GAME_LIST_FIELDS)
+    if unknown:
+        raise ValueError(f'Unknown game fields: {sorted(unknown)}')
+
+    columns = ('id', 'created_at') + tuple(
+        f for f in GAME_LIST_FIELDS if f in fields and f not in ('id', 'created_at', 'players')
+    )
+    return columns, 'players' in fields
+
+
+def group_by_columns(rows: List[dict]) -> Dict[Tuple[str, ...], List[dict]]:
+    """Group rows by their column set so each group can be one executemany."""
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups
+
+
+def make_player_key(name: str) -> str:
+    return ' '.join(name.lower().split())[:50]
+
+
+def merge_player_stats(current: dict, delta: dict) -> dict:
+    """Combine a rollup (or pending delta) with another delta."""
+    merged = dict(current)
+    for column in PLAYER_STATS_SUMS:
+        merged[column] = (current.get(column) or 0) + (delta.get(column) or 0)
+    merged['best_score'] = max(current.get('best_score') or 0, delta.get('best_score') or 0)
+    merged['last_played_at'] = max(
+        filter(None, (current.get('last_played_at'), delta.get('last_played_at'))),
+        default=None
+    )
+    merged['name'] = delta.get('name') or current.get('name')
+    return merged
+
+
+def summarize_player_stats(row: dict) -> dict:
+    """Rollup row plus the derived averages the stats endpoint returns."""
+    games_played = row['games_played'] or 0
+    total_guesses = row['total_guesses'] or 0
+    total_guess_time = float(row['total_guess_time_seconds'] or 0)
+    return {
+        'name': row['name'],
+        'games_played': games_played,
+        'total_score': row['total_score'],
+        'best_score': row['best_score'],
+        'average_score': round(row['total_score'] / games_played, 1) if games_played else 0,
+        'total_guesses': total_guesses,
+        'correct_guesses': row['correct_guesses'],
+        'accuracy': round(row['correct_guesses'] / total_guesses, 3) if total_guesses else 0,
+        'mean_guess_time_seconds': round(total_guess_time / total_guesses, 2) if total_guesses else None,
+        'last_played_at': row['last_played_at']
+    }
@@ -0,0 +1,73 @@
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from services.metrics import metrics
+from services.tracing import tracer
+from services.storage.base import DEFAULT_GAME_LIST_FIELDS, Storage
+
+STORAGE_SECONDS = metrics.histogram(
+    'tune_guesser_storage_seconds', 'Storage call latency', ['backend', 'operation']
+)
+STORAGE_ERRORS = metrics.counter(
+    'tune_guesser_storage_errors_total', 'Failed storage calls', ['backend', 'operation']
+)
+
+
+class InstrumentedStorage(Storage):
+    """Wraps a storage driver and records the latency and errors of every call."""
+
+    def __init__(self, driver: Storage):
+        self.driver = driver
+        self.name = driver.name
+
+    async def _call(self, operation: str, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with tracer.span(f'storage.{operation}', backend=self.name):
+                return await getattr(self.driver, operation)(*args, **kwargs)
+        except Exception:
+            STORAGE_ERRORS.inc(backend=self.name, operation=operation)
+            raise
+        finally:
+            STORAGE_SECONDS.observe(time.perf_counter() - start, backend=self.name, operation=operation)
+
+    async def connect(self) -> None:
+        await self._call('connect')
+
+    async def close(self) -> None:
+        await self._call('close')
+
+    def is_unavailable(self, error: Exception) -> bool:
+        return self.driver.is_unavailable(error)
+
+    async def insert(self, table: str, rows: List[dict]) -> None:
+        await self._call('insert', table, rows)
+
+    async def upsert(self, table: str, rows: List[dict], key: str = 'id') -> None:
+        await self._call('upsert', table, rows, key=key)
+
+    async def update(self, table: str, patch: dict, ids: List, key: str = 'id') -> None:
+        await self._call('update', table, patch, ids, key=key)
+
+    async def get_game(self, game_id: str) -> Optional[dict]:
+        return await self._call('get_game', game_id)
+
+    async def list_recent_games(
+        self,
+        limit: int,
+        before: Optional[Tuple[str, str]] = None,
+        fields: Sequence[str] = DEFAULT_GAME_LIST_FIELDS
+    ) -> List[dict]:
+        return await self._call('list_recent_games', limit, before=before, fields=fields)
+
+    async def get_leaderboard(self, game_id: str) -> List[dict]:
+        return await self._call('get_leaderboard', game_id)
+
+    async def get_player(self, player_id: str) -> Optional[dict]:
+        return await self._call('get_player', player_id)
+
+    async def apply_player_stats(self, deltas: List[dict]) -> None:
+        await self._call('apply_player_stats', deltas)
+
+    async def get_player_stats(self, player_key: str) -> Optional[dict]:
+        return await self._call('get_player_stats', player_key)
@@ -0,0 +1,129 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from services.storage.base import (
+    DEFAULT_GAME_LIST_FIELDS, Storage, check_columns, game_list_columns, merge_player_stats
+)
+
+DEFAULTS = {
+    'games': {'status': 'lobby', 'total_rounds': 0, 'ended_at': None},
+    'players': {'score': 0, 'correct_guesses': 0},
+    'game_tracks': {'album': None, 'preview_url': None, 'added_by': None},
+    'guesses': {'is_correct': False, 'points_awarded': 0, 'guess_time_seconds': None},
+    'player_stats': {},
+}
+
+
+class MemoryStorage(Storage):
+    """Process-local storage for tests, simulations and running without a database."""
+
+    name = 'memory'
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, dict]] = {table: {} for table in DEFAULTS}
+        # (game_id, player_key) of every stats delta already applied
+        self.applied_stats: Set[Tuple[str, str]] = set()
+
+    async def insert(self, table: str, rows: List[dict]) -> None:
+        # Validate the whole batch first so a failed insert stores nothing,
+        # like the transactional drivers
+        seen = set()
+        for row in rows:
+            check_columns(table, row)
+            if row['id'] in self.tables[table] or row['id'] in seen:
+                raise ValueError(f'Duplicate key {row["id"]} in {table}')
+            seen.add(row['id'])
+
+        for row in rows:
+            self.tables[table][row['id']] = {
+                **DEFAULTS[table],
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                **row
+            }
+
+    async def upsert(self, table: str, rows: List[dict], key: str = 'id') -> None:
+        for row in rows:
+            check_columns(table, row)
+        for row in rows:
+            existing = self.tables[table].get(row[key])
+            if existing:
+                existing.update(row)
+            else:
+                await self.insert(table, [row])
+
+    async def update(self, table: str, patch: dict, ids: List, key: str = 'id') -> None:
+        check_columns(table, [*patch, key])
+        wanted = set(ids)
+        for row in self.tables[table].values():
+            if row.get(key) in wanted:
+                row.update(patch)
+
+    def _players_of(self, game_id: str) -> List[dict]:
+        return [
+            {'id': p['id'], 'name': p['name'], 'score': p['score']}
+            for p in self.tables['players'].values()
+            if p['game_id'] == game_id
+        ]
+
+    async def get_game(self, game_id: str) -> Optional[dict]:
+        game = self.tables['games'].get(game_id)
+        if not game:
+            return None
+        return {**game, 'players': self._players_of(game_id)}
+
+    async def list_recent_games(
+        self,
+        limit: int,
+        before: Optional[Tuple[str, str]] = None,
+        fields: Sequence[str] = DEFAULT_GAME_LIST_FIELDS
+    ) -> List[dict]:
+        columns, include_players = game_list_columns(fields)
+        games = sorted(self.tables['games'].values(), key=lambda g: (g['created_at'], g['id']), reverse=True)
+        if before:
+            games = [g for g in games if (g['created_at'], g['id']) < tuple(before)]
+
+        page = []
+        for g in games[:limit]:
+            row = {c: g.get(c) for c in columns}
+            if include_players:
+                row['players'] = self._players_of(g['id'])
+            page.append(row)
+        return page
+
+    async def get_leaderboard(self, game_id: str) -> List[dict]:
+        return sorted(self._players_of(game_id), key=lambda p: p['score'], reverse=True)
+
+    async def get_player(self, player_id: str) -> Optional[dict]:
+        player = self.tables['players'].get(player_id)
+        if not player:
+            return None
+        game = self.tables['games'].get(player['game_id'])
+        if not game:
+            return None
+        return {
+            'id': player['id'],
+            'name': player['name'],
+            'score': player['score'],
+            'game_id': player['game_id'],
+            'games': {'status': game['status'], 'created_at': game['created_at'], 'ended_at': game['ended_at']}
+        }
+
+    async def apply_player_stats(self, deltas: List[dict]) -> None:
+        stats = self.tables['player_stats']
+        batch = []
+        for delta in deltas:
+            delta = dict(delta)
+            applied = (delta.pop('game_id'), delta['player_key'])
+            check_columns('player_stats', delta)
+            batch.append((applied, delta))
+
+        for applied, delta in batch:
+            if applied in self.applied_stats:
+                continue
+            self.applied_stats.add(applied)
+            key = delta['player_key']
+            stats[key] = merge_player_stats(stats.get(key, {'player_key': key}), delta)
+
+    async def get_player_stats(self, player_key: str) -> Optional[dict]:
+        row = self.tables['player_stats'].get(player_key)
+        return dict(row) if row else None
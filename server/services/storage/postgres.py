@@ -0,0 +1,220 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+
+from services.storage.base import (
+    DEFAULT_GAME_LIST_FIELDS, Storage, check_columns, game_list_columns, group_by_columns
+)
+from services.log import get_logger
+
+log = get_logger('storage')
+
+TIMESTAMP_COLUMNS = {'created_at', 'ended_at', 'last_played_at'}
+NUMERIC_COLUMNS = {'guess_time_seconds', 'total_guess_time_seconds'}
+
+# Hot queries. asyncpg prepares each distinct query string once per pooled
+# connection and reuses the prepared statement from its statement cache.
+GET_GAME = """
+SELECT g.id, g.host_id, g.status, g.created_at, g.ended_at, g.total_rounds,
+       COALESCE((
+         SELECT json_agg(json_build_object('id', p.id, 'name', p.name, 'score', p.score))
+         FROM players p WHERE p.game_id = g.id
+       ), '[]'::json) AS players
+FROM games g
+WHERE g.id = $1
+"""
+# Recent games page, keyset-paginated on idx_games_created_at_id
+# (migrations/003_games_keyset_index.sql). The select list comes from
+# game_list_columns(), so there is one prepared statement per projection.
+RECENT_GAMES = """
+SELECT {columns}
+FROM games g
+ORDER BY g.created_at DESC, g.id DESC
+LIMIT $1
+"""
+RECENT_GAMES_BEFORE = """
+SELECT {columns}
+FROM games g
+WHERE (g.created_at, g.id) < ($1, $2)
+ORDER BY g.created_at DESC, g.id DESC
+LIMIT $3
+"""
+GAME_PLAYERS_JSON = """COALESCE((
+         SELECT json_agg(json_build_object('id', p.id, 'name', p.name, 'score', p.score))
+         FROM players p WHERE p.game_id = g.id
+       ), '[]'::json) AS players"""
+LEADERBOARD = 'SELECT id, name, score FROM players WHERE game_id = $1 ORDER BY score DESC'
+GET_PLAYER = """
+SELECT p.id, p.name, p.score, p.game_id, g.status, g.created_at, g.ended_at
+FROM players p JOIN games g ON g.id = p.game_id
+WHERE p.id = $1
+"""
+# Only adds the delta when its (game_id, player_key) row is new in the
+# player_stats_applied ledger (migrations/004_player_stats_ledger.sql)
+APPLY_PLAYER_STATS = """
+WITH fresh AS (
+  INSERT INTO player_stats_applied (game_id, player_key)
+  VALUES ($1::varchar, $2::varchar)
+  ON CONFLICT DO NOTHING
+  RETURNING player_key
+)
+INSERT INTO player_stats AS s (
+  player_key, name, games_played, total_score, best_score,
+  total_guesses, correct_guesses, total_guess_time_seconds, last_played_at
+)
+SELECT player_key, $3::varchar, $4::integer, $5::bigint, $6::integer,
+       $7::integer, $8::integer, $9::numeric, $10::timestamptz
+FROM fresh
+ON CONFLICT (player_key) DO UPDATE SET
+  name = EXCLUDED.name,
+  games_played = s.games_played + EXCLUDED.games_played,
+  total_score = s.total_score + EXCLUDED.total_score,
+  best_score = GREATEST(s.best_score, EXCLUDED.best_score),
+  total_guesses = s.total_guesses + EXCLUDED.total_guesses,
+  correct_guesses = s.correct_guesses + EXCLUDED.correct_guesses,
+  total_guess_time_seconds = s.total_guess_time_seconds + EXCLUDED.total_guess_time_seconds,
+  last_played_at = GREATEST(s.last_played_at, EXCLUDED.last_played_at)
+"""
+GET_PLAYER_STATS = """
+SELECT player_key, name, games_played, total_score, best_score,
+       total_guesses, correct_guesses, total_guess_time_seconds, last_played_at
+FROM player_stats
+WHERE player_key = $1
+"""
+PLAYER_STATS_COLUMNS = (
+    'player_key', 'name', 'games_played', 'total_score', 'best_score',
+    'total_guesses', 'correct_guesses', 'total_guess_time_seconds', 'last_played_at'
+)
+
+
+def _to_db(column: str, value):
+    """Convert the JSON-friendly values GameManager produces into asyncpg types."""
+    if value is None:
+        return None
+    if column in TIMESTAMP_COLUMNS and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if column in NUMERIC_COLUMNS and isinstance(value, float):
+        return Decimal(str(value))
+    return value
+
+
+class PostgresStorage(Storage):
+    """Postgres storage over an asyncpg connection pool.
+
+    Works against Supabase's database directly or a local Postgres that has
+    the migrations in `migrations/` applied.
+    """
+
+    name = 'postgres'
+
+    def __init__(self, dsn: str, min_size: int = 2, max_size: int = 10, statement_cache_size: int = 256):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.pool = None
+
+    async def connect(self) -> None:
+        import asyncpg
+
+        async def init_connection(conn):
+            await conn.set_type_codec('json', encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size,
+            init=init_connection
+        )
+        log.info('✅ Postgres pool ready', min_size=self.min_size, max_size=self.max_size)
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    def is_unavailable(self, error: Exception) -> bool:
+        import asyncpg
+        return super().is_unavailable(error) or isinstance(error, (
+            asyncpg.PostgresConnectionError, asyncpg.InterfaceError,
+            asyncpg.CannotConnectNowError, asyncpg.TooManyConnectionsError
+        ))
+
+    async def _fetch(self, sql: str, *args) -> List[dict]:
+        rows = await self.pool.fetch(sql, *args)
+        return [dict(row) for row in rows]
+
+    async def _write_rows(self, table: str, rows: List[dict], conflict_key: Optional[str] = None) -> None:
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                for columns, group in group_by_columns(rows).items():
+                    check_columns(table, columns)
+                    placeholders = ', '.join(f'${i}' for i in range(1, len(columns) + 1))
+                    sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})'
+                    if conflict_key:
+                        updates = ', '.join(f'{c} = EXCLUDED.{c}' for c in columns if c != conflict_key)
+                        sql += f' ON CONFLICT ({conflict_key}) DO UPDATE SET {updates}'
+                    await conn.executemany(sql, [
+                        tuple(_to_db(c, row[c]) for c in columns) for row in group
+                    ])
+
+    async def insert(self, table: str, rows: List[dict]) -> None:
+        await self._write_rows(table, rows)
+
+    async def upsert(self, table: str, rows: List[dict], key: str = 'id') -> None:
+        await self._write_rows(table, rows, conflict_key=key)
+
+    async def update(self, table: str, patch: dict, ids: List, key: str = 'id') -> None:
+        columns = tuple(patch)
+        check_columns(table, [*columns, key])
+        assignments = ', '.join(f'{c} = ${i}' for i, c in enumerate(columns, start=1))
+        sql = f'UPDATE {table} SET {assignments} WHERE {key} = ANY(${len(columns) + 1})'
+        await self.pool.execute(sql, *(_to_db(c, patch[c]) for c in columns), list(ids))
+
+    async def get_game(self, game_id: str) -> Optional[dict]:
+        rows = await self._fetch(GET_GAME, game_id)
+        return rows[0] if rows else None
+
+    async def list_recent_games(
+        self,
+        limit: int,
+        before: Optional[Tuple[str, str]] = None,
+        fields: Sequence[str] = DEFAULT_GAME_LIST_FIELDS
+    ) -> List[dict]:
+        columns, include_players = game_list_columns(fields)
+        select = [f'g.{c}' for c in columns]
+        if include_players:
+            select.append(GAME_PLAYERS_JSON)
+
+        if before:
+            created_at, game_id = before
+            sql = RECENT_GAMES_BEFORE.format(columns=', '.join(select))
+            return await self._fetch(sql, _to_db('created_at', created_at), game_id, limit)
+        return await self._fetch(RECENT_GAMES.format(columns=', '.join(select)), limit)
+
+    async def get_leaderboard(self, game_id: str) -> List[dict]:
+        return await self._fetch(LEADERBOARD, game_id)
+
+    async def get_player(self, player_id: str) -> Optional[dict]:
+        rows = await self._fetch(GET_PLAYER, player_id)
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'score': row['score'],
+            'game_id': row['game_id'],
+            'games': {'status': row['status'], 'created_at': row['created_at'], 'ended_at': row['ended_at']}
+        }
+
+    async def apply_player_stats(self, deltas: List[dict]) -> None:
+        await self.pool.executemany(APPLY_PLAYER_STATS, [
+            (d['game_id'], *(_to_db(c, d[c]) for c in PLAYER_STATS_COLUMNS)) for d in deltas
+        ])
+
+    async def get_player_stats(self, player_key: str) -> Optional[dict]:
+        rows = await self._fetch(GET_PLAYER_STATS, player_key)
+        return rows[0] if rows else None
@@ -0,0 +1,258 @@
+import asyncio
+import sqlite3
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from services.storage.base import (
+    DEFAULT_GAME_LIST_FIELDS, Storage, check_columns, game_list_columns, group_by_columns
+)
+from services.log import get_logger
+
+log = get_logger('storage')
+
+# SQLite version of the files in migrations/
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+  id TEXT PRIMARY KEY,
+  host_id TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'lobby' CHECK (status IN ('lobby', 'playing', 'finished')),
+  total_rounds INTEGER DEFAULT 0,
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  ended_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS players (
+  id TEXT PRIMARY KEY,
+  game_id TEXT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  name TEXT NOT NULL,
+  score INTEGER NOT NULL DEFAULT 0,
+  correct_guesses INTEGER NOT NULL DEFAULT 0,
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS game_tracks (
+  id TEXT PRIMARY KEY,
+  game_id TEXT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  track_id TEXT NOT NULL,
+  name TEXT NOT NULL,
+  artist TEXT NOT NULL,
+  album TEXT,
+  preview_url TEXT,
+  added_by TEXT REFERENCES players(id),
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS guesses (
+  id TEXT PRIMARY KEY,
+  game_id TEXT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  player_id TEXT NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+  track_id TEXT NOT NULL REFERENCES game_tracks(id) ON DELETE CASCADE,
+  guess TEXT NOT NULL,
+  is_correct INTEGER NOT NULL DEFAULT 0,
+  points_awarded INTEGER NOT NULL DEFAULT 0,
+  guess_time_seconds REAL,
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS player_stats (
+  player_key TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  games_played INTEGER NOT NULL DEFAULT 0,
+  total_score INTEGER NOT NULL DEFAULT 0,
+  best_score INTEGER NOT NULL DEFAULT 0,
+  total_guesses INTEGER NOT NULL DEFAULT 0,
+  correct_guesses INTEGER NOT NULL DEFAULT 0,
+  total_guess_time_seconds REAL NOT NULL DEFAULT 0,
+  last_played_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS player_stats_applied (
+  game_id TEXT NOT NULL,
+  player_key TEXT NOT NULL,
+  applied_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  PRIMARY KEY (game_id, player_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_games_status ON games(status);
+DROP INDEX IF EXISTS idx_games_created_at;
+CREATE INDEX IF NOT EXISTS idx_games_created_at_id ON games(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_players_game_id ON players(game_id);
+CREATE INDEX IF NOT EXISTS idx_players_score ON players(score DESC);
+CREATE INDEX IF NOT EXISTS idx_game_tracks_game_id ON game_tracks(game_id);
+CREATE INDEX IF NOT EXISTS idx_guesses_game_id ON guesses(game_id);
+CREATE INDEX IF NOT EXISTS idx_guesses_player_id ON guesses(player_id);
+CREATE INDEX IF NOT EXISTS idx_player_stats_best_score ON player_stats(best_score DESC);
+"""
+
+GET_GAME = 'SELECT id, host_id, status, created_at, ended_at, total_rounds FROM games WHERE id = ?'
+GAME_PLAYERS = 'SELECT id, name, score FROM players WHERE game_id = ?'
+# Recent games page; the column list is filled from game_list_columns()
+RECENT_GAMES = 'SELECT {columns} FROM games ORDER BY created_at DESC, id DESC LIMIT ?'
+RECENT_GAMES_BEFORE = """
+SELECT {columns} FROM games
+WHERE (created_at, id) < (?, ?)
+ORDER BY created_at DESC, id DESC
+LIMIT ?
+"""
+LEADERBOARD = 'SELECT id, name, score FROM players WHERE game_id = ? ORDER BY score DESC'
+GET_PLAYER = """
+SELECT p.id, p.name, p.score, p.game_id, g.status, g.created_at, g.ended_at
+FROM players p JOIN games g ON g.id = p.game_id
+WHERE p.id = ?
+"""
+APPLY_PLAYER_STATS = """
+INSERT INTO player_stats (
+  player_key, name, games_played, total_score, best_score,
+  total_guesses, correct_guesses, total_guess_time_seconds, last_played_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (player_key) DO UPDATE SET
+  name = excluded.name,
+  games_played = player_stats.games_played + excluded.games_played,
+  total_score = player_stats.total_score + excluded.total_score,
+  best_score = MAX(player_stats.best_score, excluded.best_score),
+  total_guesses = player_stats.total_guesses + excluded.total_guesses,
+  correct_guesses = player_stats.correct_guesses + excluded.correct_guesses,
+  total_guess_time_seconds = player_stats.total_guess_time_seconds + excluded.total_guess_time_seconds,
+  last_played_at = MAX(COALESCE(player_stats.last_played_at, ''), excluded.last_played_at)
+"""
+# Ledger of applied deltas; the rollup only changes when this inserts a row
+MARK_PLAYER_STATS = 'INSERT OR IGNORE INTO player_stats_applied (game_id, player_key) VALUES (?, ?)'
+GET_PLAYER_STATS = 'SELECT * FROM player_stats WHERE player_key = ?'
+PLAYER_STATS_COLUMNS = (
+    'player_key', 'name', 'games_played', 'total_score', 'best_score',
+    'total_guesses', 'correct_guesses', 'total_guess_time_seconds', 'last_played_at'
+)
+
+
+class SQLiteStorage(Storage):
+    """Single-file storage for single-box deployments.
+
+    One connection in WAL mode, used from worker threads behind a lock so
+    the event loop never blocks on disk. sqlite3 keeps its own cache of
+    prepared statements, so the fixed query strings above are compiled once.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def connect(self) -> None:
+        def open_db():
+            conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.executescript(SCHEMA)
+            return conn
+
+        self.conn = await asyncio.to_thread(open_db)
+        log.info('✅ SQLite storage ready', path=self.path)
+
+    async def close(self) -> None:
+        if self.conn is not None:
+            await asyncio.to_thread(self.conn.close)
+            self.conn = None
+
+    def is_unavailable(self, error: Exception) -> bool:
+        # Locked, busy or unreadable database file
+        return super().is_unavailable(error) or isinstance(error, sqlite3.OperationalError)
+
+    async def _run(self, fn):
+        def locked():
+            with self._lock:
+                return fn(self.conn)
+        return await asyncio.to_thread(locked)
+
+    async def _query(self, sql: str, params: tuple) -> List[dict]:
+        rows = await self._run(lambda conn: conn.execute(sql, params).fetchall())
+        return [dict(row) for row in rows]
+
+    async def _executemany(self, statements: List[tuple]) -> None:
+        def write(conn):
+            with conn:
+                for sql, params in statements:
+                    conn.executemany(sql, params)
+        await self._run(write)
+
+    async def insert(self, table: str, rows: List[dict]) -> None:
+        statements = []
+        for columns, group in group_by_columns(rows).items():
+            check_columns(table, columns)
+            sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})'
+            statements.append((sql, [tuple(row[c] for c in columns) for row in group]))
+        await self._executemany(statements)
+
+    async def upsert(self, table: str, rows: List[dict], key: str = 'id') -> None:
+        statements = []
+        for columns, group in group_by_columns(rows).items():
+            check_columns(table, columns)
+            updates = ', '.join(f'{c} = excluded.{c}' for c in columns if c != key)
+            sql = (
+                f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)}) '
+                f'ON CONFLICT ({key}) DO UPDATE SET {updates}'
+            )
+            statements.append((sql, [tuple(row[c] for c in columns) for row in group]))
+        await self._executemany(statements)
+
+    async def update(self, table: str, patch: dict, ids: List, key: str = 'id') -> None:
+        columns = tuple(patch)
+        check_columns(table, [*columns, key])
+        sql = f'UPDATE {table} SET {", ".join(f"{c} = ?" for c in columns)} WHERE {key} = ?'
+        values = tuple(patch[c] for c in columns)
+        await self._executemany([(sql, [values + (row_id,) for row_id in ids])])
+
+    async def get_game(self, game_id: str) -> Optional[dict]:
+        games = await self._query(GET_GAME, (game_id,))
+        if not games:
+            return None
+        return {**games[0], 'players': await self._query(GAME_PLAYERS, (game_id,))}
+
+    async def list_recent_games(
+        self,
+        limit: int,
+        before: Optional[Tuple[str, str]] = None,
+        fields: Sequence[str] = DEFAULT_GAME_LIST_FIELDS
+    ) -> List[dict]:
+        columns, include_players = game_list_columns(fields)
+        if before:
+            sql = RECENT_GAMES_BEFORE.format(columns=', '.join(columns))
+            games = await self._query(sql, (*before, limit))
+        else:
+            games = await self._query(RECENT_GAMES.format(columns=', '.join(columns)), (limit,))
+
+        if include_players:
+            for game in games:
+                game['players'] = await self._query(GAME_PLAYERS, (game['id'],))
+        return games
+
+    async def get_leaderboard(self, game_id: str) -> List[dict]:
+        return await self._query(LEADERBOARD, (game_id,))
+
+    async def get_player(self, player_id: str) -> Optional[dict]:
+        rows = await self._query(GET_PLAYER, (player_id,))
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'score': row['score'],
+            'game_id': row['game_id'],
+            'games': {'status': row['status'], 'created_at': row['created_at'], 'ended_at': row['ended_at']}
+        }
+
+    async def apply_player_stats(self, deltas: List[dict]) -> None:
+        def write(conn):
+            with conn:
+                for d in deltas:
+                    if conn.execute(MARK_PLAYER_STATS, (d['game_id'], d['player_key'])).rowcount:
+                        conn.execute(APPLY_PLAYER_STATS, tuple(d[c] for c in PLAYER_STATS_COLUMNS))
+        await self._run(write)
+
+    async def get_player_stats(self, player_key: str) -> Optional[dict]:
+        rows = await self._query(GET_PLAYER_STATS, (player_key,))
+        return rows[0] if rows else None
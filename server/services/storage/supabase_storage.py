@@ -0,0 +1,111 @@
+import asyncio
+from typing import List, Optional, Sequence, Tuple
+
+from services.storage.base import DEFAULT_GAME_LIST_FIELDS, Storage, check_columns, game_list_columns
+
+
+class SupabaseStorage(Storage):
+    """Storage through the Supabase REST client.
+
+    The supabase-py query builder is synchronous, so every call runs in a
+    worker thread instead of blocking the event loop. Without an explicit
+    client, the shared one is built in connect() rather than at import.
+    """
+
+    name = 'supabase'
+
+    def __init__(self, client=None):
+        self.client = client
+
+    async def connect(self) -> None:
+        if self.client is None:
+            from services.supabase_client import get_supabase
+            self.client = await asyncio.to_thread(get_supabase)
+
+    def is_unavailable(self, error: Exception) -> bool:
+        import httpx
+        return super().is_unavailable(error) or isinstance(error, httpx.TransportError)
+
+    async def _execute(self, build):
+        return await asyncio.to_thread(lambda: build().execute())
+
+    async def insert(self, table: str, rows: List[dict]) -> None:
+        for row in rows:
+            check_columns(table, row)
+        await self._execute(lambda: self.client.table(table).insert(rows))
+
+    async def upsert(self, table: str, rows: List[dict], key: str = 'id') -> None:
+        for row in rows:
+            check_columns(table, row)
+        await self._execute(lambda: self.client.table(table).upsert(rows, on_conflict=key))
+
+    async def update(self, table: str, patch: dict, ids: List, key: str = 'id') -> None:
+        check_columns(table, [*patch, key])
+        await self._execute(lambda: self.client.table(table).update(patch).in_(key, ids))
+
+    async def get_game(self, game_id: str) -> Optional[dict]:
+        response = await self._execute(lambda: self.client.table('games').select("""
+            id,
+            host_id,
+            status,
+            created_at,
+            ended_at,
+            total_rounds,
+            players (id, name, score)
+        """).eq('id', game_id).limit(1))
+        return response.data[0] if response.data else None
+
+    async def list_recent_games(
+        self,
+        limit: int,
+        before: Optional[Tuple[str, str]] = None,
+        fields: Sequence[str] = DEFAULT_GAME_LIST_FIELDS
+    ) -> List[dict]:
+        columns, include_players = game_list_columns(fields)
+        select = ', '.join(columns + (('players (id, name, score)',) if include_players else ()))
+
+        def build():
+            query = self.client.table('games').select(select)
+            # The pinned postgrest client has no or_() and can't combine
+            # orderings, so the keyset predicate and sort go in as raw params.
+            # PostgREST has no row comparison: (created_at, id) < (ts, id) is
+            # spelled out as created_at < ts OR (created_at = ts AND id < id).
+            if before:
+                created_at, game_id = before
+                query.params = query.params.add(
+                    'or', f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{game_id}))'
+                )
+            query.params = query.params.add('order', 'created_at.desc,id.desc')
+            return query.limit(limit)
+
+        response = await self._execute(build)
+        return response.data or []
+
+    async def get_leaderboard(self, game_id: str) -> List[dict]:
+        response = await self._execute(lambda: self.client.table('players')
+            .select('id, name, score')
+            .eq('game_id', game_id)
+            .order('score', desc=True))
+        return response.data or []
+
+    async def get_player(self, player_id: str) -> Optional[dict]:
+        response = await self._execute(lambda: self.client.table('players').select("""
+            id,
+            name,
+            score,
+            game_id,
+            games!inner (status, created_at, ended_at)
+        """).eq('id', player_id).limit(1))
+        return response.data[0] if response.data else None
+
+    async def apply_player_stats(self, deltas: List[dict]) -> None:
+        # Increments can't be expressed through PostgREST, see migrations/002_player_stats.sql
+        # and 004_player_stats_ledger.sql for the per-game dedupe
+        await self._execute(lambda: self.client.rpc('apply_player_stats', {'deltas': deltas}))
+
+    async def get_player_stats(self, player_key: str) -> Optional[dict]:
+        response = await self._execute(lambda: self.client.table('player_stats')
+            .select('*')
+            .eq('player_key', player_key)
+            .limit(1))
+        return response.data[0] if response.data else None
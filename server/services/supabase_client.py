@@ -1,16 +1,29 @@
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from typing import Optional
 
-load_dotenv()
+from services.log import get_logger
 
-supabase_url = os.getenv('SUPABASE_URL')
-supabase_key = os.getenv('SUPABASE_ANON_KEY')
+log = get_logger('storage')
 
-if not supabase_url or not supabase_key:
-    print('⚠️ Supabase credentials not found. Database features will be limited.')
+# supabase-py pulls in httpx, postgrest, gotrue, realtime and storage3, so the
+# SDK is only imported when a client is first needed
+_client = None
 
-supabase: Client = create_client(
-    supabase_url or 'https://placeholder.supabase.co',
-    supabase_key or 'placeholder-key'
-)
\ No newline at end of file
+
+def get_supabase():
+    """Build the Supabase client on first use and reuse it afterwards."""
+    global _client
+    if _client is None:
+        from supabase import create_client
+
+        supabase_url: Optional[str] = os.getenv('SUPABASE_URL')
+        supabase_key: Optional[str] = os.getenv('SUPABASE_ANON_KEY')
+
+        if not supabase_url or not supabase_key:
+            log.warning('⚠️ Supabase credentials not found. Database features will be limited.')
+
+        _client = create_client(
+            supabase_url or 'https://placeholder.supabase.co',
+            supabase_key or 'placeholder-key'
+        )
+    return _client
@@ -0,0 +1,336 @@
+import asyncio
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from services.serialization import dumps
+from services.log import get_logger
+
+log = get_logger('tracing')
+
+
+class Trace:
+    __slots__ = ('trace_id', 'sampled', 'spans', 'done', 'kept')
+
+    def __init__(self, sampled: bool):
+        self.trace_id = f'{random.getrandbits(128):032x}'
+        self.sampled = sampled
+        self.spans: List['Span'] = []
+        self.done = False
+        self.kept = False
+
+
+class Span:
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attributes', 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, trace: Trace, parent_id: Optional[str], name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def rename(self, name: str) -> None:
+        """Name the span once it is known, e.g. a request's route after routing."""
+        self.name = name
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id': self.trace.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+
+_current: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+class _SpanScope:
+    __slots__ = ('tracer', 'name', 'attributes', 'span', 'token')
+
+    def __init__(self, tracer: 'Tracer', name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        parent = _current.get()
+        if parent is None:
+            trace = Trace(random.random() < self.tracer.sample_rate)
+            self.span = Span(trace, None, self.name, self.attributes)
+        else:
+            self.span = Span(parent.trace, parent.span_id, self.name, self.attributes)
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.end_ns = time.time_ns()
+        if exc is not None:
+            self.span.error = f'{exc_type.__name__}: {exc}'
+        _current.reset(self.token)
+        self.tracer._finish(self.span)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def rename(self, name: str) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    """Spans kept in a context variable, so they nest across awaits and tasks.
+
+    A trace's spans are held until its root span ends. Then the whole trace
+    is exported if it was sampled (`sample_rate`, decided when the root
+    starts) or if the root took at least `slow_ms`. So slow events are
+    always traced, whatever the sample rate. Spans that end after their
+    root, e.g. from a task the handler started, follow the trace's fate.
+    With no exporter, `span` is a shared no-op.
+    """
+
+    def __init__(self):
+        self.exporter: Optional['BatchExporter'] = None
+        self.sample_rate = 0.0
+        self.slow_ms: Optional[float] = None
+        self.max_spans_per_trace = 1000
+
+    def configure(self, exporter: Optional['BatchExporter'], sample_rate: float = 0.1,
+                  slow_ms: Optional[float] = None) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, **attributes: Any):
+        if self.exporter is None:
+            return _NOOP
+        return _SpanScope(self, name, attributes)
+
+    def current(self) -> Optional[Span]:
+        return _current.get()
+
+    def set_attributes(self, **attributes: Any) -> None:
+        span = _current.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def detach(self) -> None:
+        """Start the rest of the current task outside any trace, e.g. in a long-lived background task."""
+        _current.set(None)
+
+    def _finish(self, span: Span) -> None:
+        trace = span.trace
+        if trace.done:
+            if trace.kept:
+                self.exporter.export([span])
+            return
+
+        if span.parent_id is not None:
+            if len(trace.spans) < self.max_spans_per_trace:
+                trace.spans.append(span)
+            return
+
+        trace.done = True
+        trace.kept = trace.sampled or (self.slow_ms is not None and span.duration_ms >= self.slow_ms)
+        if trace.kept:
+            span.attributes['sampled'] = trace.sampled
+            self.exporter.export(trace.spans + [span])
+        trace.spans = []
+
+    async def shutdown(self) -> None:
+        if self.exporter is not None:
+            await asyncio.to_thread(self.exporter.shutdown)
+
+
+# Process-wide tracer, configured from the environment in main
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Run a function, sync or async, inside a span named `name` (default Class.method)."""
+    def decorate(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def run_async(*args, **kwargs):
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+            return run_async
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return run
+
+    return decorate
+
+
+class BatchExporter(ABC):
+    """Buffers finished spans and writes them in batches from a background thread."""
+
+    def __init__(self, interval: float = 1.0, max_queue: int = 20000):
+        self.interval = interval
+        self.queue: deque = deque(maxlen=max_queue)
+        self.stats = {'exported': 0, 'dropped': 0, 'failed': 0}
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Span]) -> None:
+        dropped = len(self.queue) + len(spans) - self.queue.maxlen
+        if dropped > 0:
+            self.stats['dropped'] += dropped
+        self.queue.extend(span.to_dict() for span in spans)
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            self._drain()
+
+    def _drain(self) -> None:
+        batch = []
+        while self.queue:
+            batch.append(self.queue.popleft())
+        if not batch:
+            return
+        try:
+            self.write(batch)
+            self.stats['exported'] += len(batch)
+        except Exception as e:
+            self.stats['failed'] += len(batch)
+            log.warning("⚠️ Could not export spans", spans=len(batch), error=e)
+
+    @abstractmethod
+    def write(self, spans: List[dict]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._drain()
+
+
+class JsonLinesExporter(BatchExporter):
+    """One JSON object per span, appended to a local file."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def write(self, spans: List[dict]) -> None:
+        with open(self.path, 'ab') as f:
+            f.write(b''.join(dumps(span) + b'\n' for span in spans))
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class OtlpHttpExporter(BatchExporter):
+    """OTLP/HTTP with JSON encoding, e.g. to a local OpenTelemetry Collector or Jaeger on :4318."""
+
+    def __init__(self, endpoint: str, service_name: str = 'tune-guesser', timeout: float = 5.0, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.resource = {'attributes': [
+            {'key': 'service.name', 'value': {'stringValue': service_name}},
+            {'key': 'service.instance.id', 'value': {'stringValue': f'{os.uname().nodename}:{os.getpid()}'}}
+        ]}
+
+    def encode(self, spans: List[dict]) -> dict:
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                'traceId': span['trace_id'],
+                'spanId': span['span_id'],
+                'name': span['name'],
+                # Roots are handlers serving a client event or request
+                'kind': 2 if span['parent_id'] is None else 1,
+                'startTimeUnixNano': str(span['start_ns']),
+                'endTimeUnixNano': str(span['start_ns'] + int(span['duration_ms'] * 1e6)),
+                'attributes': [
+                    {'key': key, 'value': _otlp_value(value)}
+                    for key, value in span['attributes'].items() if value is not None
+                ],
+                'status': {'code': 2, 'message': span['error']} if span['error'] else {'code': 1}
+            }
+            if span['parent_id']:
+                otlp_span['parentSpanId'] = span['parent_id']
+            otlp_spans.append(otlp_span)
+        return {'resourceSpans': [{
+            'resource': self.resource,
+            'scopeSpans': [{'scope': {'name': 'tune_guesser'}, 'spans': otlp_spans}]
+        }]}
+
+    def write(self, spans: List[dict]) -> None:
+        import requests
+        response = requests.post(
+            self.endpoint,
+            data=json.dumps(self.encode(spans)),
+            headers={'Content-Type': 'application/json'},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+
+
+def create_exporter(spec: str) -> Optional[BatchExporter]:
+    """Exporter for TRACE_EXPORTER: `off`, `jsonl[:path]` or `otlp[:url]`."""
+    kind, _, target = spec.partition(':')
+    kind = kind.strip().lower()
+    if kind in ('', 'off', 'none'):
+        return None
+    if kind == 'jsonl':
+        return JsonLinesExporter(target or 'traces.jsonl')
+    if kind == 'otlp':
+        return OtlpHttpExporter(target or 'http://127.0.0.1:4318/v1/traces')
+    raise ValueError(f'Unknown TRACE_EXPORTER {spec!r}, expected off, jsonl[:path] or otlp[:url]')
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from services.cache import TTLCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {'id': 'G1'}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load('G1', load) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.get('G1') == {'id': 'G1'}
+    assert not cache.inflight
+
+
+def test_failed_load_reaches_every_waiter_and_is_not_cached():
+    cache = TTLCache()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('database is down')
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load('G1', load) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.get('G1') is None
+    assert not cache.inflight
+
+
+def test_misses_are_not_cached():
+    cache = TTLCache()
+    values = iter([None, {'id': 'G1'}])
+
+    async def load():
+        return next(values)
+
+    assert asyncio.run(cache.get_or_load('G1', load)) is None
+    assert asyncio.run(cache.get_or_load('G1', load)) == {'id': 'G1'}
+
+
+def test_expiry_invalidation_and_lru_eviction():
+    cache = TTLCache(max_entries=2)
+    cache.set('a', 1, ttl=-1)
+    assert cache.get('a') is None
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    # 'b' was the least recently used
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+
+    cache.invalidate('a', 'missing')
+    assert cache.get('a') is None
+    assert cache.stats['invalidations'] == 1
+
+
+@pytest.mark.parametrize('value', [0, '', []])
+def test_falsy_values_are_not_cached(value):
+    cache = TTLCache()
+
+    async def load():
+        return value
+
+    assert asyncio.run(cache.get_or_load('k', load)) == value
+    assert 'k' not in cache.entries
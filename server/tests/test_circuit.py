@@ -0,0 +1,105 @@
+import pytest
+
+from services.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(**options):
+    clock = FakeClock()
+    changes = []
+    breaker = CircuitBreaker('deezer', min_calls=4, window=10, open_seconds=30,
+                             on_change=changes.append, clock=clock, **options)
+    return breaker, clock, changes
+
+
+def call(breaker, failed=False, seconds=0.1):
+    breaker.before_call()
+    breaker.record(seconds, failed)
+
+
+def test_stays_closed_below_min_calls():
+    breaker, _, _ = make_breaker()
+    for _ in range(3):
+        call(breaker, failed=True)
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_failure_rate_and_rejects():
+    breaker, clock, changes = make_breaker()
+    call(breaker)
+    call(breaker)
+    call(breaker, failed=True)
+    call(breaker, failed=True)
+    assert breaker.state == OPEN
+    assert changes == [OPEN]
+
+    clock.now = 10
+    with pytest.raises(CircuitOpen) as raised:
+        breaker.before_call()
+    assert raised.value.retry_after == pytest.approx(20)
+    assert breaker.summary()['rejected'] == 1
+
+
+def test_opens_on_slow_calls():
+    breaker, _, _ = make_breaker(slow_call_seconds=2)
+    for _ in range(4):
+        call(breaker, seconds=3)
+    assert breaker.state == OPEN
+
+
+def test_old_calls_leave_the_window():
+    breaker, clock, _ = make_breaker()
+    for _ in range(3):
+        call(breaker, failed=True)
+    clock.now = 11
+    call(breaker)
+    assert breaker.state == CLOSED
+    assert breaker.summary()['calls_in_window'] == 1
+
+
+def test_open_half_open_closed():
+    breaker, clock, changes = make_breaker(probes=2)
+    for _ in range(4):
+        call(breaker, failed=True)
+
+    clock.now = 30
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    # Both probes are out; nothing else goes through until they report
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    breaker.record(0.1, failed=False)
+    assert breaker.state == HALF_OPEN
+    breaker.record(0.1, failed=False)
+    assert breaker.state == CLOSED
+    assert changes == [OPEN, HALF_OPEN, CLOSED]
+    assert breaker.summary()['calls_in_window'] == 0
+
+
+def test_failed_probe_opens_again():
+    breaker, clock, changes = make_breaker()
+    for _ in range(4):
+        call(breaker, failed=True)
+
+    clock.now = 30
+    call(breaker, failed=True)
+    assert breaker.state == OPEN
+    assert changes == [OPEN, HALF_OPEN, OPEN]
+    assert breaker.summary()['opened'] == 2
+
+    # The open period restarts from the failed probe
+    clock.now = 59
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    clock.now = 60
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
@@ -0,0 +1,32 @@
+import asyncio
+
+from services.cluster import Cluster
+
+
+def test_forwarded_events_keep_order_per_game_only():
+    cluster = Cluster('worker-0', ['worker-0', 'worker-1'], 'redis://unused')
+    handled = []
+    release_a = asyncio.Event()
+
+    async def dispatch(event, sid, data):
+        if event == 'slow':
+            await release_a.wait()
+        if event == 'broken':
+            raise RuntimeError('handler failed')
+        handled.append(event)
+
+    async def main():
+        cluster._submit('AAAAAA', ('slow', 's1', None), dispatch)
+        cluster._submit('AAAAAA', ('broken', 's1', None), dispatch)
+        cluster._submit('AAAAAA', ('after', 's1', None), dispatch)
+        cluster._submit('CCCCCC', ('join', 's2', None), dispatch)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        # Game C doesn't wait for game A's slow handler
+        assert handled == ['join']
+        release_a.set()
+        await asyncio.gather(*cluster._workers.values())
+
+    asyncio.run(main())
+    assert handled == ['join', 'slow', 'after']
+    assert not cluster._inbox and not cluster._workers
@@ -0,0 +1,83 @@
+import asyncio
+import random
+
+import pytest
+
+from benchmarks.payloads import make_track
+from services.clock import VirtualClock
+from services.game_manager import GameManager
+from services.persistence import PersistenceQueue
+from services.storage.memory import MemoryStorage
+
+
+async def play_game(manager: GameManager, clock: VirtualClock, rng: random.Random) -> dict:
+    """A two-player game where Ann always answers 2 seconds into the round."""
+    game_id, _ = await manager.create_game('host-socket', 'easy')
+    ann = (await manager.join_game(game_id, 'Ann', 'ann-socket'))['player_id']
+    bob = (await manager.join_game(game_id, 'Bob', 'bob-socket'))['player_id']
+    for player_id in (ann, bob):
+        for _ in range(2):
+            manager.add_track(game_id, make_track(rng), player_id)
+        manager.set_ready(game_id, player_id, True)
+    await manager.start_game(game_id)
+
+    results = []
+    while True:
+        round_data = manager.start_next_round(game_id)
+        if round_data['game_finished']:
+            break
+        await clock.sleep(2)
+        track = manager.games[game_id]['current_track']
+        guess = f"{track['artists'][0]['name']} {track['name']}"
+        results.append(manager.submit_guess(game_id, ann, guess))
+        await clock.sleep(round_data['time_limit'] - 2)
+    end = await manager.end_game(game_id)
+    return {'game_id': game_id, 'results': results, 'leaderboard': end['leaderboard']}
+
+
+def run_game(seed: int, persistence=None):
+    clock = VirtualClock()
+    rng = random.Random(seed)
+    manager = GameManager(persistence=persistence, clock=clock, rng=rng)
+    played = asyncio.run(clock.run(play_game(manager, clock, rng)))
+    return played, clock
+
+
+def test_same_seed_plays_the_same_game():
+    first, clock = run_game(3)
+    second, _ = run_game(3)
+    assert first == second
+    # Four 30 second rounds, without waiting for them
+    assert clock.elapsed == 120
+
+
+def test_guess_time_comes_from_the_clock():
+    played, _ = run_game(5)
+    assert len(played['results']) == 4
+    assert all(result['correct'] for result in played['results'])
+    # 2 of 30 seconds used: 500 points plus a 28/30 * 50% speed bonus
+    assert [result['points'] for result in played['results']] == [733] * 4
+    assert played['leaderboard'][0]['name'] == 'Ann'
+    assert played['leaderboard'][1]['score'] == 0
+
+
+def test_finished_game_is_persisted_to_storage():
+    storage = MemoryStorage()
+    queue = PersistenceQueue(storage)
+    played, _ = run_game(11, persistence=queue)
+    assert asyncio.run(queue.flush())
+
+    game_id = played['game_id']
+    game = asyncio.run(storage.get_game(game_id))
+    assert game['status'] == 'finished'
+    assert game['total_rounds'] == 4
+    assert {p['name']: p['score'] for p in game['players']} == {
+        entry['name']: entry['score'] for entry in played['leaderboard']
+    }
+    assert len(storage.tables['game_tracks']) == 4
+    assert len(storage.tables['guesses']) == 4
+
+    ann = asyncio.run(storage.get_player_stats('ann'))
+    assert ann['games_played'] == 1
+    assert ann['correct_guesses'] == 4
+    assert ann['total_guess_time_seconds'] == pytest.approx(8.0)
@@ -0,0 +1,56 @@
+import random
+
+from services.leaderboard import Ranking
+
+
+def expected_order(scores, orders):
+    return sorted(scores, key=lambda player_id: (-scores[player_id], orders[player_id]))
+
+
+def test_ties_rank_in_join_order():
+    ranking = Ranking()
+    for order, player_id in enumerate(['a', 'b', 'c']):
+        ranking.add(player_id, order)
+    ranking.update('c', 100)
+    ranking.update('a', 50)
+    ranking.update('b', 50)
+    assert ranking.top() == ['c', 'a', 'b']
+    assert [ranking.rank(p) for p in ('a', 'b', 'c')] == [2, 3, 1]
+    assert ranking.top(2) == ['c', 'a']
+
+
+def test_unknown_players():
+    ranking = Ranking()
+    ranking.add('a', 0)
+    assert ranking.rank('zed') is None
+    ranking.update('zed', 10)
+    ranking.remove('zed')
+    assert len(ranking) == 1
+
+
+def test_matches_a_full_sort():
+    rng = random.Random(7)
+    ranking = Ranking()
+    scores, orders = {}, {}
+    for step in range(3000):
+        action = rng.random()
+        if action < 0.3 or not scores:
+            player_id = f'p{step}'
+            orders[player_id] = step
+            scores[player_id] = rng.randrange(0, 5) * 100
+            ranking.add(player_id, step, scores[player_id])
+        elif action < 0.4:
+            player_id = rng.choice(sorted(scores))
+            ranking.remove(player_id)
+            del scores[player_id]
+        else:
+            player_id = rng.choice(sorted(scores))
+            scores[player_id] += rng.choice((0, 50, 100, 300))
+            ranking.update(player_id, scores[player_id])
+
+        if step % 100 == 0:
+            order = expected_order(scores, orders)
+            assert ranking.top() == order
+            assert ranking.top(10) == order[:10]
+            assert all(ranking.rank(player_id) == index + 1 for index, player_id in enumerate(order))
+    assert len(ranking) == len(scores)
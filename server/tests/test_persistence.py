@@ -0,0 +1,147 @@
+import asyncio
+
+from services.persistence import PersistenceQueue
+from services.storage.memory import MemoryStorage
+
+
+class RecordingStorage(MemoryStorage):
+    """MemoryStorage that records every write and can be told to fail."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        # Exception raised by the next write calls, or None
+        self.error = None
+
+    async def insert(self, table, rows):
+        self.calls.append(('insert', table, [row['id'] for row in rows]))
+        if self.error:
+            raise self.error
+        await super().insert(table, rows)
+
+    async def upsert(self, table, rows, key='id'):
+        self.calls.append(('upsert', table, [row[key] for row in rows]))
+        if self.error:
+            raise self.error
+        await super().upsert(table, rows, key=key)
+
+    async def update(self, table, patch, ids, key='id'):
+        self.calls.append(('update', table, list(ids)))
+        if self.error:
+            raise self.error
+        await super().update(table, patch, ids, key=key)
+
+
+def game(game_id):
+    return {'id': game_id, 'host_id': 'host', 'status': 'lobby'}
+
+
+def player(player_id, game_id):
+    return {'id': player_id, 'game_id': game_id, 'name': player_id}
+
+
+def stats(game_id, name, score):
+    return {
+        'game_id': game_id, 'player_key': name, 'name': name, 'games_played': 1,
+        'total_score': score, 'best_score': score, 'total_guesses': 2, 'correct_guesses': 1,
+        'total_guess_time_seconds': 1.5, 'last_played_at': '2024-01-01T00:00:00+00:00'
+    }
+
+
+def test_writes_to_one_row_coalesce_into_one_insert():
+    storage = RecordingStorage()
+    queue = PersistenceQueue(storage)
+    queue.insert('games', game('G1'))
+    queue.update('games', 'G1', {'status': 'playing', 'total_rounds': 3})
+    queue.update('games', 'G1', {'status': 'finished'})
+
+    assert asyncio.run(queue.flush())
+    assert storage.calls == [('insert', 'games', ['G1'])]
+    assert storage.tables['games']['G1']['status'] == 'finished'
+    assert storage.tables['games']['G1']['total_rounds'] == 3
+    assert queue.stats['coalesced'] == 2
+
+
+def test_flush_writes_parents_before_children():
+    storage = RecordingStorage()
+    queue = PersistenceQueue(storage)
+    # Enqueued child first; the flush still inserts the game before its player
+    queue.insert('players', player('P1', 'G1'))
+    queue.insert('games', game('G1'))
+    queue.update('games', 'G1', {'status': 'finished'})
+
+    assert asyncio.run(queue.flush())
+    assert [call[:2] for call in storage.calls] == [('insert', 'games'), ('insert', 'players')]
+
+
+def test_rejected_batch_is_retried_row_by_row():
+    storage = RecordingStorage()
+    queue = PersistenceQueue(storage)
+    asyncio.run(storage.insert('games', [game('G0')]))
+    storage.calls.clear()
+    for game_id in ('G1', 'G0', 'G2'):
+        queue.insert('games', game(game_id))
+
+    assert not asyncio.run(queue.flush())
+    assert storage.calls == [
+        ('insert', 'games', ['G1', 'G0', 'G2']),
+        ('insert', 'games', ['G1']),
+        ('insert', 'games', ['G0']),
+        ('insert', 'games', ['G2']),
+    ]
+    assert sorted(storage.tables['games']) == ['G0', 'G1', 'G2']
+    # Only the duplicate is left to retry
+    assert list(queue.pending) == [('games', 'G0')]
+    assert queue.pending[('games', 'G0')]['attempts'] == 1
+
+
+def test_unreachable_storage_requeues_everything_in_one_call():
+    storage = RecordingStorage()
+    storage.error = ConnectionRefusedError('database is down')
+    queue = PersistenceQueue(storage)
+    for index in range(50):
+        queue.insert('games', game(f'G{index}'))
+    queue.insert('players', player('P1', 'G0'))
+
+    assert not asyncio.run(queue.flush())
+    assert len(storage.calls) == 1
+    assert len(queue.pending) == 51
+    # Back up, the requeued rows go through in order
+    storage.error = None
+    storage.calls.clear()
+    queue.update('games', 'G0', {'status': 'playing'})
+    assert asyncio.run(queue.flush())
+    assert [call[:2] for call in storage.calls] == [('insert', 'games'), ('insert', 'players')]
+    assert storage.tables['games']['G0']['status'] == 'playing'
+
+
+def test_rows_are_dropped_after_max_retries():
+    storage = RecordingStorage()
+    storage.error = ConnectionRefusedError('database is down')
+    queue = PersistenceQueue(storage, max_retries=2)
+    queue.insert('games', game('G1'))
+
+    for _ in range(2):
+        assert not asyncio.run(queue.flush())
+        assert ('games', 'G1') in queue.pending
+    assert not asyncio.run(queue.flush())
+    assert not queue.pending
+    assert queue.stats['dropped'] == 1
+
+
+def test_player_stats_count_each_game_once():
+    storage = MemoryStorage()
+    queue = PersistenceQueue(storage)
+    queue.add_player_stats([stats('G1', 'ann', 10), stats('G2', 'ann', 7)])
+    # One slot per game and player
+    assert len(queue.pending) == 2
+    assert asyncio.run(queue.flush())
+
+    # A retry of a batch that was already applied changes nothing
+    queue.add_player_stats([stats('G1', 'ann', 10)])
+    assert asyncio.run(queue.flush())
+
+    rollup = asyncio.run(storage.get_player_stats('ann'))
+    assert rollup['games_played'] == 2
+    assert rollup['total_score'] == 17
+    assert rollup['best_score'] == 10
@@ -0,0 +1,109 @@
+import pytest
+
+from services.rate_limit import ALLOW, DUPLICATE, LIMITED, EventLimiter, parse_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_limiter(**options):
+    clock = FakeClock()
+    return EventLimiter(clock=clock, **options), clock
+
+
+def test_burst_then_refill_at_rate():
+    limiter, clock = make_limiter(limits={'addTrack': (2, 3)}, dedupe={})
+    assert [limiter.check('s1', 'addTrack') for _ in range(4)] == [ALLOW, ALLOW, ALLOW, LIMITED]
+
+    # Two tokens a second
+    clock.now = 0.5
+    assert limiter.check('s1', 'addTrack') == ALLOW
+    assert limiter.check('s1', 'addTrack') == LIMITED
+    clock.now = 10
+    assert [limiter.check('s1', 'addTrack') for _ in range(4)] == [ALLOW, ALLOW, ALLOW, LIMITED]
+
+
+def test_buckets_are_per_socket_and_event():
+    limiter, _ = make_limiter(limits={'addTrack': (1, 1), 'setReady': (1, 1)}, dedupe={})
+    assert limiter.check('s1', 'addTrack') == ALLOW
+    assert limiter.check('s1', 'addTrack') == LIMITED
+    assert limiter.check('s1', 'setReady') == ALLOW
+    assert limiter.check('s2', 'addTrack') == ALLOW
+
+
+def test_unknown_events_use_the_default_limit():
+    limiter, _ = make_limiter(default=(1, 2), dedupe={})
+    assert [limiter.check('s1', 'whatever') for _ in range(3)] == [ALLOW, ALLOW, LIMITED]
+
+
+def test_one_notice_per_run_of_rejections():
+    limiter, clock = make_limiter(limits={'addTrack': (1, 1)}, dedupe={})
+    limiter.check('s1', 'addTrack')
+    limiter.check('s1', 'addTrack')
+    assert limiter.should_notify('s1', 'addTrack')
+    assert not limiter.should_notify('s1', 'addTrack')
+
+    clock.now = 1
+    assert limiter.check('s1', 'addTrack') == ALLOW
+    limiter.check('s1', 'addTrack')
+    assert limiter.should_notify('s1', 'addTrack')
+
+
+def test_repeats_inside_the_window_are_duplicates():
+    limiter, clock = make_limiter(dedupe_window=1.0)
+    join = {'gameId': 'ABC123', 'playerName': 'Ann'}
+    assert limiter.check('s1', 'joinGame', join) == ALLOW
+    assert limiter.check('s1', 'joinGame', dict(join)) == DUPLICATE
+    assert limiter.check('s1', 'joinGame', {**join, 'playerName': 'Bob'}) == ALLOW
+    assert limiter.check('s2', 'joinGame', join) == ALLOW
+
+    clock.now = 1.0
+    assert limiter.check('s1', 'joinGame', join) == ALLOW
+    assert limiter.stats['duplicates']['joinGame'] == 1
+
+
+def test_duplicates_do_not_use_tokens():
+    limiter, _ = make_limiter(limits={'setReady': (0.001, 1)})
+    ready = {'gameId': 'ABC123', 'playerId': 'p1', 'isReady': True}
+    assert limiter.check('s1', 'setReady', ready) == ALLOW
+    for _ in range(5):
+        assert limiter.check('s1', 'setReady', ready) == DUPLICATE
+    assert limiter.check('s1', 'setReady', {**ready, 'isReady': False}) == LIMITED
+
+
+def test_release_lets_a_failed_event_be_retried():
+    limiter, _ = make_limiter()
+    join = {'gameId': 'ABC123', 'playerName': 'Ann'}
+    assert limiter.check('s1', 'joinGame', join) == ALLOW
+    limiter.release('s1', 'joinGame', join)
+    assert limiter.check('s1', 'joinGame', join) == ALLOW
+    assert limiter.check('s1', 'joinGame', join) == DUPLICATE
+
+
+def test_release_keeps_a_newer_key():
+    limiter, _ = make_limiter()
+    first = {'gameId': 'ABC123', 'playerName': 'Ann'}
+    second = {'gameId': 'ABC123', 'playerName': 'Bob'}
+    limiter.check('s1', 'joinGame', first)
+    limiter.check('s1', 'joinGame', second)
+    # The first event failing must not forget the second one
+    limiter.release('s1', 'joinGame', first)
+    assert limiter.check('s1', 'joinGame', second) == DUPLICATE
+
+
+def test_forget_drops_a_socket():
+    limiter, _ = make_limiter(limits={'addTrack': (1, 1)}, dedupe={})
+    limiter.check('s1', 'addTrack')
+    limiter.forget('s1')
+    assert limiter.check('s1', 'addTrack') == ALLOW
+
+
+def test_parse_limits():
+    assert parse_limits('createGame=0.1/3, setReady=2/5,') == {'createGame': (0.1, 3), 'setReady': (2, 5)}
+    with pytest.raises(ValueError):
+        parse_limits('createGame=fast')
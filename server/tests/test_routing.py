@@ -0,0 +1,41 @@
+from collections import Counter
+
+import pytest
+
+from services.routing import HashRing, WorkerShard, worker_for_game
+
+GAME_IDS = [f'{index:06X}' for index in range(5000)]
+
+
+def test_ring_spreads_games_evenly():
+    ring = HashRing(['worker-0', 'worker-1', 'worker-2', 'worker-3'])
+    counts = Counter(ring.owner(game_id) for game_id in GAME_IDS)
+    assert set(counts) == set(ring.nodes)
+    assert min(counts.values()) > len(GAME_IDS) / 4 * 0.7
+
+
+def test_removing_a_node_only_moves_its_games():
+    before = HashRing(['worker-0', 'worker-1', 'worker-2'])
+    after = HashRing(['worker-0', 'worker-1'])
+    for game_id in GAME_IDS:
+        if before.owner(game_id) != 'worker-2':
+            assert after.owner(game_id) == before.owner(game_id)
+
+
+def test_ring_ignores_node_order():
+    first = HashRing(['b', 'a', 'c'])
+    second = HashRing(['c', 'b', 'a', 'a'])
+    assert all(first.owner(game_id) == second.owner(game_id) for game_id in GAME_IDS[:500])
+
+
+def test_ring_needs_a_node():
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+def test_worker_shards_split_every_game_exactly_once():
+    shards = [WorkerShard(index, 3) for index in range(3)]
+    for game_id in GAME_IDS[:500]:
+        owners = [shard.index for shard in shards if shard.owns(game_id)]
+        assert owners == [worker_for_game(game_id, 3)]
+    assert worker_for_game('ABC123', 1) == 0
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Deezer API stand-in for load tests and offline development.
+
+Usage:
+  python -m tools.deezer_standin [--host 127.0.0.1] [--port 5098] [--tracks 500] [--latency-ms 40]
+  DEEZER_API_URL=http://127.0.0.1:5098 python main.py
+
+Serves the endpoints DeezerService calls (/search, /track/{id},
+/chart/0/tracks, /artist/{id}/top, /playlist/{id}/tracks, /album/{id})
+from a fixed, seeded catalogue in the API's response shape, plus
+/preview/{id}.mp3 with a small silent MP3 so round preloading works.
+--latency-ms adds a delay per request, to model the real API's round trip.
+Searches match titles and artists by substring, and fall back to a stable
+slice of the catalogue so every query has results; any playlist or album
+id is a stable slice too.
+"""
+import argparse
+import json
+import random
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.payloads import deezer_track
+
+# ID3 tag, then one silent MPEG-1 layer III frame (128 kbps, 44.1 kHz) repeated
+SILENT_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+PREVIEW = b'ID3\x03\x00\x00\x00\x00\x00\x00' + SILENT_FRAME * 40
+
+
+class Catalogue:
+    def __init__(self, size: int, base_url: str, seed: int = 1):
+        rng = random.Random(seed)
+        self.tracks: List[dict] = []
+        for _ in range(size):
+            track = deezer_track(rng)
+            if track['preview']:
+                track['preview'] = f"{base_url}/preview/{track['id']}.mp3"
+            self.tracks.append(track)
+        self.by_id: Dict[str, dict] = {str(t['id']): t for t in self.tracks}
+        self.by_artist: Dict[str, List[dict]] = {}
+        for track in self.tracks:
+            self.by_artist.setdefault(str(track['artist']['id']), []).append(track)
+
+    def search(self, query: str, limit: int) -> dict:
+        needle = query.lower().strip()
+        matches = [
+            t for t in self.tracks
+            if needle in t['title'].lower() or needle in t['artist']['name'].lower()
+        ]
+        if not matches:
+            start = zlib.crc32(needle.encode()) % len(self.tracks)
+            matches = (self.tracks[start:] + self.tracks[:start])[:limit * 2]
+        return {'data': matches[:limit], 'total': len(matches)}
+
+    def collection(self, key: str, size: int = 15) -> List[dict]:
+        """A stable slice of the catalogue standing in for any playlist or album id."""
+        start = zlib.crc32(key.encode()) % len(self.tracks)
+        return (self.tracks[start:] + self.tracks[:start])[:size]
+
+    def album(self, album_id: str) -> dict:
+        tracks = self.collection(f'album-{album_id}')
+        album = {**tracks[0]['album'], 'id': int(album_id)}
+        # Like the real API, album tracks don't repeat their album
+        return {**album, 'tracks': {'data': [{k: v for k, v in t.items() if k != 'album'} for t in tracks]}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    catalogue: Catalogue
+    latency: float = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        limit = int(params.get('limit', ['25'])[0])
+        parts = [p for p in url.path.split('/') if p]
+
+        if parts == ['search']:
+            self.send_json(self.catalogue.search(params.get('q', [''])[0], limit))
+        elif len(parts) == 2 and parts[0] == 'track':
+            track = self.catalogue.by_id.get(parts[1])
+            # Like the real API: HTTP 200 with an error body
+            self.send_json(track or {'error': {'type': 'DataException', 'message': 'no data', 'code': 800}})
+        elif parts == ['chart', '0', 'tracks']:
+            self.send_json({'data': self.catalogue.tracks[:limit], 'total': len(self.catalogue.tracks)})
+        elif len(parts) == 3 and parts[0] == 'artist' and parts[2] == 'top':
+            tracks = self.catalogue.by_artist.get(parts[1], [])
+            self.send_json({'data': tracks[:limit], 'total': len(tracks)})
+        elif len(parts) == 3 and parts[0] == 'playlist' and parts[2] == 'tracks':
+            tracks = self.catalogue.collection(f'playlist-{parts[1]}', 40)
+            self.send_json({'data': tracks[:limit], 'total': len(tracks)})
+        elif len(parts) == 2 and parts[0] == 'album' and parts[1].isdigit():
+            self.send_json(self.catalogue.album(parts[1]))
+        elif len(parts) == 2 and parts[0] == 'preview' and parts[1].removesuffix('.mp3') in self.catalogue.by_id:
+            self.send_body(PREVIEW, 'audio/mpeg')
+        else:
+            self.send_error(404)
+
+    def send_json(self, body: dict) -> None:
+        self.send_body(json.dumps(body).encode(), 'application/json')
+
+    def send_body(self, data: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(host: str, port: int, tracks: int = 500, latency_ms: float = 0.0,
+                  public_url: Optional[str] = None) -> ThreadingHTTPServer:
+    catalogue = Catalogue(tracks, public_url or f'http://{host}:{port}')
+    handler = type('DeezerHandler', (Handler,), {'catalogue': catalogue, 'latency': latency_ms / 1000})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--tracks', type=int, default=500, help='catalogue size')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay added to every request')
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.tracks, args.latency_ms)
+    print(f'🧪 Deezer stand-in listening on http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
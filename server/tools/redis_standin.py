@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Minimal Redis stand-in for running multi-node mode locally.
+
+Usage:
+  python -m tools.redis_standin [--host 127.0.0.1] [--port 6379]
+
+Implements the pub/sub subset of the Redis protocol that python-socketio's
+AsyncRedisManager and services/cluster.py use: PUBLISH, SUBSCRIBE,
+UNSUBSCRIBE, PING and ECHO, plus OK replies for connection setup commands
+(CLIENT, SELECT, AUTH). There is no keyspace and nothing is persisted; use
+a real Redis in production.
+"""
+import argparse
+import asyncio
+from typing import Dict, List, Optional, Set
+
+OK_COMMANDS = {b'CLIENT', b'SELECT', b'AUTH', b'HELLO'}
+
+
+def encode_bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b'$-1\r\n'
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def encode_array(items: List[bytes]) -> bytes:
+    return b'*%d\r\n' % len(items) + b''.join(items)
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        # Inline command, e.g. from telnet
+        return line.strip().split()
+
+    args = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        if not header.startswith(b'$'):
+            raise ValueError(f'Expected bulk string, got {header!r}')
+        size = int(header[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+
+class RedisStandIn:
+    def __init__(self):
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscriptions: Set[bytes] = set()
+        try:
+            while True:
+                command = await read_command(reader)
+                if command is None:
+                    break
+                if not command:
+                    continue
+                name = command[0].upper()
+                args = command[1:]
+
+                if name == b'PUBLISH':
+                    channel, message = args
+                    subscribers = self.channels.get(channel, set())
+                    frame = encode_array([encode_bulk(b'message'), encode_bulk(channel), encode_bulk(message)])
+                    for subscriber in subscribers:
+                        subscriber.write(frame)
+                    writer.write(b':%d\r\n' % len(subscribers))
+                elif name == b'SUBSCRIBE':
+                    for channel in args:
+                        subscriptions.add(channel)
+                        self.channels.setdefault(channel, set()).add(writer)
+                        writer.write(encode_array([
+                            encode_bulk(b'subscribe'), encode_bulk(channel), b':%d\r\n' % len(subscriptions)
+                        ]))
+                elif name == b'UNSUBSCRIBE':
+                    for channel in args or sorted(subscriptions) or [None]:
+                        if channel is not None:
+                            subscriptions.discard(channel)
+                            self.channels.get(channel, set()).discard(writer)
+                        writer.write(encode_array([
+                            encode_bulk(b'unsubscribe'), encode_bulk(channel), b':%d\r\n' % len(subscriptions)
+                        ]))
+                elif name == b'PING':
+                    writer.write(encode_bulk(args[0]) if args else b'+PONG\r\n')
+                elif name == b'ECHO':
+                    writer.write(encode_bulk(args[0]))
+                elif name in OK_COMMANDS:
+                    writer.write(b'+OK\r\n')
+                elif name == b'QUIT':
+                    writer.write(b'+OK\r\n')
+                    break
+                else:
+                    writer.write(b'-ERR unknown command \'%s\'\r\n' % name.lower())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            for channel in subscriptions:
+                self.channels.get(channel, set()).discard(writer)
+            writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    standin = RedisStandIn()
+    server = await asyncio.start_server(standin.handle, host, port)
+    print(f'🧪 Redis stand-in listening on redis://{host}:{port}')
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()